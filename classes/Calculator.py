@@ -1,9 +1,12 @@
 from classes.Utilities import *
+from classes._tape import HistoryTape
+import fractions, decimal, re
 
 class Calculator(TabFrame):
     _name = "Simple Calculator"
     _description = "A simple calculator with basic operations."
     _icon = "calculator icon.png"
+    MEMO_SIZE = 256
 
     def init(self, master=None) -> None:
         self.tabname = "Simple Calculator"
@@ -61,10 +64,23 @@ class Calculator(TabFrame):
         self.ansButton.grid(row=4, column=3)
         self.equalsButton = ttk.Button(self, text="==", padding=(5, 20), command=self.calculate)
         self.equalsButton.grid(row=4, column=4)
+
+        # History tape, loaded once the tab has been drawn. Clicking an entry re-inserts its expression.
+        self.tape = HistoryTape()
+        self.memo: dict[tuple, typing.Any] = dict()
+        self.historyList = tk.Listbox(self, width=32, font=("Consolas", 12), activestyle="none")
+        self.historyList.grid(row=0, column=5, rowspan=5, sticky="ns", padx=(10, 0))
+        self.historyList.bind("<<ListboxSelect>>", self.reinsert)
+        self.after_idle(self.loadHistory)
     
     def createTabCommands(self):
         self.round = tk.BooleanVar(self, True)
         self.addTabCheckbox("Round to 3 Decimal Places", self.round)
+        self.exact = tk.BooleanVar(self, False)
+        self.addTabCheckbox("Exact Fractions", self.exact)
+        self.precise = tk.BooleanVar(self, False)
+        self.addTabCheckbox("High Precision", self.precise)
+        self.addTabFunction("Clear History", self.clearHistory)
         
     def clear(self) -> None:
         self.entry.delete(0, tk.END)
@@ -78,19 +94,82 @@ class Calculator(TabFrame):
         self.entry.insert(tk.END, char)
     
     def add_last_result(self) -> None:
-        if self.last_result is not None:
-            self.add(str(self.last_result))  # Add the last result to the current expression
+        self.add("Ans")  # Resolved from the history tape when calculating
+    
+    def loadHistory(self) -> None:
+        self.historyList.delete(0, tk.END)
+        for entry in self.tape.entries:
+            self.historyList.insert(tk.END, f"{entry.expression} = {entry.result}")
+        self.historyList.see(tk.END)
     
+    def clearHistory(self) -> None:
+        if not messagebox.askokcancel("Clear History", "The calculator history will be cleared. Confirm?"): return
+        self.tape.clear()
+        self.memo.clear()
+        self.historyList.delete(0, tk.END)
+    
+    def reinsert(self, event=None) -> None:
+        selection = self.historyList.curselection()
+        if not selection: return
+        self.clear()
+        self.add(self.tape.entries[selection[0]].expression)
+        self.entry.focus_set()
+    
+    def getNumberType(self) -> expressions.NumberType:
+        """Get the number type selected in the tab functions menu. Exact fractions take priority over high precision."""
+        if self.exact.get(): return expressions.EXACT
+        if self.precise.get(): return expressions.DecimalNumberType(CONFIGURATION.calculator_precision)
+        return expressions.FLOAT
+
+    @staticmethod
+    def format(result: typing.Any) -> str:
+        """Format a result for the entry, showing whole fractions and decimals as integers."""
+        if isinstance(result, fractions.Fraction) and result.denominator == 1:
+            return str(result.numerator)
+        if isinstance(result, decimal.Decimal) and result.is_finite():
+            result = result.normalize()
+            if result == result.to_integral_value() and result.adjusted() < 100: return str(int(result))
+        return str(result)
+
     def calculate(self, event=None) -> None:
         expression = self.entry.get()
-        expression = expression.replace('x', '*').replace('^', '**')
         
         try:
-            result = round(eval(expression), 3) if self.round.get() else eval(expression)
+            normalized = expressions.normalize(expression)
+            degrees = CONFIGURATION.angle_unit == "Degrees"
+            numbers = self.getNumberType()
+            # Ans is the most recent result on the tape, Ans2 the one before it, and so on.
+            answers = {f"ans{number}": self.tape.answer(int(number or 1)) for number in re.findall(r"ans(\d*)", normalized)}
+            if None in answers.values(): raise ValueError("Not enough results on the history tape.")
+            key = (normalized, degrees, numbers, tuple(answers.items()))
+            if key in self.memo:
+                result = self.memo[key]
+            else:
+                result = None
+                # Fast path: integer arithmetic is already exact, so simple expressions with an integer result are not evaluated
+                # again in the selected mode. Otherwise only the selected mode is used, as floats may overflow where it does not.
+                if numbers is expressions.FLOAT or expressions.is_simple(normalized):
+                    try:
+                        variables = {name: expressions.evaluate(value) for name, value in answers.items()}
+                        floatResult = expressions.evaluate(normalized, variables, degrees=degrees)
+                        if numbers is expressions.FLOAT or (isinstance(floatResult, int) and all(isinstance(value, int) for value in variables.values())):
+                            result = floatResult
+                    except (ArithmeticError, ValueError, RecursionError):
+                        if numbers is expressions.FLOAT: raise
+                if result is None:
+                    variables = {name: expressions.evaluate(value, numbers=numbers) for name, value in answers.items()}
+                    result = expressions.evaluate(normalized, variables, degrees=degrees, numbers=numbers)
+                if len(self.memo) >= self.MEMO_SIZE: del self.memo[next(iter(self.memo))]
+                self.memo[key] = result
+            result = round(result, 3) if self.round.get() and isinstance(result, float) else result
             self.last_result = result  # Store the result of the calculation
             self.clear()
-            self.entry.insert(tk.END, str(result))  # Display the result in the entry widget
+            self.entry.insert(tk.END, self.format(result))  # Display the result in the entry widget
+            entry = self.tape.append(expression, self.format(result))
+            self.historyList.insert(tk.END, f"{entry.expression} = {entry.result}")
+            if self.historyList.size() > self.tape.max_entries: self.historyList.delete(0)
+            self.historyList.see(tk.END)
         
         except Exception as e:
             self.clear()
-            self.entry.insert(tk.END, "Error")  # Show error message for invalid expression
\ No newline at end of file
+            self.entry.insert(tk.END, "Error")  # Show error message for invalid expression
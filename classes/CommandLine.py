@@ -1,6 +1,25 @@
 from classes.Utilities import *
-import inspect, http.client, json
-from urllib.parse import urlparse
+import json, csv, itertools
+import classes._commands as _commands
+import classes._workers as _workers
+import classes._completion as _completion
+import classes._solver as _solver
+import classes._primes as _primes
+import classes._dictionary as _dictionary
+
+def _streamBatches(batches: typing.Iterator[list | None], format: typing.Callable[[typing.Any], str], name: str, perLine: int = 10) -> typing.Iterator[str | None]:
+    """Format batches of results into chunks of text for CommandLine.stream(), passing on None (not ready yet) and finishing with a count."""
+    count = 0
+    for batch in batches:
+        if batch is None:
+            yield None
+            continue
+        count += len(batch)
+        items = list(map(format, batch))
+        if items: yield "\n".join(", ".join(items[i:i + perLine]) for i in range(0, len(items), perLine))
+    yield f"Found {count} {name}."
+
+TABLE_BATCH_ROWS = 1000  # Tables are calculated and written this many rows at a time, so that long tables stream
 
 class funcs:
     """Use @hidden as a docstring for any functions not wanting to be displayed in the help menu."""
@@ -28,6 +47,44 @@ class funcs:
         """Simple text-based calculator."""
         return toFloat(text)
 
+    def table(expression: str, start: float, stop: float, step: float, **kwargs) -> typing.Iterator[str] | str:
+        """Tabulate an expression in x, e.g. 'table x^2 + 1 0 10 0.5'. Use the export menu to save the table as a CSV file. Press Ctrl+C to cancel."""
+        if step == 0 or (stop - start) / step < 0:
+            return "Step must be non-zero and go from start towards stop."
+        function = expressions.compile_expression(expression, ("x",))
+        decimals = CONFIGURATION.rounding
+        count = int((stop - start) / step + 1e-9) + 1
+        rows = []
+        if "tab" in kwargs:
+            kwargs["tab"].last_table = (expression, rows)
+        width = max(len(expression), 12)
+
+        def batches() -> typing.Iterator[list[tuple[float, typing.Any]]]:
+            for low in range(0, count, TABLE_BATCH_ROWS):
+                batch = []
+                # Each x is calculated from its index rather than by adding step repeatedly, so rounding errors do not accumulate.
+                for i in range(low, min(low + TABLE_BATCH_ROWS, count)):
+                    x = start + i * step
+                    try:
+                        y = function(x)
+                    except expressions.ExpressionError:
+                        y = None
+                    batch.append((x, y))
+                rows.extend(batch)
+                yield batch
+
+        def format(row: tuple[float, typing.Any]) -> str:
+            x, y = row
+            if isinstance(y, float) and decimals is not None: y = round(y, decimals)
+            if decimals is not None: x = round(x, decimals)
+            return f"{x:>12} | {'undefined' if y is None else y:>{width}}"
+
+        def lines() -> typing.Iterator[str]:
+            yield f"{'x':>12} | {expression:>{width}}\n{'-' * 12}-+-{'-' * width}"
+            yield from _streamBatches(batches(), format, "rows", perLine=1)
+        return lines()
+
+    @_commands.pure
     def solvepoints(x1: float, y1: float, x2: float, y2: float, **kwargs) -> dict:
         """Solve two coordinates."""
         rise, run = y2-y1, x2-x1
@@ -38,18 +95,40 @@ class funcs:
         equation = f"y = {gradient}x + {yIntercept}"
         return {"Rise": rise, "Run": run, "Gradient": gradient, "Distance between points": distance, "Midpoint": midpoint, "y-Intercept": yIntercept, "x-Intercept": xIntecept, "Equation of line": equation}
 
+    @_commands.pure
     def quadratic(a: float, b: float, c: float, **kwargs) -> dict:
         """Solve a quadratic equation of the form ax^2 + bx + c = 0."""
+        if b**2 - 4*a*c < 0:
+            return {"Solutions": "No real solutions (the discriminant is negative)", "Midpoint": (-b) / (2*a), "Discriminant": b**2 - 4*a*c}
         midpoint = (-b) / (2*a)
         determinate = (b**2 - 4*a*c)**0.5 / (2*a)
         return {"Solution 1": midpoint + determinate, "Solution 2": midpoint - determinate, "Midpoint": midpoint, "Determinate": determinate}
     
+    # Not @_commands.pure, as the solutions depend on the angle unit as well as the equation.
+    @_commands.runs_in("process")
+    def solve(equation: str, **kwargs) -> str:
+        """Solve an equation in x between -100 and 100, or in an interval given in brackets, e.g. 'solve x^2 = 2x + 1 [0 10]'. Trigonometric functions use the configured angle unit."""
+        start, stop = -100, 100
+        if equation.rstrip().endswith("]") and "[" in equation:
+            equation, _, interval = equation.rstrip()[:-1].rpartition("[")
+            bounds = interval.replace(",", " ").split()
+            if len(bounds) != 2: return "The interval must be two numbers, e.g. [0 10]."
+            start, stop = toFloat(bounds[0]), toFloat(bounds[1])
+        roots = _solver.solve(equation, start, stop, degrees=CONFIGURATION.angle_unit == "Degrees")
+        if roots is None:
+            return f"Every x between {smartRound(min(start, stop))} and {smartRound(max(start, stop))} is a solution."
+        if not roots:
+            return f"No real solutions between {smartRound(min(start, stop))} and {smartRound(max(start, stop))}."
+        return "\n".join(f"x = {smartRound(root)}" for root in roots)
+
+    @_commands.pure
     def rt(opposite: float, adjacent: float, hypotenuse: float, theta: float, phi: float, **kwargs) -> dict:
         """Solve a right-angled triangle. If value is not known, enter 0."""
         triangle = right_triangle(hypotenuse=hypotenuse, opposite=opposite, adjacent=adjacent, theta=theta, phi=phi, radians=False)
         triangle.solve_triangle()
         return triangle.dictionary
 
+    @_commands.pure
     def projectile(initialVelocity: float, initialAngleFromHorizontal: float, initialHeight: float, **kwargs) -> dict:
         """Calculate projectile motion using an initial velocity, initial angle from horizontal, and initial height."""
         ux = initialVelocity * math.cos(math.radians(initialAngleFromHorizontal))
@@ -62,6 +141,7 @@ class funcs:
         s = f"{(sx**2 + initialHeight**2)} E {math.atan(initialHeight/sx)} S"
         return {"Initial x-velocity": ux, "Initial y-velocity": uy, "Time of flight": time, "Horizontal range": sx, "Maximum height": maxHeight, "Impact y-velocity": vImpactY, "Impact velocity": vImpact, "Total displacement": s}
     
+    @_commands.runs_in("gui")
     def cat(**kwargs) -> str:
         """Print out a selected file."""
         filepath = filedialog.askopenfilename(title="Open File", filetypes=[("Text File", "*.txt"), ("All Files", "*.*")])
@@ -78,56 +158,66 @@ class funcs:
         """Generate a random number between 0 and 1."""
         return random.random()
     
+    @_commands.pure
     def lcm(num1: int, num2: int, **kwargs) -> int:
         """Get the lowest common multiple of two integers."""
         return math.lcm(num1, num2)
     
+    @_commands.pure
     def gcd(num1: int, num2: int, **kwargs) -> int:
         """Get the greatest common divisor of two numbers."""
         return math.gcd(num1, num2)
     
+    @_commands.pure
     def sin(angle: float, **kwargs) -> float:
         """Get the sin of an angle."""
         return math.sin(math.radians(angle))
     
+    @_commands.pure
     def cos(angle: float, **kwargs) -> float:
         """Get the cos of an angle."""
         return math.cos(math.radians(angle))
     
+    @_commands.pure
     def tan(angle: float, **kwargs) -> float:
         """Get the tan of an angle."""
         return math.tan(math.radians(angle))
     
+    @_commands.pure
     def asin(ratio: float, **kwargs) -> float:
         """Get the asin of a ratio."""
         return math.degrees(math.asin(ratio))
     
+    @_commands.pure
     def acos(ratio: float, **kwargs) -> float:
         """Get the acos of a ratio."""
         return math.degrees(math.acos(ratio))
     
+    @_commands.pure
     def atan(ratio: float, **kwargs) -> float:
         """Get the atan of a ratio."""
         return math.degrees(math.atan(ratio))
     
+    @_commands.pure
     def degrees(angleInRadians: float, **kwargs) -> float:
         """Convert radians into degrees."""
         return math.degrees(angleInRadians)
     
+    @_commands.pure
     def radians(angleInDegrees: float, **kwargs) -> float:
         """Convert degrees into radians."""
         return math.radians(angleInDegrees)
     
-    def triples(seed1: int, seed2: int, number: int, **kwargs) -> dict:
-        """Generate pythagorean triples."""
-        triples = dict()
-        for i in range(number):
-            a = seed1**2 - seed2**2
-            b = 2 * seed1 * seed2
-            c = seed1**2 + seed2**2
-            triples[f"({i+1})"] = (abs(a), abs(b), abs(c))
-            seed2 += 1
-        return triples
+    def triples(options: str, **kwargs) -> typing.Iterator[str]:
+        """Generate the primitive pythagorean triples up to a maximum hypotenuse, e.g. 'triples 100'. Add -p to limit the perimeter instead, and -all to include multiples."""
+        words = options.lower().split()
+        flags = {word for word in words if word.startswith("-")}
+        numbers = [word for word in words if not word.startswith("-")]
+        if len(numbers) != 1 or flags - {"-p", "-perimeter", "-all"}:
+            return "Usage: triples <maximum> [-p] [-all]"
+        triples = pythagorean_triples(toInt(numbers[0]), perimeter=bool(flags & {"-p", "-perimeter"}), multiples="-all" in flags)
+        batches = iter(lambda: list(itertools.islice(triples, 1000)), [])
+        return _streamBatches(batches, str, "triples", perLine=5)
     
     def currentperiod(**kwargs) -> str:
         """Print the current period."""
@@ -163,60 +253,34 @@ class funcs:
             result += random.choice(chars)
         return result
     
+    @_commands.runs_in("thread")
     def dictionary(word: str, **kwargs) -> str:
-        """@hidden"""
-        result = ""
-        word = input("Enter the word to look up: ")
-        url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}"
-
-        # Parse the URL to get the host and path
-        parsed_url = urlparse(url)
-        host = parsed_url.netloc
-        path = parsed_url.path
-
-        try:
-            # Create a connection to the host
-            conn = http.client.HTTPSConnection(host)
-            
-            # Set up the headers
-            headers = {'User-Agent': 'Mozilla/5.0'}
-
-            # Make a GET request
-            conn.request("GET", path, headers=headers)
-            
-            # Get the response
-            response = conn.getresponse()
-            
-            if response.status == 200:
-                # Parse the JSON data
-                data = json.loads(response.read().decode())
-                
-                if isinstance(data, list) and len(data) > 0:
-                    meanings = data[0].get("meanings", [])
-                    if meanings:
-                        result += "\nMeanings:\n"
-                        for meaning in meanings:
-                            part_of_speech = meaning.get("partOfSpeech", "N/A")
-                            definitions = meaning.get("definitions", [])
-                            result += f"\nPart of Speech: {part_of_speech}\n"
-                            for definition in definitions:
-                                result += f"Definition: {definition.get('definition', 'N/A')}\n"
-                                result += f"Example: {definition.get('example', 'N/A')}\n"
-                                result += f"Synonyms: {', '.join(definition.get('synonyms', []))}\n"
-                                result += f"Antonyms: {', '.join(definition.get('antonyms', []))}\n"
-                    else:
-                        result = "No meanings found for the word."
-                else:
-                    result = "No data found for the word."
-            else:
-                result = f"Error: Received status code {response.status}"
-            
-            conn.close()
-        
-        except Exception as e:
-            result = f"Error: {e}"
-        
-        return result
+        """Look up a word, e.g. 'dictionary apple'. Use 'dictionary -prefix app' to list words, and 'dictionary -import <file>' to add a word list to the offline dictionary."""
+        option, _, value = word.strip().partition(" ")
+        match option.lower():
+            case "-import":
+                if not os.path.isfile(value.strip()): return f"File '{value.strip()}' not found."
+                count = _dictionary.STORE.import_definitions(_dictionary.read_dataset(value.strip()))
+                return f"Imported {count} definitions. The offline dictionary has {len(_dictionary.STORE)} words."
+            case "-prefix":
+                words = _dictionary.STORE.prefix(value, limit=50)
+                return ", ".join(words) if words else f"No words start with '{value.strip()}'."
+        definitions, error = _dictionary.STORE.lookup(word), ""
+        if not definitions and CONFIGURATION.dictionary_url:
+            try:
+                definitions = _dictionary.HttpBackend(CONFIGURATION.dictionary_url, _dictionary.STORE).lookup(word)
+            except OSError as e:
+                error = f" Could not reach the online dictionary. Error type: {str(e)}"
+        if not definitions:
+            suggestions = _dictionary.STORE.suggest(word)
+            return f"Could not find '{word}'." + (f" Did you mean: {', '.join(suggestions)}?" if suggestions else "") + error
+        lines, heading = [], None
+        for item in definitions:
+            if (item.word, item.part_of_speech) != heading:
+                heading = (item.word, item.part_of_speech)
+                lines.append(f"{item.word} ({item.part_of_speech})" if item.part_of_speech else item.word)
+            lines.append(f"  - {item.definition}" + (f' e.g. "{item.example}"' if item.example else ""))
+        return "\n".join(lines)
 
     def timetable(**kwargs) -> dict:
         """Print today's timetable."""
@@ -232,54 +296,77 @@ class funcs:
             i += 1
         return result
 
+    @_commands.pure
+    @_commands.runs_in("process")
     def isprime(number: int, **kwargs) -> bool:
         """Check if an integer is prime."""
         if number < 2:
             return "Number must be greater than 1."
-        for i in range(2, round(number**0.5) + 1):
-            if number % i == 0:
-                return False
-        return True
+        return _primes.is_prime(number)
     
+    @_commands.pure
+    @_commands.runs_in("process")
     def divisors(number: int, **kwargs) -> str:
         """Get the divisors of an integer."""
         if number < 2:
             return "Number must be greater than 1."
-        divisors = []
-        for i in range(1, round(number/2) + 1):
-            if number % i == 0:
-                divisors.append(str(i))
-        divisors.append(str(number))
-        return ", ".join(divisors)
+        return ", ".join(map(str, _primes.divisors(number)))
     
+    @_commands.pure(persist=True)
+    @_commands.runs_in("process")
     def factorise(number: int, **kwargs):
         """Get the prime factorisation of a number."""
         if number <= 1:
             return "Number must be greater than 1"
-        factors = []
-        # Check for factors of 2
-        count = 0
-        while number % 2 == 0:
-            number //= 2
-            count += 1
-        if count > 0:
-            factors.append(f"2^{count}" if count > 1 else "2")
-        
-        # Check for odd factors from 3 upwards
-        for i in range(3, int(number**0.5) + 1, 2):
-            count = 0
-            while number % i == 0:
-                number //= i
-                count += 1
-            if count > 0:
-                factors.append(f"{i}^{count}" if count > 1 else str(i))
-        
-        # If there's anything left, it must be a prime factor
-        if number > 1:
-            factors.append(str(number))
-        
-        # Join the factors with " x "
-        return " x ".join(factors)
+        return _primes.format_factorisation(_primes.factorise(number))
+    
+    @_commands.pure
+    @_commands.runs_in("process")
+    def sigma(number: int, **kwargs) -> int:
+        """Get the sum of the divisors of an integer."""
+        if number < 1:
+            return "Number must be positive."
+        return _primes.divisor_sum(number)
+    
+    @_commands.pure
+    @_commands.runs_in("process")
+    def tau(number: int, **kwargs) -> int:
+        """Get the number of divisors of an integer."""
+        if number < 1:
+            return "Number must be positive."
+        return _primes.divisor_count(number)
+    
+    @_commands.pure
+    @_commands.runs_in("process")
+    def phi(number: int, **kwargs) -> int:
+        """Get Euler's totient of an integer (how many integers up to it are coprime to it)."""
+        if number < 1:
+            return "Number must be positive."
+        return _primes.totient(number)
+    
+    def cache(action: str, **kwargs) -> dict | str:
+        """Show statistics on the cache of command results with 'cache stats', or empty it with 'cache clear'."""
+        match action.lower().strip():
+            case "stats":
+                return _commands.RESULTS.stats()
+            case "clear":
+                _commands.RESULTS.clear()
+                return "Cleared the cache of command results."
+            case _:
+                return "Usage: cache stats | cache clear"
+    
+    def primes(start: int, stop: int, **kwargs) -> typing.Iterator[str]:
+        """List the primes between two integers (inclusive). Press Ctrl+C to cancel."""
+        return _streamBatches(_primes.primes_between(start, stop + 1), str, "primes")
+    
+    def twinprimes(start: int, stop: int, **kwargs) -> typing.Iterator[str]:
+        """List the twin primes between two integers (inclusive). Press Ctrl+C to cancel."""
+        return _streamBatches(_primes.twin_primes_between(start, stop + 1), lambda pair: f"({pair[0]}, {pair[1]})", "twin prime pairs")
+    
+    def factorrange(start: int, stop: int, **kwargs) -> typing.Iterator[str]:
+        """Get the prime factorisation of every integer between two integers (inclusive). Press Ctrl+C to cancel."""
+        format = lambda item: f"{item[0]} = {_primes.format_factorisation(item[1]) or 1}"
+        return _streamBatches(_primes.factorisations_between(start, stop + 1), format, "numbers", perLine=1)
     
     def symbol(name: str, **kwargs) -> str:
         """Print a mathematics or other symbol to be copied. Includes lambda, proportional."""
@@ -291,14 +378,17 @@ class funcs:
             case _:
                 return "Could not find symbol."
     
+    @_commands.pure
     def kinetic(mass: float, velocity: float, **kwargs) -> float:
         """Get the kinetic energy of an object using the formula E_k = 1/2 m v^2."""
         return 0.5 * mass * velocity**2
     
+    @_commands.pure
     def potential(mass: float, height: float, **kwargs) -> float:
         """Get the potential energy of an object under earth's gravity. Uses Ep = mgh."""
         return mass * height * 9.81
     
+    @_commands.pure
     def lachem(equation: str, **kwargs) -> str:
         """Write chemical equation quickly to convert into the LaTeX format."""
         class Tokenizer:
@@ -364,10 +454,27 @@ class funcs:
                 return result
         return Tokenizer(equation).latexify()
 
+def _awaitResult(function: _commands.Command, args: tuple) -> typing.Iterator[str | None]:
+    """Run a background command on a worker, yielding None until its formatted result is ready."""
+    result = yield from _workers.call(function.obj, args, where=function.runner)
+    if function.pure: _commands.RESULTS.put(function, args, result)
+    yield _formatResult(result)
+
+def _formatResult(result: typing.Any) -> str:
+    """Format the (non-streamed) result of a command as it is written to the terminal."""
+    if isinstance(result, (int, float, complex)):
+        return f"Result = {smartRound(result)}"
+    elif isinstance(result, dict):
+        return "\n".join(f"{item}: {smartRound(value) if isinstance(value, float) else value}" for item, value in result.items())
+    elif result is None:
+        return ""
+    return str(result)
+
 class CommandLine(TabFrame):
     _name = "Command Line"
     _description = "A command line interface in PUtilities."
     _icon = "command line icon.png"
+    STREAM_SECONDS = 0.03  # The longest a streamed command may run for before the window is updated
 
     def init(self):
         self.tabname = "PUtilities Command Line"
@@ -380,10 +487,31 @@ class CommandLine(TabFrame):
         self.entry = ttk.Entry(self.inputFrame, width=100)
         self.entry.pack(side="left", fill="x", expand=1)
         self.entry.bind("<Return>", self.execute)
+        self.entry.bind("<Control-c>", self.cancelStream)
+        self.entry.bind("<Escape>", self.cancelStream)
+        self.entry.bind("<Tab>", self.complete)
+        self.streaming: typing.Iterator[str | None] | None = None
+        self.streamDeadline: float | None = None
         self.createFunclist()
         self.prompt = CONFIGURATION.terminal_prompt
         self.initTextbox()
     
+    def createTabCommands(self) -> None:
+        self.addExportCommand("Export Last Table as CSV", self.exportTable)
+
+    def exportTable(self) -> None:
+        """Export the table produced by the last 'table' command as a CSV file."""
+        if not getattr(self, "last_table", None):
+            messagebox.showinfo("Export Table", "Run the 'table' command first, e.g. 'table x^2 0 10 1'.")
+            return
+        filepath = filedialog.asksaveasfilename(title="Export Table", defaultextension=".csv", filetypes=[("CSV File", "*.csv"), ("All Files", "*.*")])
+        if not filepath: return
+        expression, rows = self.last_table
+        with open(filepath, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["x", expression])
+            writer.writerows([x, "" if y is None else y] for x, y in rows)
+
     def initTextbox(self) -> None:
         self.textbox.text_widget.config(state=tk.NORMAL)
         self.textbox.clear()
@@ -398,17 +526,28 @@ class CommandLine(TabFrame):
         self.textbox.scrollToBottom()
         self.textbox.text_widget.config(state=tk.DISABLED)
 
+    def complete(self, event=None) -> str:
+        """Complete the command name or path before the cursor, listing the candidates if there is more than one."""
+        candidates, total = _completion.complete_entry(self.entry, self.funcslist, os.getcwd())
+        if candidates:
+            self.write(self.entry.get())
+            self.write("    ".join(candidates) + (f"\n... and {total - len(candidates)} more" if total > len(candidates) else ""))
+            self.write(f"{self.prompt} ", end="")
+        return "break"  # Keep the focus in the entry
+
     def printHelp(self) -> None:
         self.write("PUtilties Command Line is designed to quickly execute commands. These commands include:")
-        for item in self.funcslist.keys():
-            if self.funcslist[item]["doc"] == "@hidden": continue
-            self.write(f">> {item} ", end="")
-            for argument in self.funcslist[item]["args"]:
+        for name, function in self.funcslist.items():
+            if function.doc == "@hidden": continue
+            self.write(f">> {name} ", end="")
+            for argument in function.args:
                 self.write(f"({argument['name']}) ", end="")
-            self.write(f": {self.funcslist[item]['doc']}")
+            self.write(f": {function.doc}")
 
     def execute(self, event=None) -> None:
         rightToPrint = True
+        if self.streaming is not None:
+            return  # Wait for the running command to finish, or cancel it with Ctrl+C
         if self.entry.get():
             self.write(f"{self.entry.get()}")
         else:
@@ -433,78 +572,186 @@ class CommandLine(TabFrame):
                     message = "There was an error in running the command. Error type: " + str(e)
                     self.write(message)
                     ERROR_LOG.log("[terminal]" + message)
-        if rightToPrint:
+        if rightToPrint and self.streaming is None:
             self.write()
             self.write(f"{self.prompt} ", end="")
     
+    def stream(self, iterator: typing.Iterator[str | None]) -> None:
+        """Write the chunks of text yielded by a command in the background, without blocking the window. None means no text is ready yet."""
+        self.streaming = iterator
+        timeout = CONFIGURATION.command_timeout
+        self.streamDeadline = time.perf_counter() + timeout if timeout else None
+        self.after(0, self.streamChunk)
+    
+    def streamChunk(self) -> None:
+        if self.streaming is None: return
+        if self.streamDeadline is not None and time.perf_counter() > self.streamDeadline:
+            self.streaming.close()
+            self.write(f"Stopped after {smartRound(CONFIGURATION.command_timeout)} seconds. The time limit can be changed in the configuration (command_timeout).")
+            self.finishStream()
+            return
+        chunks, finished, waiting = [], False, False
+        deadline = time.perf_counter() + self.STREAM_SECONDS
+        try:
+            while time.perf_counter() < deadline:
+                chunk = next(self.streaming)
+                if chunk is None:
+                    waiting = True
+                    break
+                chunks.append(chunk)
+        except StopIteration:
+            finished = True
+        except Exception as e:
+            chunks.append(f"There was an error in running the command. Error type: {str(e)}")
+            ERROR_LOG.log(f"[terminal] There was an error in running the command. Error type: {str(e)}")
+            finished = True
+        if chunks: self.write("\n".join(chunks))
+        if finished: self.finishStream()
+        else: self.after(10 if waiting else 1, self.streamChunk)
+    
+    def cancelStream(self, event=None) -> str | None:
+        if self.streaming is None: return None  # Let Ctrl+C copy as normal
+        self.streaming.close()
+        self.write("^C Cancelled.")
+        self.finishStream()
+        return "break"
+    
+    def finishStream(self) -> None:
+        self.streaming = None
+        self.write()
+        self.write(f"{self.prompt} ", end="")
+    
+    def onTabClose(self) -> None:
+        if self.streaming is not None:
+            self.streaming.close()
+            self.streaming = None
+    
     def createFunclist(self) -> None:
-        self.funcslist = dict()
-
-        # Use __dict__ to get methods in the correct order as defined in the class
-        method_names = [name for name, obj in vars(funcs).items() 
-                        if (inspect.isfunction(obj) or inspect.ismethod(obj)) and not name.startswith("__")]
-
-        # Loop through the method names in the order they appear in the class
-        for name in method_names:
-            obj = getattr(funcs, name)
-            if inspect.isfunction(obj) or inspect.ismethod(obj):
-                doc = obj.__doc__
-                signature = inspect.signature(obj)
-                args = []
-                for param in signature.parameters.values():
-                    nameOfArg = param.name
-                    if nameOfArg == "kwargs":
-                        continue
-                    argType = param.annotation if param.annotation is not inspect.Parameter.empty else str
-                    args.append({"name": nameOfArg, "type": argType})
-                self.funcslist[name] = {"obj": obj, "doc": doc, "args": args}
+        # The registry is shared by every Command Line tab, and only built the first time one is opened.
+        self.funcslist: dict[str, _commands.Command] = _commands.get_registry(funcs)
     
     def checkAndRun(self, string: str) -> None:
-        command = string.split()[0]
-        function = None
-        for func in self.funcslist.keys():
-            if command.lower() == func:
-                function = self.funcslist[func]
+        command, *args = string.split()
+        function = self.funcslist.get(command.lower())
         if not function:
             self.write(f"Function '{command}' not found. Type 'help' for a list of functions.")
             ERROR_LOG.log(f"[terminal] Function '{command}' not found. Type 'help' for a list of functions.")
             return
-        args = string.split()
-        args.pop(0)       
-        if len(args) < len(function["args"]):
+        # Extra words are joined into the last text argument (or the last argument if there is none), e.g. the expression of 'table'.
+        args = function.convert(args)
+        if args is None:
             self.write(f"Incorrect number of arguments passed into function '{command}'. Refer to the help menu for a list of possible arguments for each function.")
             ERROR_LOG.log(f"[terminal] Incorrect number of arguments passed into function '{command}'. Refer to the help menu for a list of possible arguments for each function.")
             return
-        while len(args) != len(function["args"]):
-            args[-2] = f"{args[-2]} {args[-1]}"
-            args.pop(-1)
-        i = 0
-        while i < len(args):
-            target = function["args"][i]["type"]
-            if target == float:
-                args[i] = toFloat(args[i])
-            elif target == int:
-                args[i] = toInt(args[i])
-            elif target == bool:
-                args[i] = False if args[i].lower() in ["no", "false", "0", "n", "not", "0.0"] else True
-            i += 1
-        args = tuple(args)
+        if function.pure and (result := _commands.RESULTS.get(function, args)) is not _commands.MISSING:
+            self.write(_formatResult(result))
+            return
+        if function.runner in ["thread", "process"]:
+            self.stream(_awaitResult(function, args))
+            return
         try:
             kwargs = {"tab": self}
-            result = function["obj"].__call__(*args, **kwargs)
+            result = function.obj(*args, **kwargs)
+            if function.pure: _commands.RESULTS.put(function, args, result)
         except Exception as e:
             self.write(f"There was an error in function '{command}'. Error type: {str(e)}. Please try again.")
             ERROR_LOG.log(f"[terminal] There was an error in function '{command}'. Error type: {str(e)}. Please try again.")
             return
         
-        if isinstance(result, (int, float, complex)):
-            self.write(f"Result = {smartRound(result)}")
-        elif isinstance(result, dict):
-            for item in result.keys():
-                if isinstance(result[item], float):
-                    result[item] = smartRound(result[item])
-                self.write(f"{item}: {result[item]}")
-        elif result is None:
-            self.write()
+        if isinstance(result, typing.Iterator):
+            self.stream(result)
+        else:
+            self.write(_formatResult(result))
+
+def runBatch(lines: typing.Iterable[str], output: typing.TextIO = sys.stdout, jsonl: bool = False) -> dict:
+    """
+    Run Command Line commands headlessly, without creating a window, writing each result to output as soon as it is ready.
+    Blank lines and lines starting with '#' are skipped, and 'exit' or 'exitall' stops the batch. Commands that need a
+    window (marked with @_commands.runs_in("gui")) are reported as errors instead of being run.
+
+    Arguments:
+        lines (Iterable[str]): The commands, one per line, e.g. an open script file or sys.stdin.
+        output (TextIO): Where the results are written.
+        jsonl (bool): Whether to write one JSON object per command (with its line number, command, status, output and time)
+            instead of plain text.
+
+    Returns:
+        dict: The number of commands run, the number of errors and the total time in seconds.
+    """
+    registry = _commands.get_registry(funcs)
+    commands, errors, start = 0, 0, time.perf_counter()
+    for number, line in enumerate(lines, 1):
+        string = line.strip()
+        if not string or string.startswith("#"): continue
+        command, *words = string.split()
+        command = command.lower()
+        if command in ["exit", "exitall"]: break
+        commands += 1
+        commandStart = time.perf_counter()
+        chunks, status = [], "ok"
+        function = registry.get(command)
+        args, conversionError = None, None
+        try:
+            args = function.convert(words) if function else None
+        except (ValueError, ArithmeticError, RecursionError) as e:
+            conversionError = str(e)
+        if command == "help":
+            chunks = [" ".join([name] + [f"({argument['name']})" for argument in function.args]) + f": {function.doc}" for name, function in registry.items() if function.doc != "@hidden"]
+        elif command == "clear":
+            pass
+        elif function is None:
+            chunks, status = [f"Function '{command}' not found."], "error"
+        elif conversionError is not None:
+            chunks, status = [f"There was an error in function '{command}'. Error type: {conversionError}."], "error"
+        elif args is None:
+            chunks, status = [f"Incorrect number of arguments passed into function '{command}'."], "error"
+        elif function.runner == "gui":
+            chunks, status = [f"Function '{command}' needs a window, so it cannot be run in batch mode."], "error"
         else:
-            self.write(str(result))
+            try:
+                result = _commands.RESULTS.get(function, args) if function.pure else _commands.MISSING
+                if result is _commands.MISSING:
+                    result = function.obj(*args)
+                    if function.pure: _commands.RESULTS.put(function, args, result)
+                if isinstance(result, typing.Iterator):
+                    for chunk in result:
+                        if chunk is None:
+                            time.sleep(0.001)  # Waiting on worker processes
+                        elif jsonl:
+                            chunks.append(chunk)
+                        else:
+                            output.write(chunk + "\n")
+                else:
+                    chunks = [_formatResult(result)]
+            except Exception as e:
+                chunks, status = [f"There was an error in function '{command}'. Error type: {str(e)}."], "error"
+        errors += status == "error"
+        if jsonl:
+            output.write(json.dumps({"line": number, "command": string, "status": status, "output": "\n".join(chunks), "seconds": time.perf_counter() - commandStart}) + "\n")
+        elif chunks:
+            output.write("\n".join(chunks) + "\n")
+    return {"commands": commands, "errors": errors, "seconds": time.perf_counter() - start}
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point of the headless batch mode: python -m classes.CommandLine [script] [--jsonl] [--quiet]"""
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m classes.CommandLine", description="Run PUtilities Command Line commands from a script file or standard input, without opening a window.")
+    parser.add_argument("script", nargs="?", default="-", help="A file with one command per line. Defaults to standard input.")
+    parser.add_argument("--jsonl", action="store_true", help="Write one JSON object per command instead of plain text.")
+    parser.add_argument("--quiet", action="store_true", help="Do not write results, only the throughput (for benchmarking).")
+    arguments = parser.parse_args(argv)
+    try:
+        script = sys.stdin if arguments.script == "-" else open(arguments.script, "r")
+    except OSError as e:
+        print(f"Could not read script '{arguments.script}'. Error type: {str(e)}", file=sys.stderr)
+        return 1
+    output = open(os.devnull, "w") if arguments.quiet else sys.stdout
+    with script:
+        stats = runBatch(script, output, arguments.jsonl)
+    if arguments.quiet: output.close()
+    rate = stats["commands"] / stats["seconds"] if stats["seconds"] else 0
+    print(f"{stats['commands']} commands ({stats['errors']} errors) in {stats['seconds']:.3f}s, {rate:.0f} commands/s.", file=sys.stderr)
+    return 1 if stats["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,11 @@
 from classes.Utilities import *
 from shutil import rmtree
+import threading
 from classes.TextEditor import TextEditor
 from classes.LessonEditor import LessonEditor
 from classes.ImageViewer import ImageViewer
+import classes._disk_usage as _disk_usage
+import classes._workers as _workers
 
 class NewFileDialogue(tk.Toplevel):
     def __init__(self, master=None) -> None:
@@ -118,6 +121,7 @@ class FileExplorer(TabFrame):
         self.fileTree.column("Type", stretch=False, width=200)
 
         self.fileTree.bind("<Double-1>", self.onTreeItemDoubleClick)
+        self.folderSizes: typing.Iterator[list[tuple[str, int]] | None] | None = None
         self.loadCurrentFilepath()
 
     def loadCurrentFilepath(self) -> None:
@@ -136,15 +140,48 @@ class FileExplorer(TabFrame):
                     files.append(full_path)
             
             for directory in directories:
-                size, type_ = "n/a", "Directory"
+                size, type_ = "Calculating...", "Directory"
                 self.fileTree.insert("", "end", text=get_filename_of_filepath(directory), values=(size, type_), iid=directory)
             for file in files:
                 size, type_ = f"{os.path.getsize(file)} bytes", "File"
                 self.fileTree.insert("", "end", text=get_filename_of_filepath(file), values=(size, type_), iid=file)
+            self.loadFolderSizes(directories)
         except Exception as e:
             messagebox.showerror("Error", f"Could not load filepath {self.currentfilepath}. Error type: {str(e)}")
             self.currentfilepath = os.path.dirname(self.currentfilepath)
     
+    def loadFolderSizes(self, directories: list[str]) -> None:
+        """Calculate the sizes of the folders being shown in the background, filling them in as they are found."""
+        self.stopFolderSizes()
+        self.folderSizesStop = threading.Event()
+        sizes = ((directory, _disk_usage.USAGE.size(directory, self.folderSizesStop)) for directory in directories)
+        self.folderSizes = _workers.iterate_in_thread(sizes, batch_size=16, batch_seconds=0.1)
+        self.after(50, self.updateFolderSizes)
+
+    def updateFolderSizes(self) -> None:
+        if self.folderSizes is None: return
+        try:
+            batch = next(self.folderSizes)
+        except StopIteration:
+            self.folderSizes = None
+            return
+        except Exception as e:
+            ERROR_LOG.log_tab_error("file explorer", f"Could not calculate folder sizes. Error type: {str(e)}")
+            self.folderSizes = None
+            return
+        for directory, size in batch or ():
+            if self.fileTree.exists(directory): self.fileTree.set(directory, "Size", f"{size} bytes")
+        self.after(100 if batch is None else 1, self.updateFolderSizes)
+
+    def stopFolderSizes(self) -> None:
+        if self.folderSizes is None: return
+        self.folderSizesStop.set()
+        self.folderSizes.close()
+        self.folderSizes = None
+
+    def onTabClose(self) -> None:
+        self.stopFolderSizes()
+
     def onTreeItemDoubleClick(self, event=None) -> None:
         selectedItem = self.fileTree.focus()
         item_path = selectedItem
@@ -1,4 +1,5 @@
 from classes.Utilities import *
+from classes._journal import DocumentJournal
 
 class LessonEditor(TabFrame):
     _name = "Lesson Editor"
@@ -73,6 +74,11 @@ class LessonEditor(TabFrame):
         self.notesEntry.pack(expand=1, fill="both")
 
         self.dateEntry.insert(tk.END, datetime.datetime.now().strftime("%d/%m/%Y"))
+
+        self.journal = DocumentJournal(self, "lesson",
+            {"know": self.knowEntry, "understand": self.understandEntry, "demonstrate": self.demonstrateEntry, "notes": self.notesEntry},
+            {"title": self.titleEntry, "subtitle": self.subtitleEntry, "date": self.dateEntry, "subject": self.subjectEntry,
+             "unit": self.unitEntry, "term": self.termEntry, "week": self.weekEntry})
     
     def createTabCommands(self):
         self.addTabFunction("Clear text", self.clearData)
@@ -101,6 +107,7 @@ class LessonEditor(TabFrame):
             return
         with open(self.filepath, "w") as f:
             json.dump(self.getDict(), f, indent=4)
+        self.journal.compact(self.filepath)
         CONFIGURATION.add_recent_file(self.filepath)
     
     def saveAs(self):
@@ -112,6 +119,7 @@ class LessonEditor(TabFrame):
         with open(savepath, "w") as f:
             json.dump(self.getDict(), f, indent=4)
         self.filepath = savepath
+        self.journal.compact(self.filepath)
         self.tabname = get_filename_of_filepath(self.filepath)[:-5]
         CONFIGURATION.add_recent_file(self.filepath)
     
@@ -123,8 +131,10 @@ class LessonEditor(TabFrame):
             return
         with open(loadpath, "r") as f:
             data = json.load(f)
-        self.parseData(data)
+        with self.journal.paused():
+            self.parseData(data)
         self.filepath = loadpath
+        self.journal.compact(self.filepath)
         self.tabname = get_filename_of_filepath(self.filepath)[:-5]
         CONFIGURATION.add_recent_file(self.filepath)
     
@@ -177,8 +187,26 @@ class LessonEditor(TabFrame):
         if not filepath or not os.path.isfile(filepath): return
         with open(filepath, "r") as f:
             data = json.load(f)
-        self.parseData(data)
+        with self.journal.paused():
+            self.parseData(data)
         self.tabname = PFileHandler.get_filename_without_extension(filepath)
         self.filepath = filepath
+        self.journal.compact(self.filepath)
         CONFIGURATION.add_recent_file(self.filepath)
+    
+    def recover(self, journal_filepath):
+        header, records = self.journal.read(journal_filepath)
+        filepath = header.get("filepath")
+        if not filepath or not os.path.isfile(filepath): filepath = None
+        with self.journal.paused():
+            if filepath:
+                with open(filepath, "r") as f:
+                    self.parseData(json.load(f))
+            self.journal.replay(records)
+        self.tabname = (PFileHandler.get_filename_without_extension(filepath) if filepath else "Lesson Editor") + " (recovered)"
+        self.filepath = filepath
+        self.journal.adopt(journal_filepath, self.filepath)
+    
+    def onTabClose(self):
+        self.journal.discard()
         
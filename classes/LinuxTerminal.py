@@ -1,21 +1,284 @@
-import shutil
+import shutil, re, fnmatch, itertools, collections, threading, queue, concurrent.futures, stat as _stat
+import tkinter.font
 from classes.Utilities import *
-import inspect
-from textwrap import dedent
+import classes._commands as _commands
+import classes._workers as _workers
+import classes._completion as _completion
+import classes._disk_usage as _disk_usage
+import classes._file_copy as _file_copy
+import classes._paging as _paging
 
 class _keywordArguments(typing.NamedTuple):
     tab: TabFrame
     current_working_directory: str
+    stdin: typing.Iterator[str] | None = None  # The lines piped in from the previous command, if any
+    cancelled: threading.Event | None = None  # Set when the command is cancelled or times out, for long-running work to stop
 
-class _FunctionDescription(typing.NamedTuple):
-    name: str
-    obj: typing.Callable
-    doc: str
-    args: list[dict[str: str | type]]
-    flags: list[str]
-    type_of_function: typing.Literal["general", "bash", "utility"]
-    description: str
-    shortened_description: str
+# Terminal functions run on the main thread, but the generators of lines they return are consumed on a worker thread,
+# so that reading large files never freezes the window. Generators must therefore not use the tab.
+
+_FunctionDescription = _commands.Command
+
+def _output_lines(result: typing.Any) -> typing.Iterator[str]:
+    """
+    Adapt the result of a terminal function into lines of output. Functions can return (or be) generators of lines, which
+    are passed through lazily, while other results are formatted as they always have been.
+    """
+    if isinstance(result, typing.Iterator):
+        for item in result:
+            if isinstance(item, str) and "\n" not in item: yield item
+            elif item is not None: yield from str(item).splitlines()
+    elif isinstance(result, (int, float, complex)):
+        yield f"Result = {smartRound(result)}"
+    elif isinstance(result, dict):
+        for item, value in result.items():
+            yield f"{item}: {smartRound(value) if isinstance(value, float) else value}"
+    elif result is not None:
+        yield from str(result).splitlines()
+
+def _read_lines(filepath: str) -> typing.Iterator[str]:
+    """Lazily read the lines of a text file, so that only the lines needed by the rest of a pipeline are read."""
+    with open(filepath, "r", errors="replace") as file:
+        for line in file:
+            yield line.rstrip("\n")
+
+def _tokenize(string: str) -> list[tuple[str, bool]]:
+    """
+    Split a command line into words at whitespace and at the operators |, > and >>, keeping quoted text ('like this' or
+    "like this") together, so that quoted operators are ordinary text. Backslashes are kept as they are, for Windows paths.
+    Unbalanced quotes are treated as ordinary characters.
+
+    Returns:
+        list[tuple[str, bool]]: The (text, is operator) tokens.
+    """
+    tokens, word, in_word, quote, i = [], [], False, None, 0
+    while i < len(string):
+        character = string[i]
+        if quote is not None:
+            if character == quote: quote = None
+            else: word.append(character)
+        elif character in "'\"" and string.find(character, i + 1) != -1:
+            quote, in_word = character, True
+        elif character.isspace() or character in "|>":
+            if in_word: tokens.append(("".join(word), False))
+            word, in_word = [], False
+            if character in "|>":
+                operator = ">>" if string.startswith(">>", i) else character
+                tokens.append((operator, True))
+                i += len(operator)
+                continue
+        else:
+            word.append(character)
+            in_word = True
+        i += 1
+    if in_word: tokens.append(("".join(word), False))
+    return tokens
+
+def _parse_pipeline(string: str) -> tuple[list[list[str]], tuple[str, str] | None] | str:
+    """
+    Split a command line into the words of its piped stages and its output redirection, e.g.
+    'cat big.log | grep "ERROR|WARNING" > errors.txt'. Only unquoted |, > and >> are operators.
+
+    Returns:
+        tuple[list[list[str]], tuple[str, str] | None] | str: The words of each stage, and the (filename, file mode) to
+            redirect the output to, if any. Or a message explaining why the command line is invalid.
+    """
+    stages, redirect, tokens = [[]], None, _tokenize(string)
+    for index, (text, is_operator) in enumerate(tokens):
+        if redirect is not None and index > redirect + 1: return "The output can only be redirected at the end of a command, e.g. 'ls > files.txt'."
+        if not is_operator: stages[-1].append(text)
+        elif redirect is not None: return "Missing filename to redirect the output to."
+        elif text == "|": stages.append([])
+        else: redirect = index
+    if redirect is None: return stages, None
+    if redirect + 1 >= len(tokens) or not tokens[redirect + 1][0]: return "Missing filename to redirect the output to."
+    filename = stages[-1].pop()
+    return stages, (filename, "a" if tokens[redirect][0] == ">>" else "w")
+
+def _entry_stat(entry: os.DirEntry) -> os.stat_result | None:
+    """Internal helper, getting the (cached) stat of a directory entry, without following symlinks."""
+    try:
+        return entry.stat(follow_symlinks=False)
+    except OSError:
+        return None
+
+_SORT_KEYS: dict[str, typing.Callable[[os.DirEntry], typing.Any]] = {
+    "name": lambda entry: entry.name.lower(),
+    "size": lambda entry: (-(stat.st_size if (stat := _entry_stat(entry)) else 0), entry.name.lower()),
+    "time": lambda entry: (-(stat.st_mtime if (stat := _entry_stat(entry)) else 0), entry.name.lower())}
+
+def _scan_directory(directory: str, sort: typing.Literal["name", "size", "time"] = "name") -> tuple[list[os.DirEntry], list[os.DirEntry]]:
+    """
+    List a directory with os.scandir, whose entries know whether they are directories without another stat call.
+
+    Returns:
+        tuple[list[os.DirEntry], list[os.DirEntry]]: The subdirectories (not following symlinks) and the files, sorted.
+    """
+    directories, files = [], []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                (directories if entry.is_dir(follow_symlinks=False) else files).append(entry)
+            except OSError:
+                files.append(entry)
+    directories.sort(key=_SORT_KEYS[sort])
+    files.sort(key=_SORT_KEYS[sort])
+    return directories, files
+
+def _format_entries(entries: list[os.DirEntry], long: bool, per_line: int = 8) -> typing.Iterator[str]:
+    """Internal helper, formatting directory entries for ls, several to a line or one per line with details from a single stat."""
+    if not long:
+        for i in range(0, len(entries), per_line):
+            yield "    ".join(entry.name for entry in entries[i:i + per_line])
+        return
+    minutes: dict[int, str] = dict()  # Formatted modification times, as most entries share a minute with others
+    for entry in entries:
+        stat = _entry_stat(entry)
+        if stat is None:
+            yield f"{'?' * 10} {'?':>12} {'?':>16}  {entry.name}"
+            continue
+        minute = int(stat.st_mtime // 60)
+        if minute not in minutes: minutes[minute] = datetime.datetime.fromtimestamp(minute * 60).strftime("%Y-%m-%d %H:%M")
+        yield f"{_stat.filemode(stat.st_mode)} {stat.st_size:>12} {minutes[minute]:>16}  {entry.name}"
+
+def _walk(directory: str) -> typing.Iterator[os.DirEntry]:
+    """Internal helper, lazily walking a directory tree with os.scandir (without following symlinks), skipping directories that cannot be opened."""
+    pending = [directory]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    yield entry
+                    try:
+                        if entry.is_dir(follow_symlinks=False): pending.append(entry.path)
+                    except OSError:
+                        pass
+        except OSError:
+            continue
+
+def _parse_size(text: str) -> tuple[int, int] | None:
+    """Internal helper, parsing a find -size value such as +10M into (the sign of the comparison, the number of bytes)."""
+    match = re.fullmatch(r"([+-]?)(\d+(?:\.\d+)?)([kKmMgG]?)", text)
+    if not match: return None
+    multiplier = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}[match.group(3).lower()]
+    return {"+": 1, "-": -1, "": 0}[match.group(1)], int(float(match.group(2)) * multiplier)
+
+GREP_BLOCK_SIZE = 8192  # The first block of a file, sniffed for null bytes to skip binary files
+GREP_IN_FLIGHT = 32  # The most files being searched at once
+GREP_BATCH_LINES = 1000  # Matches are passed on in batches of at most this many lines,
+GREP_BATCH_SECONDS = 0.1  # or every this many seconds, so that the matches in huge files appear as they are found
+
+def _transfer_paths(directory: str, source: str, destination: str) -> tuple[str, str] | str:
+    """
+    Resolve the paths of a cp or mv relative to the working directory. A destination that is an existing directory means
+    the source is copied (or moved) into it, keeping its name.
+
+    Returns:
+        tuple[str, str] | str: The source and destination paths, or a message explaining why they are invalid.
+    """
+    source_path = os.path.normpath(os.path.join(directory, source))
+    destination_path = os.path.normpath(os.path.join(directory, destination))
+    if not os.path.exists(source_path): return f"File '{source}' not found."
+    if os.path.isdir(destination_path): destination_path = os.path.join(destination_path, os.path.basename(source_path))
+    if os.path.abspath(destination_path) == os.path.abspath(source_path): return f"'{source}' and '{destination}' are the same file."
+    if os.path.isdir(source_path) and (destination_path + os.sep).startswith(source_path + os.sep): return f"Cannot copy '{source}' into itself."
+    return source_path, destination_path
+
+def _report_transfer(transfer: typing.Callable[..., typing.Iterator[None]], source: str, destination: str, verb: str, stop: threading.Event | None) -> typing.Iterator[str]:
+    """Run a copy or move (see _file_copy), printing its progress every second, any errors, and a summary when it finishes."""
+    progress = _file_copy.CopyProgress(verb)
+    for _ in transfer(source, destination, progress, stop):
+        yield progress.report()
+    if stop is not None and stop.is_set(): return
+    yield from progress.errors[:10]
+    if len(progress.errors) > 10: yield f"... and {len(progress.errors) - 10} more errors."
+    if progress.errors and verb == "Moved": yield f"Kept '{source}', as not all of it could be copied."
+    if progress.files or progress.errors: yield progress.report()
+
+def _parse_line_options(options: str, follow: bool = False) -> tuple[int, bool, str] | str:
+    """
+    Parse the options of head and tail: '[-n N | -N] [-f] [file]'.
+
+    Returns:
+        tuple[int, bool, str] | str: The number of lines, whether to follow the file, and the file (empty for the piped
+            input), or a message explaining why the options are invalid.
+    """
+    words, count, following, path = options.split(), 10, False, ""
+    while words:
+        word = words.pop(0)
+        if word == "-n":
+            if not words or not words[0].isdigit(): return "-n must be followed by a number of lines, e.g. '-n 20'."
+            count = int(words.pop(0))
+        elif word[1:].isdigit() and word.startswith("-"):
+            count = int(word[1:])
+        elif word == "-f" and follow:
+            following = True
+        elif word.startswith("-") or path:
+            return f"Usage: {'tail [-n lines] [-f]' if follow else 'head [-n lines]'} [file]"
+        else:
+            path = word
+    return count, following, path
+
+def _put_batch(output: queue.Queue, batch: list[str], stop: threading.Event) -> bool:
+    """Internal helper, passing a batch of grep matches on, waiting while the output is full. Returns False if stopped."""
+    while not stop.is_set():
+        try:
+            output.put(batch, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _grep_file(filepath: str, regex: re.Pattern, invert: bool, numbers: bool, prefix: str, stop: threading.Event, output: queue.Queue) -> None:
+    """
+    Internal helper, searching one file for grep and putting its matches on output in batches (see GREP_BATCH_LINES), so
+    that the matches of a huge file stream out and only a batch of them is held at once. Binary files (with a null byte in
+    their first block) and unreadable files are skipped.
+    """
+    try:
+        with open(filepath, "rb") as file:
+            if b"\0" in file.read(GREP_BLOCK_SIZE): return
+        batch, started = [], time.perf_counter()
+        with open(filepath, "r", encoding="utf-8", errors="replace") as file:
+            for number, line in enumerate(file, 1):
+                if (regex.search(line) is None) == invert:
+                    batch.append(f"{prefix}{f'{number}: ' if numbers else ''}{line.rstrip(chr(10))}")
+                if number % 4096 == 0 and stop.is_set(): return
+                if len(batch) >= GREP_BATCH_LINES or (batch and number % 4096 == 0 and time.perf_counter() - started >= GREP_BATCH_SECONDS):
+                    if not _put_batch(output, batch, stop): return
+                    batch, started = [], time.perf_counter()
+        if batch: _put_batch(output, batch, stop)
+    except OSError:
+        return
+
+def _grep_files(filepaths: typing.Iterator[str], regex: re.Pattern, invert: bool, numbers: bool, start: int | None) -> typing.Iterator[str]:
+    """
+    Internal helper, searching files on a thread pool for grep, with at most GREP_IN_FLIGHT files in flight. Matches are
+    yielded in batches as they are found, prefixed with their file's path (from index start) if start is given. The
+    batches of files searched at the same time may be interleaved. Closing the generator stops the search.
+    """
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=min(16, (os.cpu_count() or 1) + 4))
+    stop, pending, output = threading.Event(), set(), queue.Queue(maxsize=GREP_IN_FLIGHT)
+    filepaths, exhausted = iter(filepaths), False
+    try:
+        while True:
+            for future in [future for future in pending if future.done()]:
+                pending.remove(future)
+                future.result()
+            while not exhausted and len(pending) < GREP_IN_FLIGHT:
+                filepath = next(filepaths, None)
+                if filepath is None:
+                    exhausted = True
+                    break
+                pending.add(pool.submit(_grep_file, filepath, regex, invert, numbers, "" if start is None else f"{filepath[start:]}:", stop, output))
+            try:
+                yield from output.get(timeout=0.05)
+            except queue.Empty:
+                # Every batch is put before its search finishes, so nothing is left once every search has finished.
+                if exhausted and not pending: return
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
 
 class _terminal_funcs:
     def __example_func(arg1: str, arg2: int, f: bool, p: bool, kwargs) -> str:
@@ -82,10 +345,7 @@ class _terminal_funcs:
         """
         terminal = kwargs.tab
         terminal.print_(f"# Information on Function '{name}'")
-        description = None
-        for item in terminal.funcslist.keys():
-            if item == name:
-                description: _FunctionDescription = terminal.funcslist[item]
+        description: _FunctionDescription | None = terminal.funcslist.get(name)
         if not description: return f"Could not find function '{name}' in function list. Refer to help menu for a list of available functions."
         return description.description + "\n"
 
@@ -138,36 +398,47 @@ class _terminal_funcs:
         """
         return kwargs.current_working_directory
 
-    def ls(l: bool = False, a: bool = False, d: bool = False, f: bool = False, kwargs: _keywordArguments = None) -> str:
+    def ls(path: str = "", l: bool = False, a: bool = False, d: bool = False, f: bool = False, R: bool = False, S: bool = False, t: bool = False, kwargs: _keywordArguments = None) -> typing.Iterator[str] | str:
         """@type: bash
-        List all files and directories within the current working directory.
+        List all files and directories within the current working directory, or a given directory.
 
         Arguments:
-            (None)
+            path (str): The directory to list. Defaults to the current working directory.
         
         Flags:
-            l: Print in list form instead of tab form.
+            l: Print in long form, one entry per line with its permissions, size and modification time.
             a: Print files and directories together in alphabetical order.
             d: Print directories only.
             f: Print files only.
+            R: List subdirectories recursively.
+            S: Sort by size, largest first.
+            t: Sort by modification time, newest first.
         """
-        directories, files = [], []
-        all_items = os.listdir(kwargs.current_working_directory)
-        for item in all_items:
-            item_path = os.path.join(kwargs.current_working_directory, item)
-            if os.path.isdir(item_path): directories.append(item)
-            elif os.path.isfile(item_path): files.append(item)
-        
-        if a:
-            return "    ".join(all_items) if not l else "\n".join(all_items)
-        elif d:
-            return "    ".join(directories) if not l else "\n".join(directories)
-        elif f:
-            return "    ".join(files) if not l else "\n".join(files)
-        else:
-            one = "    ".join(directories) if not l else "\n".join(directories)
-            two = "    ".join(files) if not l else "\n".join(files)
-            return one + "\n" + two
+        directory = os.path.join(kwargs.current_working_directory, path) if path else kwargs.current_working_directory
+        if not os.path.isdir(directory): return f"Directory '{path}' not found."
+        sort = "size" if S else "time" if t else "name"
+
+        def listing() -> typing.Iterator[str]:
+            # Directories are listed one at a time as they are scanned, so that recursive listings stream.
+            pending = [directory]
+            while pending:
+                current = pending.pop()
+                if R: yield f"{current}:"
+                try:
+                    directories, files = _scan_directory(current, sort)
+                except OSError as e:
+                    yield f"Could not open directory '{current}'. Error type: {str(e)}"
+                    continue
+                if a: groups = [sorted(directories + files, key=_SORT_KEYS[sort])]
+                elif d: groups = [directories]
+                elif f: groups = [files]
+                else: groups = [directories, files]
+                for entries in groups:
+                    yield from _format_entries(entries, l)
+                if R:
+                    yield ""
+                    pending.extend(entry.path for entry in reversed(directories))
+        return listing()
     
     def touch(filename: str, kwargs: _keywordArguments = None) -> None:
         """@type: bash
@@ -223,6 +494,35 @@ class _terminal_funcs:
             (None)"""
         os.mkdir(os.path.join(kwargs.current_working_directory, dirname))
     
+    def cp(source: str, destination: str, r: bool = False, kwargs: _keywordArguments = None) -> typing.Iterator[str] | str:
+        """@type: bash
+        Copy a file, or a directory with -r, printing the progress of large copies, e.g. 'cp -r classes backup'.
+        
+        Arguments:
+            source (str): The file or directory to copy.
+            destination (str): The new file or directory, or an existing directory to copy into.
+        
+        Flags:
+            r: Copy a directory and everything in it, copying many files at once."""
+        paths = _transfer_paths(kwargs.current_working_directory, source, destination)
+        if isinstance(paths, str): return paths
+        if os.path.isdir(paths[0]) and not r: return f"'{source}' is a directory. Use -r to copy it."
+        return _report_transfer(_file_copy.copy, *paths, "Copied", kwargs.cancelled)
+    
+    def mv(source: str, destination: str, kwargs: _keywordArguments = None) -> typing.Iterator[str] | str:
+        """@type: bash
+        Move or rename a file or directory. Moving to another drive copies it, printing the progress, and then deletes the original.
+        
+        Arguments:
+            source (str): The file or directory to move.
+            destination (str): The new path, or an existing directory to move into.
+        
+        Flags:
+            (None)"""
+        paths = _transfer_paths(kwargs.current_working_directory, source, destination)
+        if isinstance(paths, str): return paths
+        return _report_transfer(_file_copy.move, *paths, "Moved", kwargs.cancelled)
+    
     def putils(filename: str, kwargs: _keywordArguments) -> None:
         """@type: utility
         Open a file with it's given PUtilities tab. Not recommended for large files.
@@ -235,19 +535,221 @@ class _terminal_funcs:
         if not PFileHandler.filepath_exists(os.path.join(kwargs.current_working_directory, filename)): return f"File '{filename}' not found to open."
         kwargs.tab.window.open_file_in_specific_tab(os.path.join(kwargs.current_working_directory, filename))
     
-    def cat(filename: str, kwargs: _keywordArguments) -> None:
+    def cat(filename: str = "", kwargs: _keywordArguments = None) -> typing.Iterator[str] | str:
         """@type: bash
-        Print out a file within the current working directory.
+        Print out a file within the current working directory, or the piped input if no filename is given.
         
         Arguments:
             filename (str): The filename of the file to print out in the current working directory.
         
         Flags:
             (None)"""
-        if not PFileHandler.filepath_exists(os.path.join(kwargs.current_working_directory, filename)):
-            print(f"File '{filename}' not found.")
-        with open(os.path.join(kwargs.current_working_directory, filename), "r") as f:
-            kwargs.tab.print_(f.read())
+        if not filename: return kwargs.stdin or iter(())
+        filepath = os.path.join(kwargs.current_working_directory, filename)
+        if not os.path.isfile(filepath): return f"File '{filename}' not found."
+        return _read_lines(filepath)
+    
+    def head(options: str = "", kwargs: _keywordArguments = None) -> typing.Iterator[str] | str:
+        """@type: bash
+        Print the first lines of a file (or of the piped input), e.g. 'head -n 20 log.txt'. Only those lines are read.
+        
+        Arguments:
+            options (str): The file, and -n N (or -N) for the number of lines to print (10 by default).
+        
+        Flags:
+            (None)"""
+        options = _parse_line_options(options)
+        if isinstance(options, str): return options
+        count, _, path = options
+        if not path: return itertools.islice(kwargs.stdin or iter(()), count)
+        filepath = os.path.join(kwargs.current_working_directory, path)
+        if not os.path.isfile(filepath): return f"File '{path}' not found."
+
+        def first_lines() -> typing.Iterator[str]:
+            lines = _read_lines(filepath)
+            try:
+                yield from itertools.islice(lines, count)
+            finally:
+                lines.close()
+        return first_lines()
+    
+    def tail(options: str = "", kwargs: _keywordArguments = None) -> typing.Iterator[str] | str | None:
+        """@type: bash
+        Print the last lines of a file (or of the piped input), e.g. 'tail -n 20 log.txt'. Files are read backwards from the end, so huge files are instant.
+        
+        Arguments:
+            options (str): The file, -n N (or -N) for the number of lines to print (10 by default), and -f to keep printing the lines added to the file until cancelled with Ctrl+C.
+        
+        Flags:
+            (None)"""
+        options = _parse_line_options(options, follow=True)
+        if isinstance(options, str): return options
+        count, following, path = options
+        if not path:
+            if following: return "Give a file to follow, e.g. 'tail -f log.txt'."
+
+            def last_piped_lines() -> typing.Iterator[str]:
+                # Kept lazily, so that the piped input is read on the worker thread.
+                yield from collections.deque(kwargs.stdin or (), maxlen=count)
+            return last_piped_lines()
+        filepath = os.path.join(kwargs.current_working_directory, path)
+        if not os.path.isfile(filepath): return f"File '{path}' not found."
+        if following:
+            def last_lines_then_follow() -> typing.Iterator[list[str] | None]:
+                lines, position = _paging.tail_lines(filepath, count)
+                yield lines
+                yield from _paging.follow(filepath, position)
+            kwargs.tab.follow(last_lines_then_follow())
+            return None
+
+        def last_lines() -> typing.Iterator[str]:
+            yield from _paging.tail_lines(filepath, count)[0]
+        return last_lines()
+    
+    def less(filename: str, kwargs: _keywordArguments = None) -> str | None:
+        """@type: utility
+        Page through a file in a new window, reading only the page being shown, so huge files open instantly.
+        Space or Page Down shows the next page, b or Page Up the previous page, the arrow keys (or j and k) scroll by a line, g and G go to the start and the end, and q closes it.
+        
+        Arguments:
+            filename (str): The file in the current working directory to page through.
+        
+        Flags:
+            (None)"""
+        filepath = os.path.join(kwargs.current_working_directory, filename)
+        if not os.path.isfile(filepath): return f"File '{filename}' not found."
+        Pager(kwargs.tab, filepath)
+    
+    def grep(pattern: str, path: str = "", r: bool = False, i: bool = False, v: bool = False, n: bool = False, kwargs: _keywordArguments = None) -> typing.Iterator[str] | str:
+        """@type: bash
+        Print the lines of a file (or the piped lines) that match a regular expression, e.g. 'grep -r TODO classes'.
+        
+        Arguments:
+            pattern (str): The regular expression to search for.
+            path (str): The file, or directory with -r, to search. Searches the piped lines if not given.
+        
+        Flags:
+            r: Search every file in a directory and its subdirectories, skipping binary files.
+            i: Ignore case.
+            v: Print the lines that do not match instead.
+            n: Print line numbers."""
+        try:
+            regex = re.compile(pattern, re.IGNORECASE if i else 0)
+        except re.error as e:
+            return f"Invalid regular expression '{pattern}'. Error type: {str(e)}"
+        if not path:
+            if kwargs.stdin is None: return "Nothing to search. Give a file to search, or pipe text into grep, e.g. 'cat log.txt | grep ERROR'."
+            return (f"{number}: {line}" if n else line for number, line in enumerate(kwargs.stdin, 1) if (regex.search(line) is None) == v)
+        target = os.path.join(kwargs.current_working_directory, path)
+        if os.path.isdir(target):
+            if not r: return f"'{path}' is a directory. Use -r to search the files in it."
+            files = (entry.path for entry in _walk(target) if not entry.is_dir(follow_symlinks=False))
+            return _grep_files(files, regex, v, n, len(target.rstrip(os.sep)) + 1)
+        if not os.path.isfile(target): return f"File '{path}' not found."
+        return _grep_files(iter([target]), regex, v, n, None)
+    
+    def find(expression: str = "", kwargs: _keywordArguments = None) -> typing.Iterator[str] | str:
+        """@type: bash
+        Find the files and directories under the current working directory whose names match a pattern, e.g. 'find *.py -type f -size +10k'.
+        
+        Arguments:
+            expression (str): The name pattern (with * and ? wildcards, or a part of the name), an optional directory to search, and these options:
+                -type f|d: Only find files (f) or directories (d).
+                -size [+|-]N[k|M|G]: Only find files larger (+) or smaller (-) than, or exactly, N bytes (or kilobytes, megabytes, gigabytes).
+        
+        Flags:
+            (None)"""
+        words, positional, type_, size = expression.split(), [], None, None
+        while words:
+            word = words.pop(0)
+            if word in ["-type", "-size"] and not words: return f"Missing value for '{word}'."
+            if word == "-type":
+                type_ = words.pop(0)
+                if type_ not in ["f", "d"]: return "-type must be f (files) or d (directories)."
+            elif word == "-size":
+                size = _parse_size(words.pop(0))
+                if size is None: return "-size must be a number of bytes with an optional +/- and k, M or G, e.g. +10M."
+            elif word.startswith("-") and len(word) > 1:
+                return f"Unknown option '{word}'. Usage: find <pattern> [directory] [-type f|d] [-size [+|-]N[k|M|G]]"
+            else:
+                positional.append(word)
+        if len(positional) > 2: return "Usage: find <pattern> [directory] [-type f|d] [-size [+|-]N[k|M|G]]"
+        pattern = positional[0] if positional else "*"
+        if not any(character in pattern for character in "*?["): pattern = f"*{pattern}*"
+        root = os.path.join(kwargs.current_working_directory, positional[1]) if len(positional) > 1 else kwargs.current_working_directory
+        if not os.path.isdir(root): return f"Directory '{positional[1]}' not found."
+
+        def matches() -> typing.Iterator[str]:
+            start = len(root.rstrip(os.sep)) + 1
+            for entry in _walk(root):
+                if not fnmatch.fnmatch(entry.name, pattern): continue
+                is_directory = entry.is_dir(follow_symlinks=False)
+                if type_ is not None and is_directory != (type_ == "d"): continue
+                if size is not None:
+                    if is_directory or (stat := _entry_stat(entry)) is None: continue
+                    comparison, limit = size
+                    if comparison != (stat.st_size > limit) - (stat.st_size < limit): continue
+                yield entry.path[start:] + (os.sep if is_directory else "")
+        return matches()
+    
+    def du(options: str = "", kwargs: _keywordArguments = None) -> typing.Iterator[str] | str:
+        """@type: bash
+        Print the total size of a directory and its subdirectories, e.g. 'du -h -d 1 classes'.
+        
+        Arguments:
+            options (str): An optional directory (defaults to the current working directory), and these options:
+                -h: Print sizes in human-readable units (K, M, G) instead of kilobytes.
+                -d N: Only print the subdirectories up to N levels deep.
+        
+        Flags:
+            (None)"""
+        words, human, depth, path = options.split(), False, None, ""
+        while words:
+            word = words.pop(0)
+            if word in ["-h", "-hd", "-dh"]: human = True
+            if word in ["-d", "-hd", "-dh"]:
+                if not words or not words[0].isdigit(): return "-d must be followed by a depth, e.g. 'du -d 1'."
+                depth = int(words.pop(0))
+            elif word != "-h":
+                if word.startswith("-") or path: return "Usage: du [-h] [-d depth] [directory]"
+                path = word
+        root = os.path.join(kwargs.current_working_directory, path) if path else kwargs.current_working_directory
+        if not os.path.isdir(root): return f"Directory '{path}' not found."
+        root = os.path.normpath(root)
+
+        def usage() -> typing.Iterator[str]:
+            totals = _disk_usage.USAGE.totals(root, kwargs.cancelled)
+            if kwargs.cancelled is not None and kwargs.cancelled.is_set(): return
+            start = len(root.rstrip(os.sep)) + 1
+            # Deepest directories first, and the directory itself last, as du does.
+            for directory in sorted(totals, key=lambda directory: (-directory.count(os.sep), directory)):
+                relative = directory[start:] if directory != root else (path or ".")
+                if directory != root and depth is not None and relative.count(os.sep) + 1 > depth: continue
+                size = totals[directory]
+                yield f"{_disk_usage.format_size(size) if human else (size + 1023) // 1024}\t{relative}"
+        return usage()
+    
+    def wc(l: bool = False, w: bool = False, c: bool = False, kwargs: _keywordArguments = None) -> typing.Iterator[str]:
+        """@type: bash
+        Count the lines, words and characters of the piped input, e.g. 'cat log.txt | grep ERROR | wc -l'.
+        
+        Arguments:
+            (None)
+        
+        Flags:
+            l: Print the number of lines only.
+            w: Print the number of words only.
+            c: Print the number of characters only."""
+        def count() -> typing.Iterator[str]:
+            # Counted lazily, so that the piped input is read on the worker thread.
+            lines = words = characters = 0
+            for line in kwargs.stdin or ():
+                lines += 1
+                words += len(line.split())
+                characters += len(line) + 1
+            counts = [count for count, flag in [(lines, l), (words, w), (characters, c)] if flag] or [lines, words, characters]
+            yield " ".join(str(count) for count in counts)
+        return count()
     
     def clear(kwargs: _keywordArguments) -> None:
         """@type: utility
@@ -260,10 +762,80 @@ class _terminal_funcs:
             (None)"""
         kwargs.tab.clearAll()
 
+class Pager(tk.Toplevel):
+    """
+    A less-style window showing one page of a file at a time. Pages are addressed by the byte offset of their first line
+    (see _paging), so only the page being shown is ever read.
+    """
+    def __init__(self, master, filepath: str) -> None:
+        super().__init__(master=master)
+        self.title(f"less - {os.path.basename(filepath)}")
+        self.geometry("900x600")
+        self.file = _paging.PagedFile(filepath)
+        self.top = self.bottom = 0  # The offsets of the first line shown and of the line after the page
+        self.page_lines = 30
+
+        self.text = tk.Text(self, wrap="none", state=tk.DISABLED, font=("Courier", 10))
+        self.text.pack(expand=1, fill="both")
+        self.status = ttk.Label(self, anchor="w")
+        self.status.pack(fill="x")
+
+        for keys, action in [(["<space>", "<Next>", "f"], self.next_page), (["b", "<Prior>"], self.previous_page),
+                             (["<Down>", "j", "<Return>"], lambda: self.scroll(1)), (["<Up>", "k"], lambda: self.scroll(-1)),
+                             (["g", "<Home>"], self.start), (["G", "<End>"], self.end), (["q", "<Escape>"], self.destroy)]:
+            for key in keys:
+                self.bind(key, lambda event, action=action: action())
+        self.bind("<MouseWheel>", lambda event: self.scroll(-3 if event.delta > 0 else 3))
+        self.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.bind("<Button-5>", lambda event: self.scroll(3))
+        self.text.bind("<Configure>", self.resize)
+        self.text.bind("<Destroy>", lambda event: self.file.close())
+        self.show()
+        self.focus_set()
+
+    def show(self) -> None:
+        lines, self.bottom = self.file.lines_after(self.top, self.page_lines)
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(lines))
+        self.text.config(state=tk.DISABLED)
+        size = self.file.size
+        percentage = 100 if size == 0 else round(100 * self.bottom / size)
+        self.status.config(text=f"{os.path.basename(self.file.filepath)}  {percentage}%  (bytes {self.top}-{self.bottom} of {size})    Space/b: page, arrows: line, g/G: start/end, q: close")
+
+    def resize(self, event=None) -> None:
+        linespace = tkinter.font.Font(font=self.text["font"]).metrics("linespace")
+        page_lines = max(1, event.height // linespace)
+        if page_lines != self.page_lines:
+            self.page_lines = page_lines
+            self.show()
+
+    def next_page(self) -> None:
+        if self.bottom < self.file.size: self.top = self.bottom
+        self.show()
+
+    def previous_page(self) -> None:
+        self.top = self.file.line_start_before(self.top, self.page_lines)
+        self.show()
+
+    def scroll(self, lines: int) -> None:
+        if lines > 0 and self.bottom < self.file.size: self.top = self.file.lines_after(self.top, lines)[1]
+        elif lines < 0: self.top = self.file.line_start_before(self.top, -lines)
+        self.show()
+
+    def start(self) -> None:
+        self.top = 0
+        self.show()
+
+    def end(self) -> None:
+        self.top = self.file.last_lines_start(self.page_lines)
+        self.show()
+
 class LinuxTerminal(TabFrame):
     _name = "Linux Terminal"
     _description = "A linux terminal emulator with access to file commands."
     _icon = "linux terminal icon.png"
+    STREAM_SECONDS = 0.03  # The longest a command's output may be written for before the window is updated
 
     def init(self):
         self.tabname = "Linux Terminal"
@@ -274,7 +846,16 @@ class LinuxTerminal(TabFrame):
         self.entry.pack(expand=1, fill="x")
         self.entry.bind("<Return>", self.execute)
         self.entry.bind("<Up>", self.add_previous_command)
+        self.entry.bind("<Control-c>", self.cancel_stream)
+        self.entry.bind("<Escape>", self.cancel_stream)
+        self.entry.bind("<Tab>", self.complete)
+        self.streaming: typing.Iterator[list[str] | None] | None = None
+        self.stream_deadline: float | None = None
+        self.redirect_file: typing.TextIO | None = None
+        self.following: typing.Iterator[list[str] | None] | None = None
+        self.cancelled = threading.Event()
         self.filepath = PFileHandler.ROOT_FILEPATH
+        _completion.DIRECTORIES.prefetch(self.filepath)
         self.print_(f"PUtilities Linux Terminal Emulator.\nType 'help' for more details.\n\n")
         self.print_entry_prompt()
         self.create_funcslist()
@@ -291,8 +872,17 @@ class LinuxTerminal(TabFrame):
     def print_entry_prompt(self) -> None:
         self.print_(f"@PUtilities ~ $ ", end="")
     
+    def complete(self, event=None) -> str:
+        candidates, total = _completion.complete_entry(self.entry, self.funcslist, self.filepath)
+        if candidates:
+            self.print_(self.entry.get())
+            self.print_("    ".join(candidates) + (f"\n... and {total - len(candidates)} more" if total > len(candidates) else ""))
+            self.print_entry_prompt()
+        return "break"  # Keep the focus in the entry
+
     def change_working_directory(self, new_directory: str) -> None:
         self.filepath = new_directory
+        _completion.DIRECTORIES.prefetch(new_directory)
     
     def print_(self, text: str = "", end: str = "\n") -> None:
         self.textbox.text_widget.config(state=tk.NORMAL)
@@ -301,87 +891,145 @@ class LinuxTerminal(TabFrame):
         self.textbox.text_widget.config(state=tk.DISABLED)
     
     def create_funcslist(self) -> None:
-        method_names = [name for name, obj in vars(_terminal_funcs).items() if (inspect.isfunction(obj) or inspect.ismethod(obj)) and not name.startswith("__")]
-        self.funcslist: dict[str: _FunctionDescription] = dict()
-        for name in method_names:
-            obj = getattr(_terminal_funcs, name)
-            if inspect.isfunction(obj) or inspect.ismethod(obj):
-                doc = dedent(inspect.getdoc(obj).strip())
-                signature = inspect.signature(obj)
-                args = []
-                flags = []
-                for param in signature.parameters.values():
-                    nameOfArg = param.name
-                    if nameOfArg == "kwargs":
-                        continue
-                    elif len(nameOfArg) == 1:
-                        flags.append(nameOfArg)
-                        continue
-                    argType = param.annotation if param.annotation is not inspect.Parameter.empty else str
-                    args.append({"name": nameOfArg, "type": argType})
-                self.funcslist[name] = _FunctionDescription(name, obj, doc, args, flags, doc.splitlines()[0][7:].strip().lower(), "\n".join(doc.splitlines()[1:]).strip(), doc.splitlines()[1].strip())
+        # The registry is shared by every Linux Terminal tab, and only built the first time one is opened.
+        self.funcslist: dict[str, _FunctionDescription] = _commands.get_registry(_terminal_funcs, single_letter_flags=True)
 
     def execute(self, event=None) -> None:
+        if self.streaming is not None: return  # Wait for the running command to finish, or cancel it with Ctrl+C
         raw_string = self.entry.get()
         self.previous_command = raw_string
         self.print_(raw_string)
         self.entry.delete(0, tk.END)
-        
-        split_string = raw_string.strip().split()
-        if not split_string: self.print_entry_prompt(); return
-        
-        command = split_string[0].lower()
-        split_string.pop(0)
-        args, flags = [], []
-        for text in split_string:
-            if text.startswith("-"):
-                flags += list(text[1:])
+        if not raw_string.strip(): self.print_entry_prompt(); return
+
+        pipeline = _parse_pipeline(raw_string)
+        if isinstance(pipeline, str): self.print_(pipeline); self.print_entry_prompt(); return
+        stages, redirect = pipeline
+        self.cancelled = threading.Event()
+        lines = None
+        for words in stages:
+            lines = self.run_command(words, lines)
+            if lines is None: break
+        following, self.following = self.following, None
+        if following is not None and (lines is None or len(stages) > 1):
+            following.close()
+            if lines is not None: self.print_("'tail -f' cannot be piped into other commands.")
+            lines = None
+        if lines is None: self.print_entry_prompt(); return
+        if redirect:
+            filename, mode = redirect
+            try:
+                self.redirect_file = open(os.path.join(self.filepath, filename), mode)
+            except OSError as e:
+                if following is not None: following.close()
+                self.print_(f"Could not open '{filename}' for writing. Error type: {str(e)}"); self.print_entry_prompt(); return
+        if following is not None:
+            # Followed on the window's scheduler (see follow()), with no time limit, instead of on a worker thread.
+            self.streaming, self.stream_deadline = following, None
+            self.after(0, self.stream_chunk)
+            return
+        self.stream(lines)
+
+    def run_command(self, words: list[str], stdin: typing.Iterator[str] | None = None) -> typing.Iterator[str] | None:
+        """
+        Run a single command of a pipeline.
+
+        Arguments:
+            words (list[str]): The command and its arguments and flags.
+            stdin (Iterator[str] | None): The lines piped in from the previous command, if any.
+
+        Returns:
+            Iterator[str] | None: The lines of output, produced lazily, or None if the command could not be run.
+        """
+        if not words:
+            self.print_("Missing command in pipeline."); return None
+        command = words[0].lower()
+        function = self.funcslist.get(command)
+        if not function:
+            self.print_(f"Function '{command}' not found. Type 'help' for a list of commands."); return None
+        # Commands without flags (such as find) parse their own options, so they get every word as an argument.
+        args, flags = [], set()
+        for text in words[1:]:
+            if text.startswith("-") and len(text) > 1 and function.flags:
+                flags.update(text[1:])
             else:
                 args.append(text)
-        flags = set(flags)
-        function = None
-        for func in self.funcslist.keys():
-            if func == command:
-                function: _FunctionDescription = self.funcslist[func]
-        if not function:
-            self.print_(f"Function '{command}' not found. Type 'help' for a list of commands."); return
-        if len(args) < len(function.args):
-            self.print_(f"Incorrect number of arguments passed into function '{command}'."); return
-        while len(args) != len(function.args):
-            args[-2] = f"{args[-2]} {args[-1]}"
-            args.pop(-1)
-        i = 0
-        while i < len(args):
-            target = function.args[i]["type"]
-            if target == float:
-                args[i] = toFloat(args[i])
-            elif target == int:
-                args[i] = toInt(args[i])
-            elif target == bool:
-                args[i] = False if args[i].lower() in ["no", "false", "0", "n", "not", "0.0"] else True
-            i += 1
-        args = tuple(args)
-        new_flags = []
-        for flag in function.flags:
-            if flag in flags:
-                new_flags.append(flags)
-        kwargs = _keywordArguments(self, self.filepath)
-        new_flags = tuple(new_flags)
+        args = function.convert(args)
+        if args is None:
+            self.print_(f"Incorrect number of arguments passed into function '{command}'."); return None
+        new_flags = {flag: True for flag in function.flags if flag in flags}
+        kwargs = _keywordArguments(self, self.filepath, stdin, self.cancelled)
         try:
-            result = function.obj.__call__(*args, *new_flags, kwargs=kwargs)
+            result = function.obj(*args, **new_flags, kwargs=kwargs)
         except Exception as e:
-            self.print_(f"Error in running function '{command}'. Error type: {str(e)}. Please try again."); return
-
-        if isinstance(result, (int, float, complex)):
-            self.print_(f"Result = {smartRound(result)}")
-        elif isinstance(result, dict):
-            for item in result.keys():
-                if isinstance(result[item], float):
-                    result[item] = smartRound(result[item])
-                self.print_(f"{item}: {result[item]}")
-        elif result is None:
-            self.print_(end="")
-        else:
-            self.print_(str(result))
+            self.print_(f"Error in running function '{command}'. Error type: {str(e)}. Please try again."); return None
+        return _output_lines(result)
 
-        self.print_entry_prompt()
+    def follow(self, batches: typing.Iterator[list[str] | None]) -> None:
+        """
+        Follow a source of lines once the current command has run, until it is cancelled with Ctrl+C (used by 'tail -f').
+
+        Arguments:
+            batches (Iterator[list[str] | None]): Yields lists of new lines, or None if there are none yet. Each step is
+                taken on the main thread, so it must not block.
+
+        Returns: None
+        """
+        self.following = batches
+
+    def stream(self, lines: typing.Iterator[str]) -> None:
+        """Write the lines of output of a pipeline to the terminal (or the redirect file) as a worker thread produces them, without blocking the window."""
+        self.streaming = _workers.iterate_in_thread(lines)
+        timeout = CONFIGURATION.command_timeout
+        self.stream_deadline = time.perf_counter() + timeout if timeout else None
+        self.after(0, self.stream_chunk)
+
+    def stream_chunk(self) -> None:
+        if self.streaming is None: return
+        if self.stream_deadline is not None and time.perf_counter() > self.stream_deadline:
+            self.streaming.close()
+            self.print_(f"Stopped after {smartRound(CONFIGURATION.command_timeout)} seconds. The time limit can be changed in the configuration (command_timeout).")
+            self.finish_stream()
+            return
+        chunk, finished, waiting, error = [], False, False, None
+        deadline = time.perf_counter() + self.STREAM_SECONDS
+        try:
+            while time.perf_counter() < deadline:
+                batch = next(self.streaming)
+                if batch is None:
+                    waiting = True
+                    break
+                chunk += batch
+        except StopIteration:
+            finished = True
+        except Exception as e:
+            error, finished = e, True
+        self.write_lines(chunk)
+        if error is not None: self.print_(f"Error in running command. Error type: {str(error)}.")
+        if finished: self.finish_stream()
+        else: self.after(10 if waiting else 1, self.stream_chunk)
+
+    def write_lines(self, lines: list[str]) -> None:
+        if not lines: return
+        if self.redirect_file: self.redirect_file.write("\n".join(lines) + "\n")
+        else: self.print_("\n".join(lines))
+
+    def cancel_stream(self, event=None) -> str | None:
+        if self.streaming is None: return None  # Let Ctrl+C copy as normal
+        self.streaming.close()
+        self.print_("^C Cancelled.")
+        self.finish_stream()
+        return "break"
+
+    def finish_stream(self, prompt: bool = True) -> None:
+        self.streaming = None
+        self.cancelled.set()
+        if self.redirect_file:
+            self.redirect_file.close()
+            self.redirect_file = None
+        if prompt: self.print_entry_prompt()
+
+    def onTabClose(self) -> None:
+        if self.streaming is not None:
+            self.streaming.close()
+            self.finish_stream(prompt=False)
@@ -258,7 +258,8 @@ class SettingsDialogue(tk.Toplevel):
         self.destroy()
 
     def apply(self) -> None:
-        data = dict()
+        # Start from the current configuration, so that keys without a settings panel (such as cps_highscore) are kept.
+        data = CONFIGURATION.get_all().copy()
         for name in self.menuOptions.keys():
             data = data | self.menuOptions[name].save()
         data["recent_files"] = CONFIGURATION.recent_files
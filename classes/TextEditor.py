@@ -1,4 +1,7 @@
 from classes.Utilities import *
+from classes._journal import DocumentJournal
+from classes._highlighting import HighlightManager, get_highlighter
+from classes._undo import UndoManager
 
 class TextEditor(TabFrame):
     _name = "Text Editor"
@@ -10,8 +13,13 @@ class TextEditor(TabFrame):
         self.tabname = "Text Editor"
         self.textbox = ScrollableTextBox(self)
         self.textbox.pack(expand=1, fill="both")
+        self.journal = DocumentJournal(self, "text", {"text": self.textbox})
+        self.highlighting = HighlightManager(self.textbox)
+        self.undo = UndoManager(self.textbox)
     
     def createTabCommands(self):
+        self.addTabFunction("Undo (Ctrl+Z)", self.undo.undo)
+        self.addTabFunction("Redo (Ctrl+Y)", self.undo.redo)
         self.addTabFunction("Insert Date", lambda: self.textbox.insertAtEnd(datetime.datetime.now().strftime("%d/%m/%Y")))
         self.addTabFunction("Clear Text", self.textbox.clear)
     
@@ -21,6 +29,7 @@ class TextEditor(TabFrame):
             return
         with open(self.filepath, "w") as f:
             f.write(self.textbox.getAll())
+        self.journal.compact(self.filepath)
         CONFIGURATION.add_recent_file(self.filepath)
     
     def saveAs(self):
@@ -31,33 +40,63 @@ class TextEditor(TabFrame):
             return
         self.filepath = savepath
         self.tabname = get_filename_of_filepath(savepath)
+        self.highlighting.set_highlighter(get_highlighter(self.filepath))
         self.save()
         CONFIGURATION.add_recent_file(self.filepath)
     
     def open(self) -> None:
         if self.filepath:
             self.save()
-        loadpath = filedialog.askopenfilename(title="Open Text Document", filetypes=[("Text Document", "*.txt"), ("Markdown File", "*.md"), ("All Files", "*.*")])
+        loadpath = filedialog.askopenfilename(title="Open Text Document", filetypes=[("Text Document", "*.txt"), ("Markdown File", "*.md"), ("Python File", "*.py"), ("JSON File", "*.json"), ("INI File", "*.ini"), ("All Files", "*.*")])
         if not loadpath:
             return
         self.filepath = loadpath
         with open(self.filepath, "r") as f:
-            self.textbox.clear()
-            self.textbox.insertAtStart(f.read())
+            self.loadText(f.read())
+        self.journal.compact(self.filepath)
         CONFIGURATION.add_recent_file(self.filepath)
     
     def new(self):
         if self.filepath:
             self.save()
-        self.textbox.clear()
         self.filepath = None
+        self.loadText("")
+        self.journal.compact(None)
     
     def autoload(self, filepath):
         if not filepath or not os.path.exists(filepath) or not os.path.isfile(filepath): return
         if self.filepath: self.save()
+        self.filepath = filepath
         with open(filepath, "r") as f:
-            self.textbox.clear()
-            self.textbox.insertAtEnd(f.read())
+            self.loadText(f.read())
         self.tabname = PFileHandler.get_filename_without_extension(filepath)
-        self.filepath = filepath
-        CONFIGURATION.add_recent_file(self.filepath)
\ No newline at end of file
+        self.journal.compact(self.filepath)
+        CONFIGURATION.add_recent_file(self.filepath)
+    
+    def recover(self, journal_filepath):
+        header, records = self.journal.read(journal_filepath)
+        filepath = header.get("filepath")
+        self.filepath = filepath if filepath and os.path.isfile(filepath) else None
+        self.highlighting.set_highlighter(None)
+        self.undo.reset()
+        with self.journal.paused(), self.undo.paused():
+            self.textbox.clear()
+            if self.filepath:
+                with open(self.filepath, "r") as f:
+                    self.textbox.insertAtEnd(f.read())
+            self.journal.replay(records)
+        self.highlighting.set_highlighter(get_highlighter(self.filepath))
+        self.tabname = (PFileHandler.get_filename_without_extension(self.filepath) if self.filepath else "Text Editor") + " (recovered)"
+        self.journal.adopt(journal_filepath, self.filepath)
+    
+    def loadText(self, text: str) -> None:
+        """Replace the text box's contents with a freshly loaded file, without journalling the load, recording it in the undo history or highlighting it line by line."""
+        self.highlighting.set_highlighter(None)
+        self.undo.reset()
+        with self.journal.paused(), self.undo.paused():
+            self.textbox.clear()
+            self.textbox.insertAtEnd(text)
+        self.highlighting.set_highlighter(get_highlighter(self.filepath))
+    
+    def onTabClose(self):
+        self.journal.discard()
\ No newline at end of file
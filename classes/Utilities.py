@@ -4,7 +4,8 @@ PUtilties TabFrame and other Utilities used in the developement process. It is r
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import typing, os, sys, math, time, random, datetime, pathlib, json, pickle, configparser, abc
+import typing, os, sys, math, time, random, datetime, pathlib, json, pickle, configparser, abc, heapq
+import classes._expressions as expressions
 
 LOWERCASE = list("abcdefghijklmnopqrstuvwxyz")
 UPPERCASE = list("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
@@ -245,6 +246,15 @@ class TabFrame(ttk.Frame, abc.ABC):
         Returns: None"""
         ...
     
+    def recover(self, journal_filepath: str) -> None:
+        """Blank method for recovering unsaved work from a crash-recovery journal (see classes/_journal.py). Called from the Window on launch.
+
+        Arguments:
+            journal_filepath (str): The full filepath to the journal left behind by the previous session.
+
+        Returns: None"""
+        ...
+    
     @classmethod
     def get_description(cls) -> str:
         """The description of the PUtilities tab."""
@@ -312,6 +322,62 @@ class ScrollableTextBox(tk.Frame):
         # Link the Text widget and the Scrollbar
         self.text_widget.config(yscrollcommand=self.scrollbar.set)
 
+        # Edit listeners, see add_edit_listener()
+        self._edit_listeners: list[typing.Callable] = []
+        self._original_widget_command: str | None = None
+
+    def add_edit_listener(self, callback: typing.Callable[[str, str, str], None]) -> None:
+        """
+        Register a function to be called after every insert or delete on the Text widget, including those made by typing.
+        The first listener added replaces the Text widget's Tcl command with a proxy, so that each edit can be reported as a delta.
+
+        Arguments:
+            callback (Callable): Called as callback(action, index, text), where action is "insert" or "delete", index is the
+                                 normalised "line.column" index the edit started at, and text is the inserted or removed text.
+
+        Returns: None
+        """
+        if self._original_widget_command is None:
+            widget = self.text_widget
+            self._original_widget_command = widget._w + "_original"
+            widget.tk.call("rename", widget._w, self._original_widget_command)
+            widget.tk.createcommand(widget._w, self._proxy_widget_command)
+        self._edit_listeners.append(callback)
+
+    def remove_edit_listener(self, callback: typing.Callable[[str, str, str], None]) -> None:
+        """Remove a function previously registered with add_edit_listener()."""
+        if callback in self._edit_listeners:
+            self._edit_listeners.remove(callback)
+
+    def _proxy_widget_command(self, command: str, *args) -> typing.Any:
+        """Internal Tcl command proxy for the Text widget. Runs the original command and reports inserts and deletes to the edit listeners."""
+        call = self.text_widget.tk.call
+        original = self._original_widget_command
+        if command not in ("insert", "delete", "replace") or not self._edit_listeners or call(original, "cget", "-state") != tk.NORMAL:
+            return call((original, command) + args)
+
+        end_of_text = str(call(original, "index", "end - 1 chars"))
+        clamp = lambda index: end_of_text if call(original, "compare", index, ">", end_of_text) else str(call(original, "index", index))
+        edits = []
+        if command in ("delete", "replace"):
+            start = clamp(args[0])
+            end = clamp(args[1]) if len(args) > 1 else clamp(f"{start} + 1 chars")
+            removed = str(call(original, "get", start, end)) if call(original, "compare", start, "<", end) else ""
+            if removed:
+                edits.append(("delete", start, removed))
+            inserted = "".join(args[2::2]) if command == "replace" else ""
+        else:
+            start = clamp(args[0])
+            inserted = "".join(args[1::2])
+        result = call((original, command) + args)
+        if inserted:
+            edits.append(("insert", start, inserted))
+
+        for action, index, text in edits:
+            for listener in tuple(self._edit_listeners):
+                listener(action, index, text)
+        return result
+
     def insert(self, *args):
         """Insert text into the Text widget."""
         self.text_widget.insert(*args)
@@ -343,28 +409,36 @@ class ScrollableTextBox(tk.Frame):
         """Scroll the text box to the bottom."""
         self.text_widget.yview(tk.END)
 
+def get_index_after(index: str, text: str) -> str:
+    """Get the "line.column" Text widget index directly after some text inserted at a given "line.column" index."""
+    line, column = (int(part) for part in index.split("."))
+    newlines = text.count("\n")
+    if not newlines: return f"{line}.{column + len(text)}"
+    column = len(text) - text.rindex("\n") - 1
+    return f"{line + newlines}.{column}"
+
+_TOFLOAT_CHARACTERS = set("0123456789.+-*x/()^%!, ")
+
 def toFloat(object: str | typing.Any) -> float:
-    """Convert an object (mostly a string) to a floating-point number."""
-    _floatCharacters = list("0123456789.")
-    _floatOperators = list("+-*x/()^%")
-    supportedChars = _floatCharacters + _floatOperators
-    string = list(object.lower())
+    """
+    Convert an object (mostly a string) to a floating-point number. Strings are evaluated as mathematical expressions
+    using the safe expression engine (see classes/_expressions.py), so "2^3", "3x4" and "sqrt(2)" are all supported.
+    If the string cannot be parsed, any characters other than digits, operators and spaces are ignored (so "5 cm" is 5),
+    and an empty string is 0.0. Raises expressions.ExpressionError (a ValueError) if it still cannot be parsed, if it
+    cannot be evaluated (as in "sqrt(-1)" or "ln(0)"), or if the result is a complex number, as in "(-8)^(1/3)".
+    """
+    if isinstance(object, (int, float)): return object
+    string = str(object)
+    if not string.strip(): return 0.0
     try:
-        i = 0
-        while i < len(string):
-            if not string[i] in supportedChars:
-                string.pop(i)
-                i -= 1
-            if string[i] == "x":
-                string[i] = "*"
-            if string[i] == "^":
-                string[i] = "**"
-            i += 1
-        string = "".join(string)
-        result = eval(string)
-        return result
-    except:
-        return 0.0
+        expression = expressions.compile_expression(string)
+    except (expressions.ExpressionError, RecursionError):
+        # Only parsing falls back to ignoring characters; errors when evaluating are raised, rather than giving a wrong number.
+        string = "".join(char for char in string.lower() if char in _TOFLOAT_CHARACTERS)
+        expression = expressions.compile_expression(string)
+    result = expression()
+    if isinstance(result, complex): raise expressions.ExpressionError(f"'{object}' does not have a real result.")
+    return result
 
 def toInt(object: str | typing.Any) -> int:
     """Convert an object (mostly a string) to an integer."""
@@ -498,11 +572,37 @@ class right_triangle:
         self.update_dictionary()
 
 def get_quadratic_solutions(a: float, b: float, c: float) -> tuple[float, float]:
-    """Get solutions to a quadratic equation."""
+    """Get solutions to a quadratic equation. Raises a ValueError if there are no real solutions."""
+    if b**2 - 4*a*c < 0: raise ValueError("The quadratic has no real solutions (the discriminant is negative).")
     midpoint = -b / (2*a)
     determinate = ((b**2 - 4*a*c)**0.5) / (2*a)
     return(midpoint+determinate, midpoint-determinate)
 
+def pythagorean_triples(bound: int, perimeter: bool = False, multiples: bool = False) -> typing.Iterator[tuple[int, int, int]]:
+    """
+    Lazily generate Pythagorean triples (a, b, c) with a < b < c, in increasing order of c (or of the perimeter), by walking
+    the Berggren (Barning) ternary tree of primitive triples from (3, 4, 5). Every primitive triple appears exactly once.
+
+    Arguments:
+        bound (int): The largest hypotenuse (or perimeter) to include.
+        perimeter (bool): Whether bound limits the perimeter a + b + c instead of the hypotenuse c.
+        multiples (bool): Whether to include the non-primitive multiples k(a, b, c) as well.
+
+    Returns:
+        Iterator[tuple[int, int, int]]
+    """
+    key = (lambda a, b, c: a + b + c) if perimeter else (lambda a, b, c: c)
+    heap = [(key(3, 4, 5), 3, 4, 5, 1)] if key(3, 4, 5) <= bound else []  # (key, a, b, c, multiple of the primitive triple)
+    while heap:
+        _, a, b, c, k = heapq.heappop(heap)
+        yield (min(a, b) * k, max(a, b) * k, c * k)
+        if multiples and key(a, b, c) * (k + 1) <= bound:
+            heapq.heappush(heap, (key(a, b, c) * (k + 1), a, b, c, k + 1))
+        if k > 1: continue
+        for child in ((a - 2*b + 2*c, 2*a - b + 2*c, 2*a - 2*b + 3*c), (a + 2*b + 2*c, 2*a + b + 2*c, 2*a + 2*b + 3*c), (-a + 2*b + 2*c, -2*a + b + 2*c, -2*a + 2*b + 3*c)):
+            # Children are always larger, so whole subtrees past the bound are skipped.
+            if key(*child) <= bound: heapq.heappush(heap, (key(*child), *child, 1))
+
 class ScrollableFrame(tk.Frame):
     def __init__(self, parent, scrollableWithMouse: bool = True, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
@@ -1048,7 +1148,10 @@ class ConfigGetterFactory:
         "subjects",
         "timetable",
         "recent_files",
-        "cps_highscore"
+        "cps_highscore",
+        "calculator_precision",
+        "command_timeout",
+        "dictionary_url"
         )
         self.defaults = {"username": "Default User", "rounding": 3, "angle_unit": "Degrees",
             "show_error_windows": True, "default_tab": "Home Tab", "terminalprompt": "PUtilities $",
@@ -1061,7 +1164,10 @@ class ConfigGetterFactory:
                 "Saturday": ["No Subject (weekend)", "No Subject (weekend)", "No Subject (weekend)"],
                 "Sunday": ["No Subject (weekend)", "No Subject (weekend)", "No Subject (weekend)"]},
             "recent_files": [],
-            "cps_highscore": 0}
+            "cps_highscore": 0,
+            "calculator_precision": 50,
+            "command_timeout": 60,
+            "dictionary_url": "https://api.dictionaryapi.dev/api/v2/entries/en/"}
     
     def write(self, config_data: dict[str, typing.Any], safe_mode: bool = True) -> None:
         """
@@ -1312,6 +1418,36 @@ class ConfigGetterFactory:
         """Set the highscore of the CpsTester tab."""
         self._write_value("cps_highscore", new)
     
+    @property
+    def calculator_precision(self) -> int:
+        """Get the number of significant digits used by the Calculator's high-precision mode."""
+        return self.get_key("calculator_precision")
+
+    @calculator_precision.setter
+    def calculator_precision(self, new: int) -> None:
+        """Set the number of significant digits used by the Calculator's high-precision mode."""
+        self._write_value("calculator_precision", new)
+
+    @property
+    def command_timeout(self) -> float:
+        """Get the number of seconds a terminal command may run for before it is stopped. 0 means no limit."""
+        return self.get_key("command_timeout")
+
+    @command_timeout.setter
+    def command_timeout(self, new: float) -> None:
+        """Set the number of seconds a terminal command may run for before it is stopped. 0 means no limit."""
+        self._write_value("command_timeout", new)
+
+    @property
+    def dictionary_url(self) -> str:
+        """Get the URL of the online dictionary used for words that are not in the offline dictionary. Empty to stay offline."""
+        return self.get_key("dictionary_url")
+
+    @dictionary_url.setter
+    def dictionary_url(self, new: str) -> None:
+        """Set the URL of the online dictionary used for words that are not in the offline dictionary. Empty to stay offline."""
+        self._write_value("dictionary_url", new)
+    
     def reset_to_defaults(self, make_sure: bool = True) -> None:
         """
         Reset the configuration to its default values.
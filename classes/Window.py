@@ -7,6 +7,7 @@ Imports _imports.pys (under classes). To get YOUR tab into the window, add it to
 
 from classes.Utilities import *
 from classes._TabManager import *
+from classes._journal import DocumentJournal
 import tkinter as tk
 from tkinter import ttk
 
@@ -137,8 +138,34 @@ class Window(tk.Tk, WindowInterface):
         """
         self._createWidgets()
         self._createMenu()
+        self.after(0, self.recoverJournals)
         self.mainloop()
     
+    def recoverJournals(self) -> None:
+        """
+        Offer to recover documents left unsaved by the previous session, using the crash-recovery journals in config/journals.
+        Each recovered document is opened in a new tab, which calls its TabFrame.recover() method. Declined journals are deleted.
+
+        Returns: None
+        """
+        pending = DocumentJournal.pending()
+        if not pending: return
+        if not messagebox.askyesno("Recover Documents", f"PUtilities found {len(pending)} document(s) with unsaved changes from the last session. Recover them?"):
+            for journal_filepath in pending:
+                try:
+                    os.remove(journal_filepath)
+                except OSError as e:
+                    ERROR_LOG.log(f"[window] Could not delete journal '{journal_filepath}'. Error type: {str(e)}")
+            return
+        for journal_filepath in pending:
+            try:
+                header, _ = DocumentJournal.read(journal_filepath)
+                tabframe = tabs.LessonEditor(self) if header.get("kind") == "lesson" else tabs.TextEditor(self)
+                self.newTab(tabframe)
+                self.getCurrentTab().recover(journal_filepath)
+            except Exception as e:
+                ERROR_LOG.log(f"[window] Could not recover journal '{journal_filepath}'. Error type: {str(e)}")
+    
     def getCurrentTab(self) -> TabFrame:
         """
         Gets the current tab in the form of its object (tabframe). This object can then be used to call the methods of the tab.
@@ -0,0 +1,290 @@
+"""
+PUtilities Command Registry
+The registry of terminal commands shared by the CommandLine and LinuxTerminal tabs. Each class of command functions is
+introspected once per process (or loaded from a cache file keyed by the modification time of its source file), giving
+a dictionary from command name to a Command with precompiled argument converters, so opening a terminal and looking up
+a command cost no introspection at all. The results of commands marked @pure are cached in RESULTS.
+"""
+
+from classes.Utilities import *
+import inspect, atexit, collections
+
+CACHE_FILEPATH = PFileHandler.CONFIG_FILEPATH + "/cache/commands.json"
+CACHE_VERSION = 4  # Increase whenever the cached descriptions change format
+RESULTS_FILEPATH = PFileHandler.CONFIG_FILEPATH + "/cache/results.pickle"
+
+def _to_bool(text: str) -> bool:
+    return False if text.lower() in ["no", "false", "0", "n", "not", "0.0"] else True
+
+# Argument converters by annotation. Arguments annotated with anything else are passed on as text.
+CONVERTERS: dict[type, typing.Callable[[str], typing.Any]] = {float: toFloat, int: toInt, bool: _to_bool}
+_TYPES: dict[str, type] = {"str": str, "float": float, "int": int, "bool": bool}
+
+class Command(typing.NamedTuple):
+    name: str
+    obj: typing.Callable
+    doc: str
+    args: list[dict[str: str | type]]
+    flags: list[str]
+    type_of_function: typing.Literal["general", "bash", "utility"]
+    description: str
+    shortened_description: str
+    converters: tuple[typing.Callable[[str], typing.Any] | None, ...]
+    join_index: int
+    required: int
+    runner: typing.Literal["main", "thread", "process", "gui"]
+    pure: bool
+    persist: bool
+
+    def convert(self, words: list[str]) -> tuple | None:
+        """
+        Convert the words typed after a command into its arguments. Extra words are joined into the last text argument (or
+        the last argument if there is none), so that text arguments can contain spaces. Arguments with default values are
+        optional, and left out (to use their defaults) when there are not enough words for them.
+
+        Arguments:
+            words (list[str]): The words typed after the command name (excluding flags).
+
+        Returns:
+            tuple | None: The converted arguments, or None if there are too few words.
+        """
+        if len(words) < self.required: return None
+        if self.args and len(words) > len(self.args):
+            extra = len(words) - len(self.args)
+            words = words[:self.join_index] + [" ".join(words[self.join_index:self.join_index + extra + 1])] + words[self.join_index + extra + 1:]
+        return tuple(word if converter is None else converter(word) for converter, word in zip(self.converters, words))
+
+def runs_in(where: typing.Literal["thread", "process", "gui"]) -> typing.Callable[[typing.Callable], typing.Callable]:
+    """
+    Mark where a command function runs. Background commands keep the window responsive and can be cancelled, but do not
+    get the tab in their keyword arguments. GUI commands run on the main thread like unmarked ones, but need a window
+    (e.g. for a file dialog), so they cannot be run in the headless batch mode.
+
+    Arguments:
+        where (str): 'thread' for commands that wait on files or the network, 'process' for CPU-bound commands, 'gui' for
+            commands that open dialogs or windows.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(function: typing.Callable) -> typing.Callable:
+        function.runs_in = where
+        return function
+    return decorator
+
+def pure(function: typing.Callable | None = None, *, persist: bool = False) -> typing.Callable:
+    """
+    Mark a command function as pure: its result only depends on its arguments, so the results of repeated calls can be
+    taken from RESULTS instead of being recalculated. Use as @pure, or @pure(persist=True) for expensive commands whose
+    results should be kept between sessions.
+
+    Arguments:
+        function (Callable | None): The function, when used without arguments.
+        persist (bool): Whether to save the function's cached results to disk.
+
+    Returns:
+        Callable: The function, or the decorator.
+    """
+    def decorator(function: typing.Callable) -> typing.Callable:
+        function.pure = "persist" if persist else True
+        return function
+    return decorator(function) if function is not None else decorator
+
+def _describe(namespace: type, name: str, single_letter_flags: bool) -> dict:
+    """Internal helper, introspecting a command function into a JSON-compatible description."""
+    obj = vars(namespace)[name]
+    doc = inspect.getdoc(obj) or ""
+    args, flags = [], []
+    for param in inspect.signature(obj).parameters.values():
+        if param.name == "kwargs" or param.kind == inspect.Parameter.VAR_KEYWORD: continue
+        if single_letter_flags and len(param.name) == 1:
+            flags.append(param.name)
+            continue
+        annotation = param.annotation if param.annotation is not inspect.Parameter.empty else str
+        args.append({"name": param.name, "type": annotation.__name__ if annotation in _TYPES.values() else "str", "optional": param.default is not inspect.Parameter.empty})
+    return {"name": name, "doc": doc, "args": args, "flags": flags, "runner": getattr(obj, "runs_in", "main"), "pure": getattr(obj, "pure", False)}
+
+def _build(namespace: type, description: dict) -> Command:
+    """Internal helper, building a Command (with its argument converters) from a description."""
+    doc, lines = description["doc"], description["doc"].splitlines() or [""]
+    args = [{"name": item["name"], "type": _TYPES[item["type"]], "optional": item["optional"]} for item in description["args"]]
+    if lines[0].startswith("@type:"):
+        type_of_function = lines[0][6:].split("#")[0].strip().lower()
+        details = "\n".join(lines[1:]).strip()
+        shortened = lines[1].strip() if len(lines) > 1 else ""
+    else:
+        type_of_function, details, shortened = "general", doc, lines[0]
+    converters = tuple(CONVERTERS.get(item["type"]) for item in args)
+    text_args = [i for i, item in enumerate(args) if item["type"] == str]
+    join_index = text_args[-1] if text_args else len(args) - 1
+    required = sum(not item["optional"] for item in description["args"])
+    return Command(description["name"], getattr(namespace, description["name"]), doc, args, description["flags"], type_of_function, details, shortened, converters, join_index, required, description["runner"], bool(description["pure"]), description["pure"] == "persist")
+
+def _read_cache() -> dict:
+    try:
+        with open(CACHE_FILEPATH, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return dict()
+
+def _write_cache(cache: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILEPATH), exist_ok=True)
+        with open(CACHE_FILEPATH, "w") as file:
+            json.dump(cache, file)
+    except OSError:
+        pass
+
+MISSING = object()  # Returned by ResultCache.get() when a result is not cached
+
+class ResultCache:
+    """
+    A least-recently-used cache of the results of pure commands, keyed by the command name and its converted arguments.
+    The results of commands marked @pure(persist=True) are loaded from disk the first time the cache is used, and saved
+    when the program exits.
+
+    Attributes:
+        max_entries (int): The most results kept.
+    """
+    max_entries: int = 1024
+
+    def __init__(self, filepath: str = RESULTS_FILEPATH) -> None:
+        self.filepath = filepath
+        self._entries: collections.OrderedDict[tuple, tuple[typing.Any, bool]] | None = None
+        self._dirty = False
+        self.hits = self.misses = 0
+
+    @property
+    def entries(self) -> collections.OrderedDict[tuple, tuple[typing.Any, bool]]:
+        """The cached (result, persist) pairs, least recently used first. The saved results are loaded the first time this is accessed."""
+        if self._entries is None:
+            self._entries = collections.OrderedDict()
+            try:
+                with open(self.filepath, "rb") as file:
+                    self._entries.update((key, (result, True)) for key, result in pickle.load(file))
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                ERROR_LOG.log_tab_error("terminal", f"Could not load the saved command results '{self.filepath}'. Error type: {str(e)}")
+        return self._entries
+
+    def get(self, command: Command, args: tuple) -> typing.Any:
+        """
+        Get the cached result of a command.
+
+        Arguments:
+            command (Command): The command.
+            args (tuple): Its converted arguments.
+
+        Returns:
+            Any: The result, or MISSING if it is not cached.
+        """
+        key = (command.name, args)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, command: Command, args: tuple, result: typing.Any) -> None:
+        """
+        Cache the result of a command, dropping the least recently used result if the cache is full.
+
+        Arguments:
+            command (Command): The command.
+            args (tuple): Its converted arguments.
+            result (Any): The result.
+
+        Returns: None
+        """
+        self.entries[(command.name, args)] = (result, command.persist)
+        self._entries.move_to_end((command.name, args))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if command.persist and not self._dirty:
+            self._dirty = True
+            atexit.register(self.save)
+
+    def save(self) -> None:
+        """
+        Save the cached results of persistent commands to disk.
+
+        Returns: None
+        """
+        if not self._dirty: return
+        self._dirty = False
+        atexit.unregister(self.save)
+        try:
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+            with open(self.filepath, "wb") as file:
+                pickle.dump([(key, result) for key, (result, persist) in self.entries.items() if persist], file)
+        except Exception as e:
+            ERROR_LOG.log_tab_error("terminal", f"Could not save the command results '{self.filepath}'. Error type: {str(e)}")
+
+    def clear(self) -> None:
+        """
+        Clear the cache, including the saved results.
+
+        Returns: None
+        """
+        self._entries = collections.OrderedDict()
+        self.hits = self.misses = 0
+        if self._dirty:
+            self._dirty = False
+            atexit.unregister(self.save)
+        try:
+            os.remove(self.filepath)
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        """
+        Get statistics on the cache.
+
+        Returns:
+            dict: The number of cached and saved results, hits and misses, and the hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {"Cached results": len(self.entries), "Saved results": sum(persist for result, persist in self._entries.values()),
+            "Maximum results": self.max_entries, "Hits": self.hits, "Misses": self.misses,
+            "Hit rate": f"{100 * self.hits / lookups:.1f}%" if lookups else "N/A"}
+
+RESULTS = ResultCache()
+
+_REGISTRIES: dict[type, dict[str, Command]] = dict()
+
+def get_registry(namespace: type, single_letter_flags: bool = False, use_cache: bool = True) -> dict[str, Command]:
+    """
+    Get the registry of commands defined as functions in a class, such as CommandLine.funcs. The registry is built once per
+    process, from the cache file when the class's source file has not changed since it was cached. Functions starting with
+    an underscore are not commands.
+
+    Arguments:
+        namespace (type): The class holding the command functions.
+        single_letter_flags (bool): Whether single letter parameters are flags (as in the LinuxTerminal) instead of arguments.
+        use_cache (bool): Whether to use the cache file.
+
+    Returns:
+        dict[str, Command]: The commands by name, in the order they are defined.
+    """
+    if namespace in _REGISTRIES: return _REGISTRIES[namespace]
+    key = f"{namespace.__module__}.{namespace.__qualname__}"
+    try:
+        source = inspect.getsourcefile(namespace)
+        stamp = [CACHE_VERSION, source, os.stat(source).st_mtime_ns, single_letter_flags]
+    except (OSError, TypeError):
+        stamp, use_cache = None, False
+    cache = _read_cache() if use_cache else dict()
+    entry = cache.get(key)
+    if entry and entry.get("stamp") == stamp and all(name in vars(namespace) for name in entry["commands"]):
+        descriptions = entry["commands"].values()
+    else:
+        names = [name for name, obj in vars(namespace).items() if inspect.isfunction(obj) and not name.startswith("_")]
+        descriptions = [_describe(namespace, name, single_letter_flags) for name in names]
+        if use_cache:
+            cache[key] = {"stamp": stamp, "commands": {item["name"]: item for item in descriptions}}
+            _write_cache(cache)
+    _REGISTRIES[namespace] = {item["name"]: _build(namespace, item) for item in descriptions}
+    return _REGISTRIES[namespace]
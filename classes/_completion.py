@@ -0,0 +1,186 @@
+"""
+PUtilities Terminal Completion
+Tab completion for the CommandLine and LinuxTerminal tabs. Command names are completed from a prefix trie built once
+from a command registry, and paths from a cached, sorted listing of their directory (searched by bisection), which is
+only listed again with os.scandir when the directory's modification time changes.
+"""
+
+from classes.Utilities import *
+import bisect, collections, itertools, re, threading
+
+class PrefixTrie:
+    """A prefix tree of words, for finding every word starting with a prefix."""
+    class _Node:
+        __slots__ = ("children", "word")
+        def __init__(self) -> None:
+            self.children: dict[str, PrefixTrie._Node] = dict()
+            self.word: str | None = None
+
+    def __init__(self, words: typing.Iterable[str] = ()) -> None:
+        self._root = self._Node()
+        for word in words:
+            self.insert(word)
+
+    def insert(self, word: str) -> None:
+        """
+        Add a word to the trie.
+
+        Arguments:
+            word (str): The word.
+
+        Returns: None
+        """
+        node = self._root
+        for character in word:
+            node = node.children.setdefault(character, self._Node())
+        node.word = word
+
+    def complete(self, prefix: str) -> list[str]:
+        """
+        Get every word starting with a prefix.
+
+        Arguments:
+            prefix (str): The prefix.
+
+        Returns:
+            list[str]: The words, in alphabetical order.
+        """
+        node = self._root
+        for character in prefix:
+            node = node.children.get(character)
+            if node is None: return []
+        words, stack = [], [node]
+        while stack:
+            node = stack.pop()
+            if node.word is not None: words.append(node.word)
+            stack.extend(node.children[character] for character in sorted(node.children, reverse=True))
+        return words
+
+class DirectoryCache:
+    """
+    Sorted listings of recently completed directories, listed again only when a directory's modification time changes.
+
+    Attributes:
+        max_directories (int): The number of directory listings kept.
+    """
+    max_directories: int = 64
+
+    def __init__(self) -> None:
+        self._listings: collections.OrderedDict[str, tuple[int, list[str], frozenset[str]]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def prefetch(self, directory: str) -> None:
+        """
+        List a directory on a background thread, e.g. when a terminal changes into it, so that the first completion in a
+        huge directory does not have to wait for it.
+
+        Arguments:
+            directory (str): The directory.
+
+        Returns: None
+        """
+        threading.Thread(target=self.listing, args=(directory,), daemon=True).start()
+
+    def listing(self, directory: str) -> tuple[list[str], frozenset[str]]:
+        """
+        Get the entries of a directory.
+
+        Arguments:
+            directory (str): The directory.
+
+        Returns:
+            tuple[list[str], frozenset[str]]: The sorted names of its entries, and the names of its subdirectories.
+        """
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return [], frozenset()
+        with self._lock:
+            cached = self._listings.get(directory)
+            if cached is not None and cached[0] == mtime:
+                self._listings.move_to_end(directory)
+                return cached[1], cached[2]
+        names, directories = [], set()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    names.append(entry.name)
+                    try:
+                        if entry.is_dir(): directories.add(entry.name)
+                    except OSError:
+                        pass
+        except OSError:
+            return [], frozenset()
+        names.sort()
+        with self._lock:
+            self._listings[directory] = (mtime, names, frozenset(directories))
+            while len(self._listings) > self.max_directories:
+                self._listings.popitem(last=False)
+        return names, frozenset(directories)
+
+    def complete(self, directory: str, prefix: str, limit: int = 100) -> tuple[list[str], int, str]:
+        """
+        Get the entries of a directory starting with a prefix. Subdirectories end with '/', and hidden entries (starting
+        with '.') are only included if the prefix starts with '.'. Only the first few entries are formatted, so that
+        completing in huge directories stays instant.
+
+        Arguments:
+            directory (str): The directory.
+            prefix (str): The prefix.
+            limit (int): The most entries to return.
+
+        Returns:
+            tuple[list[str], int, str]: The first entries in alphabetical order, the number of entries, and the longest
+                prefix they all share.
+        """
+        names, directories = self.listing(directory)
+        start, stop = bisect.bisect_left(names, prefix), bisect.bisect_left(names, prefix + "\U0010ffff")
+        ranges = [(start, stop)]
+        if not prefix:
+            # Hidden entries are a block of the sorted names, between "." and the next character.
+            hidden_start, hidden_stop = bisect.bisect_left(names, "."), bisect.bisect_left(names, "/")
+            ranges = [(start, hidden_start), (hidden_stop, stop)]
+        ranges = [(first, last) for first, last in ranges if first < last]
+        if not ranges: return [], 0, prefix
+        format = lambda name: name + "/" if name in directories else name
+        # The longest prefix shared by sorted strings is the one shared by the first and the last.
+        common = os.path.commonprefix([format(names[ranges[0][0]]), format(names[ranges[-1][1] - 1])])
+        indices = itertools.islice(itertools.chain.from_iterable(range(first, last) for first, last in ranges), limit)
+        return [format(names[index]) for index in indices], sum(last - first for first, last in ranges), common
+
+DIRECTORIES = DirectoryCache()
+_TRIES: dict[int, PrefixTrie] = dict()
+
+def complete_entry(entry: ttk.Entry, registry: dict, directory: str) -> tuple[list[str], int]:
+    """
+    Complete the word before the cursor of a terminal's entry: the command name if it is the first word (of a pipeline
+    stage), otherwise a path relative to the working directory. The word is extended as far as every candidate agrees.
+
+    Arguments:
+        entry (ttk.Entry): The terminal's entry.
+        registry (dict): The terminal's command registry.
+        directory (str): The working directory.
+
+    Returns:
+        tuple[list[str], int]: The first candidates and the number of candidates, if there is more than one and the word
+            could not be extended, for the terminal to show. Otherwise an empty list and 0.
+    """
+    cursor = entry.index(tk.INSERT)
+    text = entry.get()[:cursor]
+    word = re.split(r"\s", text)[-1]
+    stage = text.rsplit("|", 1)[-1]
+    if not stage.strip() or (len(stage.split()) == 1 and not stage[-1].isspace()):
+        if id(registry) not in _TRIES:
+            _TRIES[id(registry)] = PrefixTrie(name for name, command in registry.items() if command.doc != "@hidden")
+        candidates = [name + " " for name in _TRIES[id(registry)].complete(word.lower())]
+        total, common = len(candidates), os.path.commonprefix(candidates)
+    else:
+        head = word[:len(word) - len(os.path.basename(word))]
+        base = os.path.join(directory, os.path.expanduser(head)) if head else directory
+        names, total, common = DIRECTORIES.complete(base, os.path.basename(word))
+        candidates, common = [head + name for name in names], head + common
+    if len(common) > len(word):
+        entry.delete(cursor - len(word), cursor)
+        entry.insert(cursor - len(word), common)
+        return [], 0
+    return (candidates, total) if total > 1 else ([], 0)
@@ -0,0 +1,261 @@
+"""
+PUtilities Dictionary
+An offline dictionary for the Command Line's 'dictionary' command. Word lists are imported once into an indexed SQLite
+store, which answers exact lookups, prefix searches and fuzzy suggestions (through a table of the single-letter
+deletions of every word) straight from its indexes. An online dictionary API can be used as a fallback for words that
+are not in the store, with its responses cached in the store so that each word is only fetched once.
+"""
+
+from classes.Utilities import *
+import sqlite3, threading, csv, http.client
+from urllib.parse import urlparse, quote
+
+DICTIONARY_FILEPATH = PFileHandler.CONFIG_FILEPATH + "/dictionary.sqlite"
+
+class Definition(typing.NamedTuple):
+    word: str
+    part_of_speech: str
+    definition: str
+    example: str = ""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS words (key TEXT PRIMARY KEY, word TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS definitions (key TEXT NOT NULL, part_of_speech TEXT NOT NULL, definition TEXT NOT NULL, example TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS definitions_key ON definitions (key);
+CREATE TABLE IF NOT EXISTS deletes (variant TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (variant, key)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, body TEXT NOT NULL, fetched REAL NOT NULL) WITHOUT ROWID;
+"""
+
+def _key(word: str) -> str:
+    return " ".join(word.lower().split())
+
+def _variants(key: str) -> set[str]:
+    """Internal helper, getting a key and every way of deleting one letter from it."""
+    return {key} | {key[:i] + key[i + 1:] for i in range(len(key))}
+
+def edit_distance(a: str, b: str) -> int:
+    """
+    Get the number of single-letter insertions, deletions, substitutions and transpositions needed to turn one word into another.
+
+    Arguments:
+        a, b (str): The words.
+
+    Returns:
+        int: The distance.
+    """
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if before is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+    return current[-1]
+
+class DictionaryStore:
+    """
+    An indexed on-disk store of word definitions. It can be used from any thread.
+
+    Attributes:
+        filepath (str): The SQLite database file.
+    """
+    def __init__(self, filepath: str = DICTIONARY_FILEPATH) -> None:
+        self.filepath = filepath
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _execute(self, query: str, parameters: typing.Iterable = ()) -> list[tuple]:
+        """Internal method running a query on the store (created the first time it is needed) and fetching its rows."""
+        with self._lock:
+            if self._connection is None:
+                os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+                self._connection = sqlite3.connect(self.filepath, check_same_thread=False)
+                self._connection.executescript(_SCHEMA)
+            return self._connection.execute(query, tuple(parameters)).fetchall()
+
+    def __len__(self) -> int:
+        return self._execute("SELECT COUNT(*) FROM words")[0][0]
+
+    def import_definitions(self, definitions: typing.Iterable[Definition]) -> int:
+        """
+        Add definitions to the store, in a single transaction.
+
+        Arguments:
+            definitions (Iterable[Definition]): The definitions.
+
+        Returns:
+            int: The number of definitions added.
+        """
+        self._execute("SELECT 1")
+        count = 0
+        with self._lock, self._connection:
+            for item in definitions:
+                key = _key(item.word)
+                if not key or not item.definition: continue
+                if self._connection.execute("INSERT OR IGNORE INTO words VALUES (?, ?)", (key, item.word.strip())).rowcount:
+                    self._connection.executemany("INSERT OR IGNORE INTO deletes VALUES (?, ?)", ((variant, key) for variant in _variants(key)))
+                self._connection.execute("INSERT INTO definitions VALUES (?, ?, ?, ?)", (key, item.part_of_speech, item.definition, item.example))
+                count += 1
+        return count
+
+    def lookup(self, word: str) -> list[Definition]:
+        """
+        Get the definitions of a word (ignoring case).
+
+        Arguments:
+            word (str): The word.
+
+        Returns:
+            list[Definition]: The definitions, in the order they were imported.
+        """
+        rows = self._execute("SELECT words.word, part_of_speech, definition, example FROM definitions JOIN words USING (key) WHERE key = ? ORDER BY definitions.rowid", (_key(word),))
+        return [Definition(*row) for row in rows]
+
+    def prefix(self, prefix: str, limit: int = 20) -> list[str]:
+        """
+        Get the words starting with a prefix (ignoring case), in alphabetical order.
+
+        Arguments:
+            prefix (str): The prefix.
+            limit (int): The most words to return.
+
+        Returns:
+            list[str]: The words.
+        """
+        key = _key(prefix)
+        return [row[0] for row in self._execute("SELECT word FROM words WHERE key >= ? AND key < ? ORDER BY key LIMIT ?", (key, key + "\U0010ffff", limit))]
+
+    def suggest(self, word: str, limit: int = 5) -> list[str]:
+        """
+        Get the words closest to a (misspelt) word, for 'Did you mean...?' suggestions. Words up to two edits away are found
+        when the edits are on different sides, such as a missing letter and an extra letter, or one substitution.
+
+        Arguments:
+            word (str): The word.
+            limit (int): The most words to return.
+
+        Returns:
+            list[str]: The words, closest first.
+        """
+        key = _key(word)
+        if not key: return []
+        variants = list(_variants(key))
+        rows = self._execute(f"SELECT DISTINCT deletes.key, words.word FROM deletes JOIN words USING (key) WHERE variant IN ({', '.join('?' * len(variants))})", variants)
+        ranked = sorted((edit_distance(key, candidate), candidate, word) for candidate, word in rows if candidate != key)
+        return [word for distance, candidate, word in ranked[:limit]]
+
+    def cached_response(self, url: str) -> str | None:
+        """Get the cached body of an online dictionary response, if it has been fetched before."""
+        rows = self._execute("SELECT body FROM responses WHERE url = ?", (url,))
+        return rows[0][0] if rows else None
+
+    def cache_response(self, url: str, body: str) -> None:
+        """Cache the body of an online dictionary response."""
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (url, body, time.time()))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None: self._connection.close()
+            self._connection = None
+
+def read_dataset(filepath: str) -> typing.Iterator[Definition]:
+    """
+    Read a word list to import. Supported formats are:
+        .json: {"word": "definition" | ["definition", ...]}, or the responses of the online dictionary API.
+        .csv: word, part of speech, definition[, example] rows, with an optional header row starting with 'word'.
+        Anything else: word<TAB>definition or word<TAB>part of speech<TAB>definition lines.
+
+    Arguments:
+        filepath (str): The word list.
+
+    Returns:
+        Iterator[Definition]
+    """
+    extension = os.path.splitext(filepath)[1].lower()
+    with open(filepath, "r", encoding="utf-8", errors="replace", newline="") as file:
+        if extension == ".json":
+            data = json.load(file)
+            if isinstance(data, dict):
+                for word, definitions in data.items():
+                    for definition in ([definitions] if isinstance(definitions, str) else definitions):
+                        yield Definition(word, "", str(definition))
+            else:
+                yield from parse_api_response(json.dumps(data))
+        elif extension == ".csv":
+            for row in csv.reader(file):
+                if len(row) < 3 or row[0].strip().lower() == "word": continue
+                yield Definition(row[0], row[1].strip(), row[2].strip(), row[3].strip() if len(row) > 3 else "")
+        else:
+            for line in file:
+                fields = line.rstrip("\r\n").split("\t")
+                if len(fields) == 2: yield Definition(fields[0], "", fields[1].strip())
+                elif len(fields) >= 3: yield Definition(fields[0], fields[1].strip(), fields[2].strip())
+
+def parse_api_response(body: str) -> list[Definition]:
+    """
+    Parse a response of the online dictionary API (in the format of api.dictionaryapi.dev).
+
+    Arguments:
+        body (str): The JSON response.
+
+    Returns:
+        list[Definition]: The definitions. Empty if the response has none.
+    """
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return []
+    definitions = []
+    for entry in data if isinstance(data, list) else []:
+        for meaning in entry.get("meanings", []):
+            for definition in meaning.get("definitions", []):
+                definitions.append(Definition(entry.get("word", ""), meaning.get("partOfSpeech", ""), definition.get("definition", ""), definition.get("example", "")))
+    return definitions
+
+class HttpBackend:
+    """
+    Looks up words in an online dictionary API, caching its responses in a DictionaryStore.
+
+    Attributes:
+        url (str): The URL the (quoted) word is appended to, e.g. 'https://api.dictionaryapi.dev/api/v2/entries/en/'.
+        timeout (float): The number of seconds to wait for a response.
+    """
+    timeout: float = 5
+
+    def __init__(self, url: str, store: DictionaryStore) -> None:
+        self.url = url
+        self.store = store
+
+    def lookup(self, word: str) -> list[Definition]:
+        """
+        Get the definitions of a word, from the cache if it has been fetched before.
+
+        Arguments:
+            word (str): The word.
+
+        Returns:
+            list[Definition]: The definitions. Empty if the word was not found.
+
+        Raises:
+            OSError: If the API could not be reached.
+        """
+        url = self.url + quote(_key(word))
+        body = self.store.cached_response(url)
+        if body is None:
+            parsed = urlparse(url)
+            connection_type = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+            connection = connection_type(parsed.netloc, timeout=self.timeout)
+            try:
+                connection.request("GET", parsed.path + (f"?{parsed.query}" if parsed.query else ""), headers={"User-Agent": "Mozilla/5.0"})
+                response = connection.getresponse()
+                body = response.read().decode("utf-8", errors="replace")
+            finally:
+                connection.close()
+            # Only answers are cached (a 404 means the word does not exist), not server errors.
+            if response.status not in [200, 404]: raise OSError(f"The dictionary returned status code {response.status}.")
+            self.store.cache_response(url, body)
+        return parse_api_response(body)
+
+STORE = DictionaryStore()
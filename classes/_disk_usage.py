@@ -0,0 +1,144 @@
+"""
+PUtilities Disk Usage
+Folder sizes for the Linux Terminal's 'du' command and the File Explorer. Directory trees are walked by a pool of
+os.scandir walkers, one directory per task, and what each directory directly contains (the total size of its files and
+its subdirectories) is cached keyed by its path and modification time, keeping the most recently used directories up to a
+limit. Adding, removing or renaming entries changes a directory's modification time, so scanning a tree again only lists
+the directories that changed; files that changed size without being replaced are not noticed until their directory changes.
+Do not use tkinter in this module, as it runs on worker threads.
+"""
+
+import os, threading, collections, concurrent.futures, typing
+
+class DirectoryUsage(typing.NamedTuple):
+    mtime: int  # The modification time (in nanoseconds) of the directory when it was listed
+    files_size: int  # The total size of the files directly in the directory
+    subdirectories: tuple[str, ...]
+
+def format_size(size: int) -> str:
+    """
+    Format a number of bytes in human-readable units, e.g. 1536 -> '1.5K'.
+
+    Arguments:
+        size (int): The number of bytes.
+
+    Returns:
+        str: The size.
+    """
+    for unit in ["B", "K", "M", "G", "T"]:
+        if size < 1024 or unit == "T":
+            return f"{size}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+
+class DiskUsage:
+    """
+    Calculates folder sizes, caching what each directory directly contains. It can be used from any thread.
+
+    Attributes:
+        workers (int): The number of directories listed at once.
+        max_directories (int): The most directories cached, least recently used first out.
+    """
+    workers: int = min(32, (os.cpu_count() or 1) + 4)
+    max_directories: int = 100_000
+
+    def __init__(self) -> None:
+        self._cache: collections.OrderedDict[str, DirectoryUsage] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _list(self, directory: str) -> DirectoryUsage | None:
+        """Internal method getting what a directory directly contains, listing it only if it changed since it was cached."""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._cache.get(directory)
+            if cached is not None and cached.mtime == mtime:
+                self._cache.move_to_end(directory)
+                return cached
+        files_size, subdirectories = 0, []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False): subdirectories.append(entry.path)
+                        else: files_size += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError:
+            return None
+        usage = DirectoryUsage(mtime, files_size, tuple(subdirectories))
+        with self._lock:
+            self._cache[directory] = usage
+            self._cache.move_to_end(directory)
+            while len(self._cache) > self.max_directories:
+                self._cache.popitem(last=False)
+        return usage
+
+    def scan(self, root: str, stop: threading.Event | None = None) -> dict[str, DirectoryUsage]:
+        """
+        Walk a directory tree, listing its directories in parallel.
+
+        Arguments:
+            root (str): The directory.
+            stop (threading.Event | None): Set to stop the walk early, in which case the result is incomplete.
+
+        Returns:
+            dict[str, DirectoryUsage]: What each directory in the tree directly contains. Directories that could not be
+                listed are left out.
+        """
+        tree: dict[str, DirectoryUsage] = dict()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(self._list, root): root}
+            while pending:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    directory = pending.pop(future)
+                    usage = future.result()
+                    if usage is None: continue
+                    tree[directory] = usage
+                    if stop is not None and stop.is_set(): continue
+                    for subdirectory in usage.subdirectories:
+                        pending[pool.submit(self._list, subdirectory)] = subdirectory
+        return tree
+
+    def totals(self, root: str, stop: threading.Event | None = None) -> dict[str, int]:
+        """
+        Get the total size of every directory in a tree.
+
+        Arguments:
+            root (str): The directory.
+            stop (threading.Event | None): Set to stop the walk early, in which case the result is incomplete.
+
+        Returns:
+            dict[str, int]: The total size of each directory in the tree, in bytes.
+        """
+        tree = self.scan(root, stop)
+        totals: dict[str, int] = dict()
+        # Visit every directory after its subdirectories, so that their totals are known.
+        stack = [(root, False)]
+        while stack:
+            directory, expanded = stack.pop()
+            usage = tree.get(directory)
+            if usage is None: continue
+            if expanded:
+                totals[directory] = usage.files_size + sum(totals.get(subdirectory, 0) for subdirectory in usage.subdirectories)
+            else:
+                stack.append((directory, True))
+                stack.extend((subdirectory, False) for subdirectory in usage.subdirectories)
+        return totals
+
+    def size(self, directory: str, stop: threading.Event | None = None) -> int:
+        """
+        Get the total size of a directory, including its subdirectories.
+
+        Arguments:
+            directory (str): The directory.
+            stop (threading.Event | None): Set to stop the walk early, in which case the result is incomplete.
+
+        Returns:
+            int: The size in bytes.
+        """
+        return self.totals(directory, stop).get(directory, 0)
+
+USAGE = DiskUsage()
@@ -0,0 +1,466 @@
+"""
+PUtilities Expression Engine
+A safe replacement for eval() when evaluating mathematical expressions typed by the user. Expressions are tokenized in a
+single pass, parsed into a small syntax tree with a Pratt parser, and compiled into nested closures. Compiled expressions
+are cached by their normalised text, so evaluating the same expression twice only parses it once. Only the operators,
+functions and constants defined in this module can ever be run, so no arbitrary code is executed.
+
+Supported syntax:
+    Numbers: 12, 1.5, .5, 2e-3
+    Operators: + - * / % ^ ** ! (factorial), and 'x' for multiplication (when 'x' is not a variable)
+    Implicit multiplication: 2pi, 3(4+5), (1+2)(3+4), 2sqrt(9)
+    Functions: sin(30), sin 30, max(1, 2, 3), ... (see FUNCTIONS)
+    Constants: pi, e, tau, phi, inf
+Do not import Utilities into this module, as Utilities imports this module for toFloat().
+"""
+
+import math, operator, functools, typing, contextlib, fractions, decimal, re
+
+class ExpressionError(ValueError):
+    """Raised when an expression cannot be parsed or evaluated."""
+
+# Functions taking an angle or returning one, converted when compiling in degrees mode.
+_ANGLE_INPUT = {"sin", "cos", "tan"}
+_ANGLE_OUTPUT = {"asin", "acos", "atan"}
+_MAX_FACTORIAL = 5000
+_MAX_POWER_BITS = 100_000
+
+def _factorial(value: int | float) -> int:
+    if value != int(value) or value < 0: raise ExpressionError(f"Factorial is only defined for non-negative integers, not {value}.")
+    if value > _MAX_FACTORIAL: raise ExpressionError(f"Factorial of {value} is too large to calculate.")
+    return math.factorial(int(value))
+
+def _power(base: typing.Any, exponent: typing.Any) -> typing.Any:
+    # Exact (integer and fraction) powers would hang on something like 9^9^9, so huge ones fall back to floating-point.
+    if isinstance(base, (int, fractions.Fraction)) and isinstance(exponent, (int, fractions.Fraction)) and exponent == int(exponent) and abs(exponent) > 1:
+        size = max(abs(base.numerator).bit_length(), base.denominator.bit_length())
+        if size > 1 and abs(int(exponent)) * size > _MAX_POWER_BITS:
+            return float(base) ** float(exponent)
+    return base ** exponent
+
+def _log(value: float, base: float = 10) -> float:
+    return math.log(value, base)
+
+FUNCTIONS: dict[str, typing.Callable] = {
+    "sin": math.sin, "cos": math.cos, "tan": math.tan, "asin": math.asin, "acos": math.acos, "atan": math.atan,
+    "sinh": math.sinh, "cosh": math.cosh, "tanh": math.tanh, "sqrt": math.sqrt, "cbrt": lambda x: math.copysign(abs(x) ** (1/3), x),
+    "ln": math.log, "log": _log, "log2": math.log2, "exp": math.exp, "abs": abs, "floor": math.floor, "ceil": math.ceil,
+    "round": round, "fact": _factorial, "min": min, "max": max, "hypot": math.hypot, "deg": math.degrees, "rad": math.radians,
+}
+CONSTANTS: dict[str, float] = {"pi": math.pi, "e": math.e, "tau": math.tau, "phi": (1 + 5 ** 0.5) / 2, "inf": math.inf}
+
+_BINARY: dict[str, typing.Callable] = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv, "%": operator.mod, "^": _power}
+# Left binding powers of the infix and postfix operators. Implicit multiplication binds like '*'.
+_BINDING_POWER: dict[str, int] = {"+": 10, "-": 10, "*": 20, "/": 20, "%": 20, "^": 40, "!": 50}
+_PREFIX_BINDING_POWER = 30
+_SIMPLE_CHARACTERS = set("0123456789+-*x^%!() ")
+_FUNCTION_ARGUMENT_BINDING_POWER = 35
+
+def normalize(expression: str) -> str:
+    """
+    Normalise an expression for caching: runs of whitespace become a single space and letters are lowercased. Whitespace
+    is kept because it separates tokens, so "log2 8" is log2(8) and not log(28).
+
+    Arguments:
+        expression (str): The expression to normalise.
+
+    Returns:
+        str
+    """
+    return " ".join(expression.split()).lower()
+
+# One token after any whitespace: a number (in scientific notation only when 'e' is followed by an exponent, as otherwise it
+# is the constant e), a run of letters with any digits after it, or an operator.
+_TOKEN = re.compile(r"\s*(?:(?P<number>(?:\d|\.\d)[\d.]*(?:e[+-]?\d+)?)|(?P<name>(?P<word>[^\W\d]+)(?P<digits>\d*))|(?P<op>\*\*|[-+*/%^!(),]))")
+
+_OPERATOR_TOKENS = {operator_: ("op", operator_) for operator_ in "-+*/%^!(),"} | {"**": ("op", "^")}
+
+@functools.lru_cache(maxsize=64)
+def _names(variables: tuple[str, ...]) -> tuple[frozenset[str], int, tuple[str, ...]]:
+    """Internal helper, getting the names the tokenizer knows with the given variables, the length of the longest, and those ending in digits."""
+    names = frozenset(FUNCTIONS) | frozenset(CONSTANTS) | frozenset(variables) | {"x"}
+    return names, max(map(len, names)), tuple(name for name in names if name[-1].isdigit())
+
+def tokenize(expression: str, variables: tuple[str, ...] = ()) -> list[tuple[str, str]]:
+    """
+    Tokenize a normalised expression in a single pass. Runs of letters are split greedily into the longest known names, so
+    "2pie" is 2 * pi * e. When x is one of the variables, "sinx" is sin x; otherwise 'x' means multiplication. Whitespace
+    only separates tokens, and two numbers separated by it (as in "2 3") are an error rather than one number.
+
+    Arguments:
+        expression (str): The normalised expression.
+        variables (tuple[str]): The names of the expression's variables.
+
+    Returns:
+        list[tuple[str, str]]: A list of (kind, text) tokens, where kind is one of "number", "name" or "op".
+    """
+    names, longest, digit_names = _names(variables)
+    tokens, position, length = [], 0, len(expression)
+    while position < length:
+        match = _TOKEN.match(expression, position)
+        if match is None:
+            rest = expression[position:].lstrip()
+            if not rest: break
+            raise ExpressionError(f"Unexpected character '{rest[0]}'.")
+        number, word, digits, operator_ = match.group("number", "word", "digits", "op")
+        position = match.end()
+        if operator_ is not None:
+            tokens.append(_OPERATOR_TOKENS[operator_])
+        elif number is not None:
+            if number.count(".") > 1: raise ExpressionError(f"Invalid number '{number}'.")
+            if tokens and tokens[-1][0] == "number": raise ExpressionError(f"Missing operator between '{tokens[-1][1]}' and '{number}'.")
+            tokens.append(("number", number))
+        else:
+            # Digits only belong to a name when they complete one, as in log2.
+            if digits and any((word + digits).endswith(name) for name in digit_names): word += digits
+            elif digits: position = match.end("word")
+            if word in names:
+                tokens.append(("op", "*") if word == "x" and "x" not in variables else ("name", word))
+                continue
+            start = 0
+            while start < len(word):
+                # The longest known name starting here.
+                name = next((word[start:end] for end in range(min(len(word), start + longest), start, -1) if word[start:end] in names), None)
+                if name is None: raise ExpressionError(f"Unknown name '{word[start:]}'.")
+                tokens.append(("op", "*") if name == "x" and "x" not in variables else ("name", name))
+                start += len(name)
+    return tokens
+
+class _Parser:
+    """Internal Pratt parser turning a token list into a syntax tree of nested tuples."""
+
+    def __init__(self, tokens: list[tuple[str, str]], variables: tuple[str, ...]) -> None:
+        self.tokens = tokens + [None]  # None marks the end, so looking ahead needs no bounds check
+        self.variables = variables
+        self.position = 0
+
+    def peek(self) -> tuple[str, str] | None:
+        return self.tokens[self.position]
+
+    def next(self) -> tuple[str, str]:
+        token = self.tokens[self.position]
+        if token is None: raise ExpressionError("Unexpected end of expression.")
+        self.position += 1
+        return token
+
+    def expect(self, text: str) -> None:
+        token = self.next()
+        if token != ("op", text): raise ExpressionError(f"Expected '{text}' but found '{token[1]}'.")
+
+    def parse(self, right_binding_power: int = 0) -> tuple:
+        left = self.prefix(self.next())
+        tokens = self.tokens
+        while True:
+            token = tokens[self.position]
+            if token is None: return left
+            if token[0] != "op" or token[1] == "(":
+                # Implicit multiplication: a number, name or bracket directly after an operand.
+                if _BINDING_POWER["*"] <= right_binding_power: return left
+                left = ("binary", "*", left, self.parse(_BINDING_POWER["*"]))
+                continue
+            operator_ = token[1]
+            binding_power = _BINDING_POWER.get(operator_)
+            if binding_power is None or binding_power <= right_binding_power: return left
+            self.position += 1
+            if operator_ == "!":
+                left = ("call", "fact", (left,))
+            elif operator_ == "^":
+                left = ("binary", "^", left, self.parse(binding_power - 1))
+            else:
+                left = ("binary", operator_, left, self.parse(binding_power))
+
+    def prefix(self, token: tuple[str, str]) -> tuple:
+        kind, text = token
+        if kind == "number":
+            return ("number", text)
+        if kind == "name":
+            if text in self.variables: return ("variable", self.variables.index(text))
+            if text in CONSTANTS: return ("constant", text)
+            if self.peek() == ("op", "("):
+                self.position += 1
+                arguments = [self.parse()]
+                while self.peek() == ("op", ","):
+                    self.position += 1
+                    arguments.append(self.parse())
+                self.expect(")")
+                return ("call", text, tuple(arguments))
+            # Function without brackets, such as "sin 30" or "sqrt2".
+            return ("call", text, (self.parse(_FUNCTION_ARGUMENT_BINDING_POWER),))
+        if text in "+-":
+            operand = self.parse(_PREFIX_BINDING_POWER)
+            return operand if text == "+" else ("negate", operand)
+        if text == "(":
+            inner = self.parse()
+            self.expect(")")
+            return inner
+        raise ExpressionError(f"Unexpected '{text}'.")
+
+class NumberType:
+    """
+    Defines how numbers are created and functions are evaluated when compiling an expression. The default, FLOAT, uses
+    Python ints for integer literals (so integer arithmetic stays exact) and floats otherwise.
+    """
+    name: str = "float"
+
+    def literal(self, text: str) -> typing.Any:
+        """Convert a number literal to a number."""
+        return int(text) if text.isdigit() else float(text)
+
+    def constant(self, name: str) -> typing.Any:
+        """Get the value of a named constant."""
+        return CONSTANTS[name]
+
+    def function(self, name: str, implementation: typing.Callable) -> typing.Callable:
+        """Get the function to call for a given function name. implementation is the floating-point version of the function."""
+        return implementation
+
+    def context(self) -> typing.ContextManager | None:
+        """Get a context manager to evaluate expressions in, or None if there is none."""
+        return None
+
+FLOAT = NumberType()
+
+class FractionNumberType(NumberType):
+    """
+    Exact rational arithmetic using fractions.Fraction, so 0.1 + 0.2 is exactly 3/10. Functions with irrational results
+    (such as sin or ln) return floats, and anything calculated from a float is a float.
+    """
+    name = "fraction"
+    _exact = {"abs", "floor", "ceil", "round", "fact", "min", "max"}
+
+    @staticmethod
+    def _sqrt(value: fractions.Fraction) -> fractions.Fraction | float:
+        if isinstance(value, fractions.Fraction) and value >= 0:
+            numerator, denominator = math.isqrt(value.numerator), math.isqrt(value.denominator)
+            if numerator * numerator == value.numerator and denominator * denominator == value.denominator:
+                return fractions.Fraction(numerator, denominator)
+        return math.sqrt(value)
+
+    def literal(self, text):
+        return fractions.Fraction(text)
+
+    def function(self, name, implementation):
+        if name == "sqrt": return self._sqrt
+        return FUNCTIONS[name] if name in self._exact else implementation
+
+EXACT = FractionNumberType()
+
+class DecimalNumberType(NumberType):
+    """
+    High-precision arithmetic using decimal.Decimal to a given number of significant digits. Square roots, logarithms and
+    exponentials are calculated to full precision, other functions to floating-point precision.
+    """
+    name = "decimal"
+    _exact = {"abs", "floor", "ceil", "round", "fact", "min", "max"}
+
+    def __init__(self, digits: int = 50) -> None:
+        self.digits = digits
+        self._context = decimal.Context(prec=digits, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+        self._context.traps[decimal.InvalidOperation] = True
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, DecimalNumberType) and other.digits == self.digits
+
+    def __hash__(self) -> int:
+        return hash((self.name, self.digits))
+
+    def _pi(self) -> decimal.Decimal:
+        """Internal method calculating pi to the context's precision, using the series from the decimal module's documentation."""
+        with decimal.localcontext(self._context) as context:
+            context.prec += 2
+            last, term, total, n, na, d, da = 0, decimal.Decimal(3), decimal.Decimal(3), 1, 0, 0, 24
+            while total != last:
+                last = total
+                n, na = n + na, na + 8
+                d, da = d + da, da + 32
+                term = (term * n) / d
+                total += term
+            context.prec -= 2
+            return +total
+
+    def literal(self, text):
+        return decimal.Decimal(text)
+
+    def constant(self, name):
+        with decimal.localcontext(self._context):
+            if name == "pi": return +self._pi()
+            if name == "tau": return 2 * self._pi()
+            if name == "e": return decimal.Decimal(1).exp()
+            if name == "phi": return (1 + decimal.Decimal(5).sqrt()) / 2
+            return decimal.Decimal(CONSTANTS[name])
+
+    def function(self, name, implementation):
+        match name:
+            case "sqrt": return lambda value: decimal.Decimal(value).sqrt()
+            case "ln": return lambda value: decimal.Decimal(value).ln()
+            case "exp": return lambda value: decimal.Decimal(value).exp()
+            case "log": return lambda value, base=10: decimal.Decimal(value).log10() if base == 10 else decimal.Decimal(value).ln() / decimal.Decimal(base).ln()
+            case "log2": return lambda value: decimal.Decimal(value).ln() / decimal.Decimal(2).ln()
+        if name in self._exact: return FUNCTIONS[name]
+        return lambda *values: decimal.Decimal(repr(implementation(*(float(value) for value in values))))
+
+    def context(self):
+        return decimal.localcontext(self._context)
+
+class CompiledExpression:
+    """
+    A compiled expression. Call it with the values of its variables, in the order they were given when compiling.
+
+    Attributes:
+        expression (str): The normalised expression.
+        variables (tuple[str]): The names of the expression's variables.
+        constant (bool): Whether the expression does not depend on its variables, in which case it is evaluated only once.
+    """
+    __slots__ = ("expression", "variables", "constant", "numbers", "_function")
+
+    def __init__(self, expression: str, variables: tuple[str, ...], function: typing.Callable, constant: bool, numbers: NumberType = FLOAT) -> None:
+        self.expression = expression
+        self.variables = variables
+        self.constant = constant
+        self.numbers = numbers
+        self._function = function
+
+    def __call__(self, *values: typing.Any) -> typing.Any:
+        try:
+            context = self.numbers.context()
+            if context is None: return self._function(values)
+            with context:
+                return self._function(values)
+        except (ArithmeticError, ValueError, TypeError) as e:
+            if isinstance(e, ExpressionError): raise
+            raise ExpressionError(str(e)) from e
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.expression!r}, variables={self.variables!r})"
+
+def _function(name: str, degrees: bool, numbers: NumberType) -> typing.Callable:
+    """Internal function getting the implementation of a function for the angle unit and number type."""
+    if name not in FUNCTIONS: raise ExpressionError(f"Unknown function '{name}'.")
+    apply = FUNCTIONS[name]
+    if degrees and name in _ANGLE_INPUT:
+        inner, radians = apply, math.radians
+        apply = lambda value: inner(radians(value))
+    elif degrees and name in _ANGLE_OUTPUT:
+        inner, to_degrees = apply, math.degrees
+        apply = lambda value: to_degrees(inner(value))
+    return numbers.function(name, apply)
+
+def _fold(node: tuple, degrees: bool, numbers: NumberType) -> typing.Any:
+    """Internal function evaluating a syntax tree without variables directly, which is faster than compiling closures to call once."""
+    kind = node[0]
+    if kind == "number": return numbers.literal(node[1])
+    if kind == "constant": return numbers.constant(node[1])
+    if kind == "negate": return -_fold(node[1], degrees, numbers)
+    if kind == "binary": return _BINARY[node[1]](_fold(node[2], degrees, numbers), _fold(node[3], degrees, numbers))
+    return _function(node[1], degrees, numbers)(*[_fold(argument, degrees, numbers) for argument in node[2]])
+
+def _compile_node(node: tuple, degrees: bool, numbers: NumberType) -> tuple[typing.Callable, bool]:
+    """Internal function compiling a syntax tree node into a closure taking the tuple of variable values. Returns the closure and whether it is constant."""
+    kind = node[0]
+    if kind == "number":
+        value = numbers.literal(node[1])
+        return (lambda values: value), True
+    if kind == "constant":
+        value = numbers.constant(node[1])
+        return (lambda values: value), True
+    if kind == "variable":
+        index = node[1]
+        return (lambda values: values[index]), False
+    if kind == "negate":
+        operand, constant = _compile_node(node[1], degrees, numbers)
+        function = lambda values: -operand(values)
+    elif kind == "binary":
+        apply = _BINARY[node[1]]
+        (left, left_constant), (right, right_constant) = _compile_node(node[2], degrees, numbers), _compile_node(node[3], degrees, numbers)
+        constant = left_constant and right_constant
+        if right_constant and not left_constant:
+            right_value = right(())
+            function = lambda values: apply(left(values), right_value)
+        else:
+            function = lambda values: apply(left(values), right(values))
+    else:
+        apply = _function(node[1], degrees, numbers)
+        compiled = [_compile_node(argument, degrees, numbers) for argument in node[2]]
+        arguments = tuple(item[0] for item in compiled)
+        constant = all(item[1] for item in compiled)
+        if len(arguments) == 1:
+            argument = arguments[0]
+            function = lambda values: apply(argument(values))
+        else:
+            function = lambda values: apply(*(argument(values) for argument in arguments))
+    if constant:
+        # Constant folding: evaluate constant sub-expressions once, at compile time (errors are left for evaluation).
+        try:
+            value = function(())
+            return (lambda values: value), True
+        except (ArithmeticError, ValueError, TypeError):
+            pass
+    return function, constant
+
+@functools.lru_cache(maxsize=1024)
+def _compile_normalized(expression: str, variables: tuple[str, ...], degrees: bool, numbers: NumberType) -> CompiledExpression:
+    if not expression: raise ExpressionError("Empty expression.")
+    parser = _Parser(tokenize(expression, variables), variables)
+    tree = parser.parse()
+    if parser.peek() is not None: raise ExpressionError(f"Unexpected '{parser.peek()[1]}'.")
+    with numbers.context() or contextlib.nullcontext():
+        if not variables:
+            # The whole expression is constant, so it is evaluated now (errors are left for evaluation, as below).
+            try:
+                value = _fold(tree, degrees, numbers)
+                return CompiledExpression(expression, variables, lambda values: value, True, numbers)
+            except (ArithmeticError, ValueError, TypeError):
+                pass
+        function, constant = _compile_node(tree, degrees, numbers)
+    return CompiledExpression(expression, variables, function, constant, numbers)
+
+def compile_expression(expression: str, variables: tuple[str, ...] = (), degrees: bool = False, numbers: NumberType = FLOAT) -> CompiledExpression:
+    """
+    Compile an expression into a callable. Compiled expressions are cached (least recently used) by their normalised text.
+
+    Arguments:
+        expression (str): The expression to compile, e.g. "2x^2 + 3x - 1".
+        variables (tuple[str]): The names of the expression's variables, e.g. ("x",). If 'x' is a variable it is no longer a multiplication sign.
+        degrees (bool): Whether trigonometric functions work in degrees instead of radians.
+        numbers (NumberType): How numbers are represented. Defaults to FLOAT.
+
+    Returns:
+        CompiledExpression
+
+    Raises:
+        ExpressionError: If the expression is invalid.
+    """
+    return _compile_normalized(normalize(expression), tuple(name.lower() for name in variables), degrees, numbers)
+
+def evaluate(expression: str, variables: dict[str, typing.Any] | None = None, degrees: bool = False, numbers: NumberType = FLOAT) -> typing.Any:
+    """
+    Evaluate an expression.
+
+    Arguments:
+        expression (str): The expression to evaluate, e.g. "3(4 + 5)^2".
+        variables (dict[str, Any]): The values of any variables used in the expression.
+        degrees (bool): Whether trigonometric functions work in degrees instead of radians.
+        numbers (NumberType): How numbers are represented: FLOAT (the default), EXACT, or a DecimalNumberType.
+
+    Returns:
+        int | float | complex | Fraction | Decimal: The result.
+
+    Raises:
+        ExpressionError: If the expression is invalid or cannot be evaluated.
+    """
+    variables = variables or dict()
+    return compile_expression(expression, tuple(variables), degrees, numbers)(*variables.values())
+
+def is_simple(expression: str) -> bool:
+    """
+    Check whether an expression only uses integers and the operators + - * x ^ % and !. When such an expression evaluates
+    to an integer with FLOAT numbers, integer arithmetic was used throughout, so the result is exact and there is no need
+    to evaluate it again with EXACT or decimal numbers.
+
+    Arguments:
+        expression (str): The expression to check.
+
+    Returns:
+        bool
+    """
+    return all(char in _SIMPLE_CHARACTERS for char in normalize(expression))
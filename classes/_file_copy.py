@@ -0,0 +1,198 @@
+"""
+PUtilities File Copying
+Copying and moving for the Linux Terminal's 'cp' and 'mv' commands. File contents are copied inside the kernel with
+os.copy_file_range or os.sendfile where the system supports it, falling back to buffered copies, and the files of a
+directory tree are copied on a thread pool so that many small files do not wait on each other. Moves within a
+filesystem are a single os.replace. Progress is counted in a CopyProgress, for the terminal to report periodically.
+Do not use tkinter in this module, as it runs on worker threads.
+"""
+
+import os, errno, shutil, threading, time, collections, concurrent.futures, typing
+from classes._disk_usage import format_size
+
+CHUNK_SIZE = 8 * 1024 * 1024  # The most bytes copied at a time, between progress updates
+# Errors meaning a kernel copy is not possible for these files, so that a slower method should be used instead.
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF, errno.ENOTSOCK}
+
+class CopyProgress:
+    """
+    Thread-safe counts of what has been copied.
+
+    Attributes:
+        verb (str): How the progress is described, e.g. 'Copied'.
+        files (int): The number of files copied.
+        bytes (int): The number of bytes copied.
+        errors (list[str]): The files that could not be copied, and why.
+    """
+    def __init__(self, verb: str = "Copied") -> None:
+        self.verb = verb
+        self.files = self.bytes = 0
+        self.errors: list[str] = []
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_bytes(self, count: int) -> None:
+        with self._lock:
+            self.bytes += count
+
+    def add_file(self) -> None:
+        with self._lock:
+            self.files += 1
+
+    def add_error(self, path: str, error: Exception) -> None:
+        with self._lock:
+            self.errors.append(f"Could not copy '{path}'. Error type: {str(error)}")
+
+    def report(self) -> str:
+        """
+        Describe the progress so far.
+
+        Returns:
+            str: e.g. 'Copied 120 files, 1.5G in 4.2s (350.0M/s, 28.6 files/s).'
+        """
+        seconds = max(time.perf_counter() - self.start, 1e-9)
+        return f"{self.verb} {self.files} file{'' if self.files == 1 else 's'}, {format_size(self.bytes)} in {seconds:.1f}s ({format_size(int(self.bytes / seconds))}/s, {self.files / seconds:.1f} files/s)."
+
+def _kernel_copy(source: int, destination: int, progress: CopyProgress, stop: threading.Event | None) -> bool:
+    """Internal helper, copying between file descriptors inside the kernel. Returns False if that is not supported (having copied nothing)."""
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        try:
+            while not (stop and stop.is_set()):
+                count = os.copy_file_range(source, destination, CHUNK_SIZE)
+                if count == 0: return True
+                copied += count
+                progress.add_bytes(count)
+            return True
+        except OSError as e:
+            if copied or e.errno not in _UNSUPPORTED: raise
+    if hasattr(os, "sendfile"):
+        try:
+            while not (stop and stop.is_set()):
+                count = os.sendfile(destination, source, copied, CHUNK_SIZE)
+                if count == 0: return True
+                copied += count
+                progress.add_bytes(count)
+            return True
+        except OSError as e:
+            if copied or e.errno not in _UNSUPPORTED: raise
+    return False
+
+def copy_file(source: str, destination: str, progress: CopyProgress | None = None, stop: threading.Event | None = None) -> None:
+    """
+    Copy a file's contents and permissions, inside the kernel where possible.
+
+    Arguments:
+        source (str): The file to copy.
+        destination (str): The new file. Overwritten if it exists.
+        progress (CopyProgress | None): Counts the bytes and files copied.
+        stop (threading.Event | None): Set to stop copying, deleting the incomplete new file.
+
+    Returns: None
+    """
+    progress = progress or CopyProgress()
+    with open(source, "rb") as source_file, open(destination, "wb") as destination_file:
+        if not _kernel_copy(source_file.fileno(), destination_file.fileno(), progress, stop):
+            while not (stop and stop.is_set()):
+                data = source_file.read(1024 * 1024)
+                if not data: break
+                destination_file.write(data)
+                progress.add_bytes(len(data))
+    if stop and stop.is_set():
+        os.remove(destination)
+        return
+    shutil.copymode(source, destination)
+    progress.add_file()
+
+def copy(source: str, destination: str, progress: CopyProgress, stop: threading.Event | None = None, report_seconds: float = 1, workers: int = 8, in_flight: int = 64) -> typing.Iterator[None]:
+    """
+    Copy a file or directory tree, yielding every report_seconds while it is copying so that the caller can report the
+    progress. The files of a tree are copied on a thread pool, with at most in_flight files queued at once. Files that
+    cannot be copied are recorded in progress.errors.
+
+    Arguments:
+        source (str): The file or directory to copy.
+        destination (str): The new file or directory.
+        progress (CopyProgress): Counts what has been copied.
+        stop (threading.Event | None): Set to stop copying.
+        report_seconds (float): How often to yield.
+        workers (int): The number of files copied at once.
+        in_flight (int): The most files queued at once.
+
+    Returns:
+        Iterator[None]
+    """
+    stop = stop or threading.Event()
+    pending: collections.deque[tuple[concurrent.futures.Future, str]] = collections.deque()
+    last_report = time.perf_counter()
+
+    def wait(limit: int) -> typing.Iterator[None]:
+        nonlocal last_report
+        while len(pending) > limit:
+            future, path = pending[0]
+            try:
+                future.result(timeout=max(0, last_report + report_seconds - time.perf_counter()))
+            except concurrent.futures.TimeoutError:
+                pass
+            except Exception as e:
+                progress.add_error(path, e)
+            if future.done(): pending.popleft()
+            if time.perf_counter() >= last_report + report_seconds:
+                last_report = time.perf_counter()
+                yield None
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            if not os.path.isdir(source):
+                pending.append((pool.submit(copy_file, source, destination, progress, stop), source))
+            else:
+                directories = [(source, destination)]
+                while directories and not stop.is_set():
+                    current, target = directories.pop()
+                    try:
+                        os.makedirs(target, exist_ok=True)
+                        with os.scandir(current) as entries:
+                            for entry in entries:
+                                if entry.is_dir(follow_symlinks=False):
+                                    directories.append((entry.path, os.path.join(target, entry.name)))
+                                    continue
+                                pending.append((pool.submit(copy_file, entry.path, os.path.join(target, entry.name), progress, stop), entry.path))
+                                yield from wait(in_flight)
+                                if stop.is_set(): break
+                        shutil.copymode(current, target)
+                    except OSError as e:
+                        progress.add_error(current, e)
+            yield from wait(0)
+        except BaseException:
+            # Closed early (e.g. cancelled), so stop the files being copied before the pool waits for them.
+            stop.set()
+            for future, path in pending:
+                future.cancel()
+            raise
+
+def move(source: str, destination: str, progress: CopyProgress, stop: threading.Event | None = None) -> typing.Iterator[None]:
+    """
+    Move a file or directory, renaming it if the destination is on the same filesystem (which counts nothing in the
+    progress), and otherwise copying it (see copy(), yielding periodically) and then deleting the original if everything
+    was copied.
+
+    Arguments:
+        source (str): The file or directory to move.
+        destination (str): The new path.
+        progress (CopyProgress): Counts what has been moved.
+        stop (threading.Event | None): Set to stop copying, keeping the original.
+
+    Returns:
+        Iterator[None]
+    """
+    try:
+        os.replace(source, destination)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV: raise
+    stop = stop or threading.Event()
+    yield from copy(source, destination, progress, stop)
+    # Stopping may leave the copy incomplete, so the original is only deleted once everything has been copied.
+    if progress.errors or stop.is_set(): return
+    if os.path.isdir(source): shutil.rmtree(source)
+    else: os.remove(source)
@@ -0,0 +1,224 @@
+"""
+PUtilities Syntax Highlighting
+Pluggable, line-based syntax highlighters for the TextEditor. Each highlighter tokenizes a single line given the state
+the line starts in (for example, inside a fenced code block or a triple-quoted string), and the HighlightManager caches
+that start state per line. After an edit only the edited lines are re-tokenized, followed by any lines whose start state
+changed as a result, so highlighting costs O(edit size) rather than O(document).
+"""
+
+from classes.Utilities import *
+import re
+
+TYPE_TOKENS = list[tuple[str, int, int]]
+
+class Highlighter:
+    """
+    Base class for syntax highlighters. Override tokenize(), and the class attributes below.
+
+    Attributes:
+        extensions (tuple[str]): The file extensions (including the '.') this highlighter is used for.
+        styles (dict[str, str]): The foreground colour of each style name returned by tokenize().
+        initial_state (Hashable): The state the first line of a document starts in.
+    """
+    extensions: tuple[str] = ()
+    styles: dict[str, str] = dict()
+    initial_state: typing.Hashable = None
+
+    def tokenize(self, line: str, state: typing.Hashable) -> tuple[TYPE_TOKENS, typing.Hashable]:
+        """
+        Tokenize a single line of text.
+
+        Arguments:
+            line (str): The line to tokenize, without its newline.
+            state (Hashable): The state the line starts in (the state the previous line ended in).
+
+        Returns:
+            tuple[list[tuple[str, int, int]], Hashable]: A list of (style, start column, end column) tokens, and the state the line ends in.
+        """
+        return [], state
+
+    def _match_all(self, pattern: re.Pattern, line: str, offset: int = 0) -> TYPE_TOKENS:
+        """Internal helper, turning every named group matched by pattern into a token."""
+        return [(match.lastgroup, match.start(), match.end()) for match in pattern.finditer(line, offset)]
+
+class MarkdownHighlighter(Highlighter):
+    """Markdown highlighter. The state is whether the line is inside a fenced code block."""
+    extensions = (".md", ".markdown")
+    styles = {"heading": "#C05000", "code": "#2E7D32", "emphasis": "#6A1B9A", "link": "#1565C0", "list": "#FE9900", "quote": "#757575"}
+    initial_state = False
+    _fence = re.compile(r"^\s*(```|~~~)")
+    _block = re.compile(r"^(?P<heading>#{1,6}\s.*)|^(?P<quote>\s*>.*)")
+    _inline = re.compile(r"(?P<code>`[^`]+`)|(?P<emphasis>\*\*[^*]+\*\*|__[^_]+__|\*[^*\s][^*]*\*|_[^_\s][^_]*_)|(?P<link>!?\[[^\]]*\]\([^)]*\))|^(?P<list>\s*(?:[-*+]|\d+\.)(?=\s))")
+
+    def tokenize(self, line, state):
+        if self._fence.match(line): return [("code", 0, len(line))], not state
+        if state: return [("code", 0, len(line))], state
+        block = self._block.match(line)
+        if block: return [(block.lastgroup, 0, len(line))], state
+        return self._match_all(self._inline, line), state
+
+class JsonHighlighter(Highlighter):
+    """JSON highlighter. JSON strings cannot span lines, so this highlighter is stateless."""
+    extensions = (".json",)
+    styles = {"key": "#1565C0", "string": "#2E7D32", "number": "#C05000", "literal": "#6A1B9A"}
+    _tokens = re.compile(r'(?P<key>"(?:\\.|[^"\\])*"(?=\s*:))|(?P<string>"(?:\\.|[^"\\])*"?)|(?P<number>-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b)|(?P<literal>\b(?:true|false|null)\b)')
+
+    def tokenize(self, line, state):
+        return self._match_all(self._tokens, line), state
+
+class IniHighlighter(Highlighter):
+    """INI (configuration file) highlighter. Stateless."""
+    extensions = (".ini", ".cfg", ".conf")
+    styles = {"section": "#C05000", "comment": "#757575", "key": "#1565C0", "value": "#2E7D32"}
+    _line = re.compile(r"^(?P<section>\s*\[.*\]\s*)$|^(?P<comment>\s*[;#].*)$|^(?P<key>\s*[^=:\s][^=:]*?)\s*[=:]")
+
+    def tokenize(self, line, state):
+        match = self._line.match(line)
+        if not match: return [], state
+        if match.lastgroup != "key": return [(match.lastgroup, match.start(), match.end())], state
+        return [("key", match.start("key"), match.end("key")), ("value", match.end(), len(line))], state
+
+class PythonHighlighter(Highlighter):
+    """Python highlighter. The state is the quote of the triple-quoted string the line starts in, or None."""
+    extensions = (".py", ".pyw")
+    styles = {"keyword": "#0000C0", "builtin": "#6A1B9A", "string": "#2E7D32", "comment": "#757575", "number": "#C05000", "decorator": "#FE9900", "definition": "#1565C0"}
+    _keywords = ("False", "None", "True", "and", "as", "assert", "async", "await", "break", "class", "continue", "def", "del", "elif", "else",
+        "except", "finally", "for", "from", "global", "if", "import", "in", "is", "lambda", "match", "case", "nonlocal", "not", "or", "pass",
+        "raise", "return", "try", "while", "with", "yield")
+    _builtins = ("print", "len", "range", "int", "float", "str", "list", "dict", "set", "tuple", "bool", "open", "isinstance", "super", "self",
+        "enumerate", "zip", "map", "filter", "sorted", "min", "max", "sum", "abs", "round", "type", "object", "Exception")
+    _tokens = re.compile(
+        r"(?P<comment>#.*)"
+        r"|(?P<triple>[rRbBuUfF]{0,2}(?:\"\"\"|'''))"
+        r"|(?P<string>[rRbBuUfF]{0,2}(?:\"(?:\\.|[^\"\\])*\"?|'(?:\\.|[^'\\])*'?))"
+        r"|(?<=\bdef\s)(?P<definition>\w+)|(?<=\bclass\s)(?P<definition2>\w+)"
+        r"|(?P<decorator>^\s*@[\w.]+)"
+        r"|(?P<keyword>\b(?:" + "|".join(_keywords) + r")\b)"
+        r"|(?P<builtin>\b(?:" + "|".join(_builtins) + r")\b)"
+        r"|(?P<number>\b(?:0[xXoObB][\da-fA-F_]+|\d[\d_]*\.?[\d_]*(?:[eE][+-]?\d+)?j?)\b)")
+
+    def tokenize(self, line, state):
+        tokens, position = [], 0
+        while True:
+            if state:
+                close = line.find(state, position)
+                if close == -1: tokens.append(("string", position, len(line))); return tokens, state
+                tokens.append(("string", position, close + 3))
+                position, state = close + 3, None
+            match = self._tokens.search(line, position)
+            while match and match.lastgroup != "triple":
+                tokens.append(("definition" if match.lastgroup == "definition2" else match.lastgroup, match.start(), match.end()))
+                match = self._tokens.search(line, match.end())
+            if not match: return tokens, state
+            # A triple-quoted string starts here, continue scanning for its closing quote.
+            state = match.group()[-3:]
+            tokens.append(("string", match.start(), match.end()))
+            position = match.end()
+
+HIGHLIGHTERS: list[type[Highlighter]] = [MarkdownHighlighter, JsonHighlighter, IniHighlighter, PythonHighlighter]
+
+def get_highlighter(filepath: str | None) -> Highlighter | None:
+    """
+    Get a highlighter for a file based on its extension.
+
+    Arguments:
+        filepath (str | None): The filepath of the file.
+
+    Returns:
+        Highlighter | None: A new highlighter, or None if the file should be shown as plain text.
+    """
+    if not filepath: return None
+    extension = os.path.splitext(filepath)[1].lower()
+    for highlighter in HIGHLIGHTERS:
+        if extension in highlighter.extensions: return highlighter()
+    return None
+
+class HighlightManager:
+    """
+    Applies a Highlighter to a ScrollableTextBox and keeps it up to date as the text is edited.
+
+    Attributes:
+        states (list[Hashable]): The cached tokenizer state each line starts in. states[i] is the start state of line i + 1.
+        highlighted (int): The number of lines (from the top) that have been highlighted. The rest are highlighted in the background in chunks.
+    """
+    CHUNK_LINES: int = 1000
+    TAG_PREFIX: str = "highlight_"
+
+    def __init__(self, textbox: ScrollableTextBox) -> None:
+        self.textbox = textbox
+        self.text_widget = textbox.text_widget
+        self.highlighter: Highlighter | None = None
+        self.states: list[typing.Hashable] = [None]
+        self.highlighted = 0
+        self._after_id = None
+        textbox.add_edit_listener(self._on_edit)
+
+    def set_highlighter(self, highlighter: Highlighter | None) -> None:
+        """
+        Change the highlighter, removing the old highlighting and highlighting the whole document in the background.
+
+        Arguments:
+            highlighter (Highlighter | None): The new highlighter, or None for plain text.
+
+        Returns: None
+        """
+        if self._after_id is not None:
+            self.text_widget.after_cancel(self._after_id)
+            self._after_id = None
+        if self.highlighter:
+            for style in self.highlighter.styles:
+                self.text_widget.tag_remove(self.TAG_PREFIX + style, "1.0", tk.END)
+        self.highlighter = highlighter
+        self.highlighted = 0
+        if not highlighter: return
+        for style, colour in highlighter.styles.items():
+            self.text_widget.tag_configure(self.TAG_PREFIX + style, foreground=colour)
+        self.states = [highlighter.initial_state] * self._line_count()
+        self._highlight_chunk()
+
+    def _line_count(self) -> int:
+        """Internal helper for getting the number of lines in the text box."""
+        return int(self.text_widget.index("end - 1 chars").split(".")[0])
+
+    def _highlight_chunk(self) -> None:
+        """Internal method, highlighting the next CHUNK_LINES lines and scheduling itself until the document is highlighted."""
+        self._after_id = None
+        last = min(self.highlighted + self.CHUNK_LINES, len(self.states))
+        for line in range(self.highlighted + 1, last + 1):
+            state = self._highlight_line(line, self.states[line - 1])
+            if line < len(self.states): self.states[line] = state
+        self.highlighted = last
+        if last < len(self.states):
+            self._after_id = self.text_widget.after(1, self._highlight_chunk)
+
+    def _highlight_line(self, line: int, state: typing.Hashable) -> typing.Hashable:
+        """Internal method, re-tokenizing and re-tagging a single line. Returns the state the line ends in."""
+        start, end = f"{line}.0", f"{line}.end"
+        tokens, state = self.highlighter.tokenize(self.text_widget.get(start, end), state)
+        for style in self.highlighter.styles:
+            self.text_widget.tag_remove(self.TAG_PREFIX + style, start, end)
+        for style, first, last in tokens:
+            self.text_widget.tag_add(self.TAG_PREFIX + style, f"{line}.{first}", f"{line}.{last}")
+        return state
+
+    def _on_edit(self, action: str, index: str, text: str) -> None:
+        """Internal edit listener. Keeps the cached line states aligned with the text, then re-highlights the edited lines."""
+        if not self.highlighter: return
+        line, newlines = int(index.split(".")[0]), text.count("\n")
+        if action == "insert":
+            self.states[line:line] = [None] * newlines
+            if self.highlighted >= line: self.highlighted += newlines
+            last = line + newlines
+        else:
+            del self.states[line:line + newlines]
+            if self.highlighted >= line + newlines: self.highlighted -= newlines
+            elif self.highlighted >= line: self.highlighted = line - 1
+            last = line
+
+        # Re-tokenize the edited lines, then continue only while the start state of the following line changes.
+        while line <= self.highlighted:
+            state = self._highlight_line(line, self.states[line - 1])
+            if line == len(self.states): break
+            if line >= last and self.states[line] == state: break
+            self.states[line] = state
+            line += 1
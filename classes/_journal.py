@@ -0,0 +1,204 @@
+"""
+PUtilities Document Journal
+Append-only crash-recovery journals for open documents. Each journal starts with a header line describing the document
+and is followed by one JSON record per edit. Journals are stored under config/journals and are deleted (compacted) every
+time the document is really saved, so that a journal only ever holds the edits made since the last save.
+"""
+
+from classes.Utilities import *
+import contextlib, glob, uuid
+
+JOURNALS_FILEPATH = PFileHandler.CONFIG_FILEPATH + "/journals"
+
+class DocumentJournal:
+    """
+    Crash-recovery journal for a single open document.
+    Edits to the registered text boxes are captured as deltas from ScrollableTextBox.add_edit_listener() and buffered in memory.
+    Every few seconds the buffer is coalesced and appended to the journal file in a single write. Entries are recorded as
+    a snapshot of their value whenever it changes.
+
+    Records (one JSON list per line):
+        ["i", key, index, text]: Insert text at index in the text box with the given key.
+        ["d", key, index, count]: Delete count characters from index in the text box with the given key.
+        ["s", key, value]: Set the entry with the given key to value.
+    """
+    COALESCE_INTERVAL_MS: int = 3000
+
+    def __init__(self, tab: TabFrame, kind: str, textboxes: dict[str, ScrollableTextBox], entries: dict[str, ttk.Entry] | None = None) -> None:
+        """
+        Create a journal for a document open in the given tab. The journal file is only created once the first edit is flushed.
+
+        Arguments:
+            tab (TabFrame): The tab the document is open in. Used to schedule the coalescing timer.
+            kind (str): The kind of document ("text" or "lesson"), used by the Window to pick a tab when recovering.
+            textboxes (dict[str, ScrollableTextBox]): The text boxes of the document, keyed by a stable name.
+            entries (dict[str, ttk.Entry]): The entries of the document, keyed by a stable name.
+        """
+        self.tab = tab
+        self.kind = kind
+        self.textboxes = textboxes
+        self.entries = entries or dict()
+        self.filepath: str | None = None
+        self.journal_filepath = f"{JOURNALS_FILEPATH}/{uuid.uuid4().hex}.journal"
+        self._buffer: list[list] = []
+        self._snapshots = {key: entry.get() for key, entry in self.entries.items()}
+        self._paused = False
+        self._after_id = None
+        for key, textbox in self.textboxes.items():
+            textbox.add_edit_listener(lambda action, index, text, key=key: self._record(key, action, index, text))
+        self._after_id = self.tab.after(self.COALESCE_INTERVAL_MS, self._tick)
+
+    def _record(self, key: str, action: str, index: str, text: str) -> None:
+        """Internal edit listener. Buffers an edit, merging it into the previous record where possible (consecutive keystrokes)."""
+        if self._paused: return
+        last = self._buffer[-1] if self._buffer else None
+        if action == "insert":
+            if last and last[0] == "i" and last[1] == key and get_index_after(last[2], last[3]) == index:
+                last[3] += text
+            else:
+                self._buffer.append(["i", key, index, text])
+        else:
+            if last and last[0] == "d" and last[1] == key and get_index_after(index, text) == last[2]:
+                last[2] = index
+                last[3] += len(text)
+            elif last and last[0] == "d" and last[1] == key and last[2] == index:
+                last[3] += len(text)
+            else:
+                self._buffer.append(["d", key, index, len(text)])
+
+    def _tick(self) -> None:
+        """Internal timer, flushing the journal every COALESCE_INTERVAL_MS milliseconds."""
+        self.flush()
+        self._after_id = self.tab.after(self.COALESCE_INTERVAL_MS, self._tick)
+
+    def flush(self) -> None:
+        """
+        Append all buffered edits (and changed entry values) to the journal file in a single write.
+
+        Returns: None
+        """
+        if self._paused: return
+        values = {key: entry.get() for key, entry in self.entries.items()}
+        changed = [key for key, value in values.items() if value != self._snapshots[key]]
+        if not self._buffer and not changed: return
+        # A new journal records every entry, so that recovering an unsaved document does not fall back to the defaults.
+        creating = not os.path.exists(self.journal_filepath)
+        for key in (values if creating else changed):
+            self._buffer.append(["s", key, values[key]])
+        self._snapshots = values
+        lines = [json.dumps(record) for record in self._buffer]
+        if creating:
+            os.makedirs(JOURNALS_FILEPATH, exist_ok=True)
+            lines.insert(0, json.dumps({"kind": self.kind, "filepath": self.filepath, "created": f"{get_date()} {get_hour_minute()}"}))
+        try:
+            with open(self.journal_filepath, "a") as file:
+                file.write("\n".join(lines) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+        except OSError as e:
+            ERROR_LOG.log_tab_error("journal", f"Could not write to journal '{self.journal_filepath}'. Error type: {str(e)}")
+            return
+        self._buffer.clear()
+
+    def compact(self, filepath: str | None = None) -> None:
+        """
+        Compact the journal after the document has been saved (or freshly loaded) from filepath. As the saved file now holds
+        every edit, the journal file is removed and the next flushed edit starts a new journal on top of the saved file.
+
+        Arguments:
+            filepath (str | None): The filepath the document was saved to or loaded from, or None for an unsaved document.
+
+        Returns: None
+        """
+        self.filepath = filepath
+        self._buffer.clear()
+        self._snapshots = {key: entry.get() for key, entry in self.entries.items()}
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.journal_filepath)
+
+    @contextlib.contextmanager
+    def paused(self) -> typing.Iterator[None]:
+        """Context manager pausing the journal, used while loading a file so that the load itself is not journalled."""
+        self._paused = True
+        try:
+            yield
+        finally:
+            self._paused = False
+
+    def replay(self, records: list[list]) -> None:
+        """
+        Apply journal records (see DocumentJournal.read()) to the document's widgets. The document should already hold the
+        file the journal was written on top of. Should be called from within DocumentJournal.paused().
+
+        Arguments:
+            records (list[list]): The records to replay.
+
+        Returns: None
+        """
+        for record in records:
+            if record[0] == "i" and record[1] in self.textboxes:
+                self.textboxes[record[1]].text_widget.insert(record[2], record[3])
+            elif record[0] == "d" and record[1] in self.textboxes:
+                self.textboxes[record[1]].text_widget.delete(record[2], f"{record[2]} + {record[3]} chars")
+            elif record[0] == "s" and record[1] in self.entries:
+                self.entries[record[1]].delete(0, tk.END)
+                self.entries[record[1]].insert(0, record[2])
+        self._snapshots = {key: entry.get() for key, entry in self.entries.items()}
+
+    def adopt(self, journal_filepath: str, filepath: str | None) -> None:
+        """
+        Continue appending to a recovered journal instead of starting a new one, so that the recovered edits stay journalled
+        until the document is saved.
+
+        Arguments:
+            journal_filepath (str): The recovered journal's filepath.
+            filepath (str | None): The filepath of the document the recovered journal was written on top of.
+
+        Returns: None
+        """
+        self.compact(filepath)
+        self.journal_filepath = journal_filepath
+
+    def discard(self) -> None:
+        """
+        Stop the journal and delete its file. Called when the document's tab is closed.
+
+        Returns: None
+        """
+        if self._after_id is not None:
+            self.tab.after_cancel(self._after_id)
+            self._after_id = None
+        self._paused = True
+        self.compact(self.filepath)
+
+    @staticmethod
+    def read(journal_filepath: str) -> tuple[dict, list[list]]:
+        """
+        Read a journal file. A partially written final line (from a crash during a write) is ignored.
+
+        Arguments:
+            journal_filepath (str): The journal's filepath.
+
+        Returns:
+            tuple[dict, list[list]]: The journal header and its records.
+        """
+        header, records = dict(), []
+        with open(journal_filepath, "r") as file:
+            for number, line in enumerate(file):
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if number == 0: header = item
+                else: records.append(item)
+        return header, records
+
+    @staticmethod
+    def pending() -> list[str]:
+        """
+        Get the filepaths of all journals left behind by a previous session, oldest first.
+
+        Returns:
+            list[str]
+        """
+        return sorted(glob.glob(JOURNALS_FILEPATH + "/*.journal"), key=os.path.getmtime)
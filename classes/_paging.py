@@ -0,0 +1,151 @@
+"""
+PUtilities Paging
+Reading parts of huge files for the Linux Terminal's 'tail' and 'less' commands without reading the whole file. Pages
+are addressed by the byte offset of their first line rather than by line number: reading forwards from an offset only
+reads that page, and lines before an offset (or at the end of the file) are found by reading backwards in blocks and
+counting newlines, so a multi-gigabyte file opens at either end instantly.
+Do not use tkinter in this module, as 'tail' runs on a worker thread.
+"""
+
+import os, time, typing
+
+BLOCK_SIZE = 64 * 1024  # The number of bytes read at a time when reading backwards
+MAX_LINE = 64 * 1024  # Longer lines are split, so that a file without newlines does not have to be read whole
+FOLLOW_LIMIT = 1024 * 1024  # The most bytes read at a time when following a file
+
+def _decode(line: bytes) -> str:
+    return line.rstrip(b"\r\n").decode("utf-8", errors="replace")
+
+class PagedFile:
+    """
+    An open file read a page of lines at a time.
+
+    Attributes:
+        filepath (str): The file.
+    """
+    def __init__(self, filepath: str) -> None:
+        self.filepath = filepath
+        self._file = open(filepath, "rb")
+
+    @property
+    def size(self) -> int:
+        """The current size of the file in bytes, which may change while it is open."""
+        return os.fstat(self._file.fileno()).st_size
+
+    def lines_after(self, offset: int, count: int) -> tuple[list[str], int]:
+        """
+        Read lines forwards from an offset.
+
+        Arguments:
+            offset (int): The offset of the first line.
+            count (int): The most lines to read.
+
+        Returns:
+            tuple[list[str], int]: The lines, and the offset of the line after them.
+        """
+        self._file.seek(offset)
+        lines = []
+        for _ in range(count):
+            line = self._file.readline(MAX_LINE)
+            if not line: break
+            lines.append(_decode(line))
+        return lines, self._file.tell()
+
+    def line_start_before(self, offset: int, count: int) -> int:
+        """
+        Find the start of the line a number of lines before an offset, reading backwards in blocks.
+
+        Arguments:
+            offset (int): The offset of a line's start.
+            count (int): The number of lines to go back.
+
+        Returns:
+            int: The offset, or 0 if there are fewer lines before it.
+        """
+        end = offset - 1  # The newline ending the line before offset does not start a line
+        while count > 0 and end > 0:
+            start = max(0, end - BLOCK_SIZE)
+            self._file.seek(start)
+            block = self._file.read(end - start)
+            index = len(block)
+            while count > 0:
+                index = block.rfind(b"\n", 0, index)
+                if index < 0: break
+                count -= 1
+                if count == 0: return start + index + 1
+            end = start
+        return 0
+
+    def last_lines_start(self, count: int) -> int:
+        """
+        Find the start of the last lines of the file.
+
+        Arguments:
+            count (int): The number of lines.
+
+        Returns:
+            int: The offset.
+        """
+        size = self.size
+        if size == 0: return 0
+        self._file.seek(size - 1)
+        # A last line without a newline still counts as a line.
+        return self.line_start_before(size if self._file.read(1) == b"\n" else size + 1, count)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "PagedFile":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+def tail_lines(filepath: str, count: int) -> tuple[list[str], int]:
+    """
+    Read the last lines of a file.
+
+    Arguments:
+        filepath (str): The file.
+        count (int): The number of lines.
+
+    Returns:
+        tuple[list[str], int]: The lines, and the offset after them (for following the file).
+    """
+    with PagedFile(filepath) as file:
+        return file.lines_after(file.last_lines_start(count), count)
+
+def follow(filepath: str, position: int, poll_seconds: float = 0.25) -> typing.Iterator[list[str] | None]:
+    """
+    Follow the lines appended to a file, without blocking: each step yields a list of new lines, or None if there are
+    none yet, checking the file at most every poll_seconds. It runs until it is closed.
+
+    Arguments:
+        filepath (str): The file.
+        position (int): The offset to follow from, usually its size.
+        poll_seconds (float): How often to check the file for new lines.
+
+    Returns:
+        Iterator[list[str] | None]
+    """
+    partial, checked = b"", 0.0
+    with open(filepath, "rb") as file:
+        while True:
+            if time.perf_counter() - checked < poll_seconds:
+                yield None
+                continue
+            checked = time.perf_counter()
+            size = os.fstat(file.fileno()).st_size
+            if size < position:
+                position, partial = 0, b""
+                yield [f"{os.path.basename(filepath)}: file truncated"]
+            if size == position:
+                yield None
+                continue
+            file.seek(position)
+            data = file.read(min(size - position, FOLLOW_LIMIT))
+            position += len(data)
+            *lines, partial = (partial + data).split(b"\n")
+            if len(lines) == 0 and len(partial) >= MAX_LINE: lines, partial = [partial], b""
+            yield [_decode(line) for line in lines] or None
+            checked = 0.0 if position < size else checked  # Keep reading without waiting while behind
@@ -0,0 +1,581 @@
+"""
+PUtilities Prime Service
+A shared, growable sieve of Eratosthenes used by the Command Line's number theory commands. Only odd numbers are stored,
+one bit each, in a bytearray, and the sieve is extended on demand one segment at a time. The sieve can be persisted to
+a cache file (config/cache/primes.sieve) so that later sessions start warm. Only the main process writes the cache, replacing
+it whole (through a temporary file) whenever the sieve grows, and its header records the segment size, the number of
+segments and a checksum, so that a damaged or mismatched file is ignored and the numbers are sieved again. What worker
+processes add to their sieves is sent back to the main process after each call (see _workers.share_state()) and saved there.
+Numbers too large for the sieve are tested with Miller-Rabin and factorised with Pollard's rho algorithm (Brent's
+variant) once their small prime factors have been divided out.
+Do not import Utilities into this module, so that it can be used in worker processes without tkinter.
+"""
+
+import os, math, heapq, random, itertools, functools, typing, struct, hashlib, multiprocessing, threading
+import classes._workers as _workers
+
+CACHE_FILEPATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "cache", "primes.sieve")
+_MAGIC = b"PSIEVE2\n"
+_HEADER = struct.Struct("<QQ32s")  # Segment bits, number of segments, SHA-256 of the bits
+# bytes.translate() tables between sieve bytes (0 or 1) and the ASCII digits used to pack them into bits.
+_TO_ASCII = bytes.maketrans(b"\x00\x01", b"01")
+_FROM_ASCII = bytes.maketrans(b"01", b"\x00\x01")
+# Miller-Rabin with these bases is deterministic below 3.3 * 10^24, which covers every 64-bit number.
+_MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+_MILLER_RABIN_LIMIT = 3_317_044_064_679_887_385_961_981
+_MILLER_RABIN_ROUNDS = 20
+# Factors below this are found by trial division before Pollard's rho is used.
+_TRIAL_DIVISION_LIMIT = 1 << 16
+# Ranges are processed in windows of this many numbers, and split between worker processes past the parallel threshold.
+_WINDOW_SIZE = 1 << 16
+_PARALLEL_WINDOW_SIZE = 1 << 20
+_PARALLEL_THRESHOLD = 1 << 23
+# Base primes beyond the shared sieve's direct limit are sieved this many numbers at a time, rather than all at once.
+_BASE_SEGMENT_SIZE = 1 << 20
+
+def _simple_sieve(limit: int) -> list[int]:
+    """Internal helper, returning the odd primes up to and including limit with a plain (unsegmented) sieve."""
+    if limit < 3: return []
+    flags = bytearray([1]) * ((limit - 1) // 2)  # flags[i] is 2i + 3
+    for i in range((math.isqrt(limit) - 1) // 2):
+        if flags[i]:
+            p = 2 * i + 3
+            start = (p * p - 3) // 2
+            flags[start::p] = bytes(len(range(start, len(flags), p)))
+    return [2 * i + 3 for i in itertools.compress(range(len(flags)), flags)]
+
+def _unpack(data: bytes | bytearray) -> bytes:
+    """Internal helper, unpacking bits (least significant first) into one byte (0 or 1) per bit."""
+    if not data: return b""
+    return format(int.from_bytes(data, "little"), f"0{len(data) * 8}b").encode()[::-1].translate(_FROM_ASCII)
+
+class PrimeSieve:
+    """
+    A segmented sieve of Eratosthenes over the odd numbers, stored as a bitset. Bit i is set when 2i + 1 is prime.
+
+    Attributes:
+        segment_bits (int): The number of odd numbers sieved at a time when the sieve is extended.
+        max_direct_limit (int): The largest number looked up directly in the sieve by is_prime(). Larger numbers are
+            trial divided by the sieve's primes instead, so that one large query does not grow the sieve unboundedly.
+        small_limit (int): The primes below this are also kept as a list, as they are used for trial division all the
+            time. Larger primes are read from the bits when they are needed.
+    """
+    segment_bits: int = 1 << 18
+    max_direct_limit: int = 1 << 24
+    small_limit: int = 1 << 16
+
+    def __init__(self, cache_filepath: str | None = None) -> None:
+        """
+        Create an empty sieve.
+
+        Arguments:
+            cache_filepath (str | None): The file to persist the sieve to, or None to keep it in memory only. An existing
+                cache file is loaded the first time the sieve is used.
+        """
+        self.cache_filepath = cache_filepath
+        self._bits = bytearray()
+        self._small_primes: list[int] = []  # The primes below small_limit, once they are needed
+        self._lock = threading.RLock()  # Ranges sieve on a worker thread while commands use the sieve
+        self._loaded = cache_filepath is None
+        self._saved_size = 0  # The number of bytes of the sieve in the cache file
+
+    @property
+    def limit(self) -> int:
+        """Every number below limit has been sieved."""
+        self._load()
+        return len(self._bits) * 16
+
+    def _load(self) -> None:
+        """Internal method, loading the cache file (once) if there is one and it is intact."""
+        if self._loaded: return
+        with self._lock:
+            if self._loaded: return
+            self._loaded = True
+            try:
+                with open(self.cache_filepath, "rb") as file:
+                    if file.read(len(_MAGIC)) != _MAGIC: return
+                    segment_bits, segments, checksum = _HEADER.unpack(file.read(_HEADER.size))
+                    bits = file.read()
+            except (OSError, struct.error):
+                return
+            if segment_bits != self.segment_bits or len(bits) != segments * segment_bits // 8 or hashlib.sha256(bits).digest() != checksum:
+                return  # Damaged or from a different version, so the sieve is rebuilt (and the file replaced) as it is used
+            self._bits = bytearray(bits)
+            self._saved_size = len(bits)
+
+    def _save(self) -> None:
+        """
+        Internal method, replacing the cache file with the sieve if it has grown. Worker processes have their own sieves,
+        so only the main process saves. Persistence is optional, so errors are ignored.
+        """
+        if self.cache_filepath is None or len(self._bits) <= self._saved_size: return
+        if multiprocessing.parent_process() is not None: return
+        temporary = f"{self.cache_filepath}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_filepath), exist_ok=True)
+            with open(temporary, "wb") as file:
+                file.write(_MAGIC + _HEADER.pack(self.segment_bits, len(self._bits) * 8 // self.segment_bits, hashlib.sha256(self._bits).digest()))
+                file.write(self._bits)
+            os.replace(temporary, self.cache_filepath)
+            self._saved_size = len(self._bits)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+    def merge(self, offset: int, data: bytes) -> None:
+        """
+        Add bits sieved by another sieve (such as a worker process's) and save them. Sieves grow identically, so only the
+        bits beyond this sieve's end are used.
+
+        Arguments:
+            offset (int): The byte offset of data in the other sieve, which must not be beyond this sieve's end.
+            data (bytes): The other sieve's bits from offset.
+
+        Returns: None
+        """
+        with self._lock:
+            self._load()
+            skip = len(self._bits) - offset
+            if skip < 0 or skip >= len(data) or len(data) % (self.segment_bits // 8): return
+            self._bits += data[skip:]
+            self._save()
+
+    def _iterate_bits(self, first_bit: int, last_bit: int) -> typing.Iterator[int]:
+        """Internal generator, yielding the primes 2i + 1 for set bits i in [first_bit, last_bit)."""
+        chunk = self.segment_bits
+        for start in range(first_bit - first_bit % 8, last_bit, chunk):
+            stop = min(start + chunk, last_bit + (-last_bit) % 8)
+            flags = _unpack(self._bits[start // 8:stop // 8])
+            low, high = max(first_bit - start, 0), min(last_bit - start, len(flags))
+            yield from (2 * (start + i) + 1 for i in itertools.compress(range(low, high), flags[low:high]))
+
+    def extend(self, limit: int) -> None:
+        """
+        Sieve every number below limit, one segment at a time.
+
+        Arguments:
+            limit (int): The number to sieve up to.
+
+        Returns: None
+        """
+        if self.limit >= limit: return
+        with self._lock:
+            while self.limit < limit:
+                first = len(self._bits) * 8
+                last = first + self.segment_bits
+                high = 2 * last  # Numbers below high are sieved by this segment
+                base = self.primes_up_to(math.isqrt(high)) if math.isqrt(high) < self.limit else [2] + _simple_sieve(math.isqrt(high))
+                flags = bytearray([1]) * self.segment_bits
+                if first == 0: flags[0] = 0  # 1 is not prime
+                for p in itertools.islice(base, 1, None):
+                    if p * p >= high: break
+                    # The first odd multiple of p in the segment, starting at p squared.
+                    multiple = max(p * p, -(-(2 * first + 1) // p) * p)
+                    if multiple % 2 == 0: multiple += p
+                    index = (multiple - 1) // 2 - first
+                    flags[index::p] = bytes(len(range(index, self.segment_bits, p)))
+                data = int(flags[::-1].translate(_TO_ASCII), 2).to_bytes(self.segment_bits // 8, "little")
+                self._bits += data
+            self._save()
+
+    def is_prime(self, number: int) -> bool:
+        """
+        Check whether a number is prime. Numbers up to max_direct_limit are looked up in the sieve (extending it if needed),
+        larger numbers are trial divided by small primes and then tested with Miller-Rabin.
+
+        Arguments:
+            number (int): The number to check.
+
+        Returns:
+            bool
+        """
+        if number < 3: return number == 2
+        if number % 2 == 0: return False
+        if number < self.limit or number <= self.max_direct_limit:
+            self.extend(number + 1)
+            index = number >> 1
+            return bool(self._bits[index >> 3] >> (index & 7) & 1)
+        for p in self.primes_up_to(min(math.isqrt(number), 1000)):
+            if number % p == 0: return False
+        return miller_rabin(number)
+
+    def primes_up_to(self, limit: int) -> typing.Iterator[int]:
+        """
+        Iterate over the primes up to and including limit, in increasing order, extending the sieve if needed. Primes from
+        small_limit on are unpacked from the bits one segment at a time as they are iterated over.
+
+        Arguments:
+            limit (int): The largest number to include.
+
+        Returns:
+            Iterator[int]
+        """
+        if limit < self.small_limit:
+            if not self._small_primes:
+                self.extend(self.small_limit)
+                self._small_primes = [2] + list(self._iterate_bits(1, self.small_limit // 2))
+            return itertools.takewhile(lambda p: p <= limit, self._small_primes)
+        self.extend(limit + 1)
+        return itertools.chain([2], self._iterate_bits(1, (limit + 1) // 2))
+
+def miller_rabin(number: int) -> bool:
+    """
+    Miller-Rabin primality test for an odd number greater than 41. Deterministic below 3.3 * 10^24 (including every
+    64-bit number), and probabilistic with a false positive chance below 4^-20 beyond that.
+
+    Arguments:
+        number (int): The number to test.
+
+    Returns:
+        bool
+    """
+    d, s = number - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    bases = _MILLER_RABIN_BASES
+    if number >= _MILLER_RABIN_LIMIT:
+        bases += tuple(random.randrange(2, number - 1) for _ in range(_MILLER_RABIN_ROUNDS))
+    for base in bases:
+        x = pow(base, d, number)
+        if x == 1 or x == number - 1: continue
+        for _ in range(s - 1):
+            x = x * x % number
+            if x == number - 1: break
+        else:
+            return False
+    return True
+
+def _integer_root(number: int, power: int) -> int:
+    """Internal helper, returning the largest integer whose power-th power is at most number, using Newton's method in integers."""
+    if number < 2: return number
+    root = 1 << -(-number.bit_length() // power)  # A power of two at least as large as the root
+    while True:
+        # From above, each step decreases until it reaches the root, as floor division never overshoots below it.
+        next_root = ((power - 1) * root + number // root ** (power - 1)) // power
+        if next_root >= root: return root
+        root = next_root
+
+def perfect_power(number: int) -> tuple[int, int] | None:
+    """
+    Check whether a number is a perfect power, which Pollard's rho is very slow to factorise when the root is prime.
+
+    Arguments:
+        number (int): The number to check.
+
+    Returns:
+        tuple[int, int] | None: (root, power) with the largest such power, or None if number is not a perfect power.
+    """
+    for power in range(number.bit_length(), 1, -1):
+        root = _integer_root(number, power)
+        if root > 1 and root ** power == number: return root, power
+    return None
+
+def pollard_brent(number: int) -> int:
+    """
+    Find a non-trivial factor of an odd composite number using Pollard's rho algorithm with Brent's cycle detection.
+    The greatest common divisor is taken over batches of steps to avoid a gcd at every step.
+
+    Arguments:
+        number (int): The composite number.
+
+    Returns:
+        int: A factor of number, greater than 1 and less than number.
+    """
+    batch = 128
+    while True:
+        y, c = random.randrange(1, number), random.randrange(1, number)
+        g, r, q = 1, 1, 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % number
+            k = 0
+            while k < r and g == 1:
+                saved = y
+                for _ in range(min(batch, r - k)):
+                    y = (y * y + c) % number
+                    q = q * abs(x - y) % number
+                g = math.gcd(q, number)
+                k += batch
+            r *= 2
+        if g == number:
+            # The batch overshot, so step through it one at a time.
+            g = 1
+            while g == 1:
+                saved = (saved * saved + c) % number
+                g = math.gcd(abs(x - saved), number)
+        if g != number: return g
+
+SIEVE = PrimeSieve(CACHE_FILEPATH)
+
+def _sieve_size() -> int:
+    """Internal helper, getting the number of bytes in the shared sieve, as the snapshot sent to worker processes."""
+    SIEVE._load()
+    return len(SIEVE._bits)
+
+def _sieve_growth(size: int) -> tuple[int, bytes] | None:
+    """Internal helper run in worker processes, getting what their shared sieve has beyond size bytes, if anything."""
+    if len(SIEVE._bits) <= size: return None
+    return size, bytes(SIEVE._bits[size:])
+
+_workers.share_state(_sieve_size, _sieve_growth, lambda growth: SIEVE.merge(*growth))
+
+def is_prime(number: int) -> bool:
+    """
+    Check whether a number is prime, using the shared sieve.
+
+    Arguments:
+        number (int): The number to check.
+
+    Returns:
+        bool
+    """
+    return SIEVE.is_prime(number)
+
+@functools.lru_cache(maxsize=4096)
+def factorise(number: int) -> dict[int, int]:
+    """
+    Get the prime factorisation of a number. Small factors are found by trial division with the shared sieve's primes,
+    and what remains is split with Pollard's rho algorithm. Results are cached.
+
+    Arguments:
+        number (int): The number to factorise. Must be at least 1.
+
+    Returns:
+        dict[int, int]: The prime factors and their exponents, in increasing order, e.g. {2: 3, 5: 1} for 40.
+    """
+    factors = dict()
+    limit = math.isqrt(number)
+    for p in SIEVE.primes_up_to(min(limit, _TRIAL_DIVISION_LIMIT)):
+        if p > limit: break
+        if number % p == 0:
+            count = 0
+            while number % p == 0:
+                number //= p
+                count += 1
+            factors[p] = count
+            limit = math.isqrt(number)
+    # Any remaining factors are larger than the trial division limit.
+    remaining = [number] if number > 1 else []
+    while remaining:
+        number = remaining.pop()
+        if number < _TRIAL_DIVISION_LIMIT ** 2 or is_prime(number):
+            factors[number] = factors.get(number, 0) + 1
+        elif power := perfect_power(number):
+            remaining += [power[0]] * power[1]
+        else:
+            factor = pollard_brent(number)
+            remaining += [factor, number // factor]
+    return dict(sorted(factors.items()))
+
+def format_factorisation(factors: dict[int, int]) -> str:
+    """
+    Format a prime factorisation, e.g. "2^3 x 5" for {2: 3, 5: 1}.
+
+    Arguments:
+        factors (dict[int, int]): The prime factors and their exponents, as returned by factorise().
+
+    Returns:
+        str
+    """
+    return " x ".join(f"{prime}^{count}" if count > 1 else str(prime) for prime, count in factors.items())
+
+def _base_primes(limit: int) -> typing.Iterator[list[int]]:
+    """
+    Internal generator, yielding the primes up to and including limit in increasing batches, so that the base primes of a
+    window far from zero are never all in memory at once. Those up to the shared sieve's direct limit are read from it,
+    and larger ones are sieved one segment at a time.
+    """
+    primes = SIEVE.primes_up_to(min(limit, SIEVE.max_direct_limit))
+    while batch := list(itertools.islice(primes, _BASE_SEGMENT_SIZE // 16)):
+        yield batch
+    for low in range(SIEVE.max_direct_limit + 1, limit + 1, _BASE_SEGMENT_SIZE):
+        yield primes_in_window(low, min(low + _BASE_SEGMENT_SIZE, limit + 1))
+
+def primes_in_window(start: int, stop: int, cancelled: threading.Event | None = None) -> list[int]:
+    """
+    Get the primes in [start, stop) with a sieve over just that window, using the primes up to sqrt(stop) as base primes.
+    Windows are independent, so large ranges can be split between worker processes.
+
+    Arguments:
+        start (int): The first number to check.
+        stop (int): The number to stop before.
+        cancelled (threading.Event | None): Checked between batches of base primes, returning no primes once it is set,
+            as windows far from zero take long to sieve.
+
+    Returns:
+        list[int]
+    """
+    result = [2] if start <= 2 < stop else []
+    first = max(start, 3) | 1  # The first odd number in the window
+    if first >= stop: return result
+    size = (stop - first + 1) // 2  # flags[i] is first + 2i
+    flags = bytearray([1]) * size
+    for base in _base_primes(math.isqrt(stop - 1)):
+        if cancelled is not None and cancelled.is_set(): return []
+        for p in base:
+            if p == 2: continue
+            multiple = max(p * p, -(-first // p) * p)
+            if multiple % 2 == 0: multiple += p
+            index = (multiple - first) // 2
+            if index < size: flags[index::p] = bytes(len(range(index, size, p)))
+    result += [first + 2 * i for i in itertools.compress(range(size), flags)]
+    return result
+
+def factorise_window(start: int, stop: int, cancelled: threading.Event | None = None) -> list[tuple[int, dict[int, int]]]:
+    """
+    Factorise every number in [start, stop) by walking the multiples of each base prime through the window, rather than
+    trial dividing each number separately. Windows are independent, so large ranges can be split between worker processes.
+
+    Arguments:
+        start (int): The first number to factorise. Must be at least 1.
+        stop (int): The number to stop before.
+        cancelled (threading.Event | None): Checked between batches of base primes, returning nothing once it is set.
+
+    Returns:
+        list[tuple[int, dict[int, int]]]: Each number and its factorisation (empty for 1).
+    """
+    remaining = list(range(start, stop))
+    factors: list[dict[int, int]] = [dict() for _ in remaining]
+    for base in _base_primes(math.isqrt(stop - 1)):
+        if cancelled is not None and cancelled.is_set(): return []
+        for p in base:
+            for index in range(-start % p, len(remaining), p):
+                count = 0
+                while remaining[index] % p == 0:
+                    remaining[index] //= p
+                    count += 1
+                factors[index][p] = count
+    # Whatever is left after dividing by every prime up to sqrt(stop) is itself prime.
+    for index, left in enumerate(remaining):
+        if left > 1: factors[index][left] = 1
+    return list(zip(range(start, stop), factors))
+
+def _map_windows(function: typing.Callable[[int, int], list], start: int, stop: int) -> typing.Iterator[list | None]:
+    """
+    Internal helper, lazily applying a window function over [start, stop) one window at a time, yielding None while the
+    next window is still being calculated. Large ranges are split between the shared worker processes, and smaller ones
+    are calculated on a worker thread, which stops sieving its window when the generator is closed.
+    """
+    parallel = stop - start >= _PARALLEL_THRESHOLD
+    size = _PARALLEL_WINDOW_SIZE if parallel else _WINDOW_SIZE
+    windows = ((low, min(low + size, stop)) for low in range(start, stop, size))
+    if parallel: return _workers.imap_ordered(function, windows)
+    return _map_windows_in_thread(function, windows)
+
+def _map_windows_in_thread(function: typing.Callable[..., list], windows: typing.Iterator[tuple[int, int]]) -> typing.Iterator[list | None]:
+    """Internal generator for _map_windows(), calculating the windows on a worker thread."""
+    cancelled = threading.Event()
+    batches = _workers.iterate_in_thread((function(*window, cancelled=cancelled) for window in windows), batch_size=1, stop=cancelled)
+    try:
+        for batch in batches:
+            if batch is None: yield None
+            else: yield from batch
+    finally:
+        batches.close()
+
+def primes_between(start: int, stop: int) -> typing.Iterator[list[int] | None]:
+    """
+    Lazily generate the primes in [start, stop), in batches (one per window). See _map_windows() for when None is yielded.
+
+    Arguments:
+        start (int): The first number to check.
+        stop (int): The number to stop before.
+
+    Returns:
+        Iterator[list[int] | None]
+    """
+    return _map_windows(primes_in_window, max(start, 0), stop)
+
+def twin_primes_between(start: int, stop: int) -> typing.Iterator[list[tuple[int, int]] | None]:
+    """
+    Lazily generate the twin primes (p, p + 2) with both primes in [start, stop), in batches. See _map_windows() for when None is yielded.
+
+    Arguments:
+        start (int): The first number to check.
+        stop (int): The number to stop before.
+
+    Returns:
+        Iterator[list[tuple[int, int]] | None]
+    """
+    last = None  # The last prime of the previous batch, as twins can span two windows
+    for batch in primes_between(start, stop):
+        if batch is None:
+            yield None
+            continue
+        pairs = [(p, q) for p, q in zip([last] + batch, batch) if p is not None and q - p == 2]
+        if batch: last = batch[-1]
+        yield pairs
+
+def factorisations_between(start: int, stop: int) -> typing.Iterator[list[tuple[int, dict[int, int]]] | None]:
+    """
+    Lazily factorise every number in [start, stop), in batches. See _map_windows() for when None is yielded.
+
+    Arguments:
+        start (int): The first number to factorise.
+        stop (int): The number to stop before.
+
+    Returns:
+        Iterator[list[tuple[int, dict[int, int]]] | None]
+    """
+    return _map_windows(factorise_window, max(start, 1), stop)
+
+def divisors(number: int) -> typing.Iterator[int]:
+    """
+    Lazily generate every divisor of a number in increasing order from its prime factorisation, by merging the products of
+    the prime powers with a heap. Each divisor is generated exactly once, by raising its primes in order.
+
+    Arguments:
+        number (int): The number. Must be at least 1.
+
+    Returns:
+        Iterator[int]
+    """
+    factors = list(factorise(number).items())
+    heap = [(1, 0, 0)]  # (divisor, index of the largest prime it may still be multiplied by, that prime's exponent)
+    while heap:
+        divisor, index, exponent = heapq.heappop(heap)
+        yield divisor
+        if index < len(factors) and exponent < factors[index][1]:
+            heapq.heappush(heap, (divisor * factors[index][0], index, exponent + 1))
+        for later in range(index + 1, len(factors)):
+            heapq.heappush(heap, (divisor * factors[later][0], later, 1))
+
+def divisor_count(number: int) -> int:
+    """
+    Get the number of divisors of a number, tau(n), from its prime factorisation.
+
+    Arguments:
+        number (int): The number. Must be at least 1.
+
+    Returns:
+        int
+    """
+    return math.prod(exponent + 1 for exponent in factorise(number).values())
+
+def divisor_sum(number: int) -> int:
+    """
+    Get the sum of the divisors of a number, sigma(n), from its prime factorisation.
+
+    Arguments:
+        number (int): The number. Must be at least 1.
+
+    Returns:
+        int
+    """
+    return math.prod((p ** (exponent + 1) - 1) // (p - 1) for p, exponent in factorise(number).items())
+
+def totient(number: int) -> int:
+    """
+    Get Euler's totient of a number, phi(n), the count of numbers up to n coprime to it, from its prime factorisation.
+
+    Arguments:
+        number (int): The number. Must be at least 1.
+
+    Returns:
+        int
+    """
+    return math.prod(p ** (exponent - 1) * (p - 1) for p, exponent in factorise(number).items())
@@ -0,0 +1,141 @@
+"""
+PUtilities Equation Solver
+Numeric root finding for equations of one variable, used by the Command Line's 'solve' command. The interval is sampled
+in batches to bracket every sign change, and each bracket is refined with Brent's method. Roots where the function only
+touches zero (such as x^2 = 0) are found by refining local minima of |f(x)| instead.
+Do not import Utilities into this module, so that it can be used without tkinter.
+"""
+
+import math, typing
+import classes._expressions as expressions
+
+SAMPLES: int = 4000
+BATCH_SIZE: int = 500
+
+def brent(function: typing.Callable[[float], float], a: float, b: float, fa: float, fb: float, tolerance: float = 1e-12, max_iterations: int = 200) -> float:
+    """
+    Find a root of a function within a bracket [a, b] using Brent's method.
+
+    Arguments:
+        function (Callable[[float], float]): The function.
+        a, b (float): The ends of the bracket. function(a) and function(b) must have opposite signs.
+        fa, fb (float): function(a) and function(b), already calculated while bracketing.
+        tolerance (float): The absolute tolerance of the root.
+        max_iterations (int): The maximum number of iterations.
+
+    Returns:
+        float: The root.
+    """
+    if abs(fa) < abs(fb): a, b, fa, fb = b, a, fb, fa
+    c, fc, d, bisected = a, fa, a, True
+    for _ in range(max_iterations):
+        if fb == 0 or abs(b - a) < tolerance: return b
+        if fa != fc and fb != fc:
+            # Inverse quadratic interpolation
+            s = a * fb * fc / ((fa - fb) * (fa - fc)) + b * fa * fc / ((fb - fa) * (fb - fc)) + c * fa * fb / ((fc - fa) * (fc - fb))
+        else:
+            # Secant method
+            s = b - fb * (b - a) / (fb - fa)
+        # Fall back to bisection whenever interpolation is not making good progress.
+        if (not (min((3 * a + b) / 4, b) < s < max((3 * a + b) / 4, b))
+                or (bisected and abs(s - b) >= abs(b - c) / 2) or (not bisected and abs(s - b) >= abs(c - d) / 2)
+                or (bisected and abs(b - c) < tolerance) or (not bisected and abs(c - d) < tolerance)):
+            s, bisected = (a + b) / 2, True
+        else:
+            bisected = False
+        fs = function(s)
+        d, c, fc = c, b, fb
+        if (fa < 0) != (fs < 0): b, fb = s, fs
+        else: a, fa = s, fs
+        if abs(fa) < abs(fb): a, b, fa, fb = b, a, fb, fa
+    return b
+
+def _minimise(function: typing.Callable[[float], float], a: float, b: float, iterations: int = 100) -> float:
+    """Internal helper, finding the minimum of |function| in [a, b] by golden-section search."""
+    ratio = (math.sqrt(5) - 1) / 2
+    function = lambda x, f=function: math.inf if (y := f(x)) is None else y
+    c, d = b - ratio * (b - a), a + ratio * (b - a)
+    fc, fd = abs(function(c)), abs(function(d))
+    for _ in range(iterations):
+        if fc < fd: b, d, fd = d, c, fc; c = b - ratio * (b - a); fc = abs(function(c))
+        else: a, c, fc = c, d, fd; d = a + ratio * (b - a); fd = abs(function(d))
+    return (a + b) / 2
+
+def _safe(function: typing.Callable[[float], float]) -> typing.Callable[[float], float | None]:
+    """Internal helper, wrapping a function to return None where it is undefined or not real."""
+    def wrapped(x: float) -> float | None:
+        try:
+            y = function(x)
+        except expressions.ExpressionError:
+            return None
+        return float(y) if isinstance(y, (int, float)) and math.isfinite(y) else None
+    return wrapped
+
+def find_roots(function: typing.Callable[[float], float], start: float, stop: float, samples: int = SAMPLES) -> list[float] | None:
+    """
+    Find all real roots of a function in an interval. Roots closer together than the sampling interval may be missed.
+    A function that is zero at every sample where it is defined (such as x - x) is taken to be identically zero.
+
+    Arguments:
+        function (Callable[[float], float]): The function.
+        start, stop (float): The interval to search.
+        samples (int): The number of points to sample the interval at.
+
+    Returns:
+        list[float] | None: The roots, in increasing order, or None if every x in the interval is a root.
+    """
+    f = _safe(function)
+    step = (stop - start) / samples
+    roots, defined, zeros = [], 0, 0
+    previous = [None, None]  # The last two samples, as (x, y) pairs
+    for batch in range(0, samples + 1, BATCH_SIZE):
+        xs = [start + i * step for i in range(batch, min(batch + BATCH_SIZE, samples + 1))]
+        for x, y in zip(xs, map(f, xs)):
+            last, before = previous[1], previous[0]
+            if y is not None:
+                defined += 1
+                zeros += y == 0
+            if y is not None and last is not None and last[1] is not None:
+                if y == 0:
+                    roots.append(x)
+                elif last[1] != 0 and (y < 0) != (last[1] < 0):
+                    root = brent(f, last[0], x, last[1], y)
+                    # A sign change across a discontinuity (such as 1/x at 0) is not a root.
+                    value = f(root)
+                    if value is not None and abs(value) <= min(abs(last[1]), abs(y)):
+                        roots.append(root)
+                elif before is not None and before[1] is not None and last[1] != 0 and abs(last[1]) < abs(before[1]) and abs(last[1]) < abs(y) and (before[1] < 0) == (last[1] < 0) == (y < 0):
+                    # A local minimum of |f| without a sign change may be a root that only touches zero.
+                    root = _minimise(f, before[0], x)
+                    value = f(root)
+                    if value is not None and abs(value) < 1e-10: roots.append(root)
+            previous = [last, (x, y)]
+    if defined and zeros == defined: return None
+    # Remove duplicates found from neighbouring brackets.
+    unique = []
+    for root in roots:
+        if not unique or abs(root - unique[-1]) > max(abs(step) * 1e-3, 1e-12): unique.append(root)
+    return unique
+
+def solve(equation: str, start: float = -100, stop: float = 100, variable: str = "x", degrees: bool = False) -> list[float] | None:
+    """
+    Solve an equation of one variable, such as "x^2 + 1 = 3x", for all real solutions in an interval.
+
+    Arguments:
+        equation (str): The equation. If there is no '=', the expression is solved for zero.
+        start, stop (float): The interval to search.
+        variable (str): The name of the variable.
+        degrees (bool): Whether trigonometric functions work in degrees.
+
+    Returns:
+        list[float] | None: The solutions, in increasing order, or None if every x in the interval is a solution.
+
+    Raises:
+        ExpressionError: If the equation is invalid.
+    """
+    if equation.count("=") > 1: raise expressions.ExpressionError("An equation can only have one '='.")
+    left, _, right = equation.partition("=")
+    # Both sides are compiled once, as a single expression.
+    function = expressions.compile_expression(f"({left})-({right or 0})", (variable,), degrees)
+    if start > stop: start, stop = stop, start
+    return find_roots(function, start, stop)
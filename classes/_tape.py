@@ -0,0 +1,116 @@
+"""
+PUtilities Calculator History Tape
+A persistent history of calculations for the Calculator. Each calculation is appended to the tape file as a single
+"expression<TAB>result" line, and the file is only read the first time the history is needed, starting from its end so
+that only the most recent entries are loaded however long the tape grows.
+"""
+
+from classes.Utilities import *
+
+TAPE_FILEPATH = PFileHandler.CONFIG_FILEPATH + "/calculator.tape"
+
+class TapeEntry(typing.NamedTuple):
+    expression: str
+    result: str
+
+class HistoryTape:
+    """
+    Append-only calculator history.
+
+    Attributes:
+        max_entries (int): The number of most recent entries kept in memory (and when the tape file is compacted).
+        block_size (int): The number of bytes read at a time when loading the tape file backwards from its end.
+    """
+    max_entries: int = 500
+    block_size: int = 16384
+
+    def __init__(self, filepath: str = TAPE_FILEPATH) -> None:
+        self.filepath = filepath
+        self._entries: list[TapeEntry] | None = None
+        self._lines_on_disk = 0
+
+    @property
+    def entries(self) -> list[TapeEntry]:
+        """The most recent entries on the tape, oldest first. The tape file is read the first time this is accessed."""
+        if self._entries is None: self._load()
+        return self._entries
+
+    def _load(self) -> None:
+        """Internal method reading the last max_entries lines of the tape file, reading backwards in blocks from the end."""
+        self._entries = []
+        try:
+            with open(self.filepath, "rb") as file:
+                position = file.seek(0, os.SEEK_END)
+                data = b""
+                while position > 0 and data.count(b"\n") <= self.max_entries:
+                    size = min(self.block_size, position)
+                    position -= size
+                    file.seek(position)
+                    data = file.read(size) + data
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            ERROR_LOG.log_tab_error("calculator", f"Could not read the history tape '{self.filepath}'. Error type: {str(e)}")
+            return
+        lines = data.decode("utf-8", errors="replace").splitlines()
+        # The first line is only complete if the start of the file was reached.
+        if position > 0: lines.pop(0)
+        self._lines_on_disk = len(lines) if position == 0 else self.max_entries * 2
+        for line in lines[-self.max_entries:]:
+            expression, separator, result = line.partition("\t")
+            if separator: self._entries.append(TapeEntry(expression, result))
+
+    def append(self, expression: str, result: str) -> TapeEntry:
+        """
+        Add a calculation to the end of the tape.
+
+        Arguments:
+            expression (str): The expression that was calculated.
+            result (str): The result, formatted as shown in the Calculator.
+
+        Returns:
+            TapeEntry: The new entry.
+        """
+        entry = TapeEntry(" ".join(expression.split()), " ".join(result.split()))
+        self.entries.append(entry)
+        if len(self._entries) > self.max_entries: del self._entries[0]
+        try:
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+            # Once the file holds far more than is ever loaded, rewrite it with only the entries in memory.
+            if self._lines_on_disk >= self.max_entries * 2:
+                with open(self.filepath, "w", encoding="utf-8") as file:
+                    file.writelines(f"{item.expression}\t{item.result}\n" for item in self._entries)
+                self._lines_on_disk = len(self._entries)
+            else:
+                with open(self.filepath, "a", encoding="utf-8") as file:
+                    file.write(f"{entry.expression}\t{entry.result}\n")
+                self._lines_on_disk += 1
+        except OSError as e:
+            ERROR_LOG.log_tab_error("calculator", f"Could not write to the history tape '{self.filepath}'. Error type: {str(e)}")
+        return entry
+
+    def answer(self, number: int = 1) -> str | None:
+        """
+        Get a previous result, for resolving the Ans (number = 1), Ans2 (number = 2), ... references of an expression.
+
+        Arguments:
+            number (int): How many results back to go. 1 is the most recent result.
+
+        Returns:
+            str | None: The result, or None if the tape is not that long.
+        """
+        entries = self.entries
+        return entries[-number].result if 0 < number <= len(entries) else None
+
+    def clear(self) -> None:
+        """
+        Clear the tape, deleting the tape file.
+
+        Returns: None
+        """
+        self._entries = []
+        self._lines_on_disk = 0
+        try:
+            os.remove(self.filepath)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,170 @@
+"""
+PUtilities Undo Manager
+Memory-compact undo/redo history for ScrollableTextBox widgets. Every edit is stored as a single
+(index, removed, inserted) record rather than a copy of the document, consecutive keystrokes are merged into one record,
+and once the history grows past a byte limit the oldest records are spilled to a temporary file on disk.
+"""
+
+from classes.Utilities import *
+import collections, contextlib, tempfile
+
+class UndoRecord(typing.NamedTuple):
+    index: str
+    removed: str
+    inserted: str
+    time: float
+
+class UndoManager:
+    """
+    Undo/redo history for a ScrollableTextBox, bound to Control+z, Control+y and Control+Shift+z.
+
+    Attributes:
+        max_bytes (int): The maximum size of the history held in memory before older records are spilled to disk.
+        max_disk_bytes (int): The maximum size of the spilled history. Past this, the oldest half of the spilled history is dropped.
+        merge_seconds (float): Keystrokes further apart than this are recorded as separate undo steps.
+    """
+    max_bytes: int = 1024 * 1024
+    max_disk_bytes: int = 64 * 1024 * 1024
+    merge_seconds: float = 1.5
+
+    def __init__(self, textbox: ScrollableTextBox) -> None:
+        self.textbox = textbox
+        self.text_widget = textbox.text_widget
+        self._undo: collections.deque[UndoRecord] = collections.deque()
+        self._redo: list[UndoRecord] = []
+        self._bytes = 0
+        self._spill = None
+        self._spill_offsets: list[int] = []
+        self._paused = False
+        textbox.add_edit_listener(self._on_edit)
+        self.text_widget.bind("<Control-z>", self.undo)
+        self.text_widget.bind("<Control-y>", self.redo)
+        self.text_widget.bind("<Control-Z>", self.redo)
+
+    @staticmethod
+    def _size(record: UndoRecord) -> int:
+        """Internal helper, getting the size of a record's text in bytes, encoded as UTF-8."""
+        return len(record.removed.encode()) + len(record.inserted.encode())
+
+    def _on_edit(self, action: str, index: str, text: str) -> None:
+        """Internal edit listener, recording an edit and merging it with the previous record where it continues it."""
+        if self._paused: return
+        now = time.monotonic()
+        self._redo.clear()
+        last = self._undo[-1] if self._undo else None
+        if last and now - last.time < self.merge_seconds and "\n" not in text:
+            merged = None
+            if action == "insert" and len(text) == 1 and get_index_after(last.index, last.inserted) == index and (not last.inserted or "\n" not in last.inserted):
+                # Typing (including typing over a selection, recorded as a delete then an insert at the same index).
+                if not (text.isspace() and last.inserted and not last.inserted[-1].isspace()):
+                    merged = UndoRecord(last.index, last.removed, last.inserted + text, now)
+            elif action == "delete" and len(text) == 1 and not last.inserted:
+                if get_index_after(index, text) == last.index: merged = UndoRecord(index, text + last.removed, "", now)
+                elif index == last.index: merged = UndoRecord(index, last.removed + text, "", now)
+            if merged:
+                self._undo[-1] = merged
+                self._bytes += len(text.encode())
+                return
+        record = UndoRecord(index, text if action == "delete" else "", text if action == "insert" else "", now)
+        self._undo.append(record)
+        self._bytes += self._size(record)
+        while self._bytes > self.max_bytes and len(self._undo) > 1:
+            self._spill_oldest()
+
+    def _spill_oldest(self) -> None:
+        """Internal method, moving the oldest in-memory record to the end of the spill file."""
+        record = self._undo.popleft()
+        self._bytes -= self._size(record)
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(prefix="putilities-undo-")
+        self._spill.seek(0, os.SEEK_END)
+        self._spill_offsets.append(self._spill.tell())
+        pickle.dump(tuple(record), self._spill)
+        if self._spill.tell() > self.max_disk_bytes:
+            self._drop_oldest_spilled()
+
+    def _drop_oldest_spilled(self) -> None:
+        """Internal method, dropping the oldest half of the spilled history by rewriting the spill file."""
+        keep_from = self._spill_offsets[len(self._spill_offsets) // 2]
+        self._spill.seek(keep_from)
+        remaining = self._spill.read()
+        self._spill.seek(0)
+        self._spill.write(remaining)
+        self._spill.truncate()
+        self._spill_offsets = [offset - keep_from for offset in self._spill_offsets[len(self._spill_offsets) // 2:]]
+
+    def _unspill_newest(self) -> UndoRecord | None:
+        """Internal method, taking the newest record back out of the spill file."""
+        if not self._spill_offsets: return None
+        offset = self._spill_offsets.pop()
+        self._spill.seek(offset)
+        record = UndoRecord(*pickle.load(self._spill))
+        self._spill.truncate(offset)
+        return record
+
+    def _apply(self, index: str, remove: str, insert: str) -> None:
+        """Internal method, replacing the text remove at index with insert, without recording it."""
+        with self.paused():
+            if remove:
+                self.text_widget.delete(index, f"{index} + {len(remove)} chars")
+            if insert:
+                self.text_widget.insert(index, insert)
+        self.text_widget.mark_set(tk.INSERT, f"{index} + {len(insert)} chars")
+        self.text_widget.see(tk.INSERT)
+
+    def undo(self, event=None) -> str:
+        """
+        Undo the most recent edit. Also called using the keyboard shortcut Control+z.
+
+        Returns: str -> "break", so that tkinter does not run its own bindings.
+        """
+        if self._undo:
+            record = self._undo.pop()
+            self._bytes -= self._size(record)
+        else:
+            record = self._unspill_newest()
+        if record:
+            self._apply(record.index, record.inserted, record.removed)
+            self._redo.append(record)
+            # The next keystroke starts a new record rather than merging with the one now at the top of the history.
+            if self._undo: self._undo[-1] = self._undo[-1]._replace(time=0)
+        return "break"
+
+    def redo(self, event=None) -> str:
+        """
+        Redo the most recently undone edit. Also called using the keyboard shortcuts Control+y and Control+Shift+z.
+
+        Returns: str -> "break", so that tkinter does not run its own bindings.
+        """
+        if self._redo:
+            record = self._redo.pop()
+            self._apply(record.index, record.removed, record.inserted)
+            # Redone records are never merged with the next keystroke.
+            self._undo.append(record._replace(time=0))
+            self._bytes += self._size(record)
+            while self._bytes > self.max_bytes and len(self._undo) > 1:
+                self._spill_oldest()
+        return "break"
+
+    def reset(self) -> None:
+        """
+        Clear the undo and redo history, for example after a new file is loaded.
+
+        Returns: None
+        """
+        self._undo.clear()
+        self._redo.clear()
+        self._bytes = 0
+        self._spill_offsets.clear()
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    @contextlib.contextmanager
+    def paused(self) -> typing.Iterator[None]:
+        """Context manager pausing the history, used while loading a file so that the load itself cannot be undone."""
+        self._paused = True
+        try:
+            yield
+        finally:
+            self._paused = False
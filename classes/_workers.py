@@ -0,0 +1,232 @@
+"""
+PUtilities Worker Processes
+A shared process pool for CPU-bound work started from the terminals, so that long calculations use every core, and
+worker threads for work that waits on files or the network. Results are consumed with generators that never block:
+they yield None while the next result is still being calculated, so that callers running on the tkinter main loop can
+hand control back and try again later.
+Worker processes only import the modules of the functions they run, so those modules should not import tkinter.
+"""
+
+import os, atexit, collections, concurrent.futures, threading, queue, time, typing
+
+_POOL: concurrent.futures.ProcessPoolExecutor | None = None
+_POOL_BROKEN = False
+# Single-worker executors for call(), kept between calls so that their processes (and caches) stay warm.
+_IDLE_EXECUTORS: list[concurrent.futures.ProcessPoolExecutor] = []
+_MAX_IDLE_EXECUTORS = os.cpu_count() or 1
+# (snapshot, collect, merge) functions of the state shared back from worker processes, see share_state().
+_SHARED_STATE: list[tuple[typing.Callable[[], typing.Any], typing.Callable[[typing.Any], typing.Any], typing.Callable[[typing.Any], None]]] = []
+
+def get_process_pool() -> concurrent.futures.ProcessPoolExecutor | None:
+    """
+    Get the shared process pool, creating it the first time it is needed.
+
+    Returns:
+        ProcessPoolExecutor | None: The pool, or None if processes cannot be started on this system.
+    """
+    global _POOL, _POOL_BROKEN
+    if _POOL is None and not _POOL_BROKEN:
+        try:
+            _POOL = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        except (OSError, NotImplementedError, ImportError):
+            _POOL_BROKEN = True
+    return _POOL
+
+def imap_ordered(function: typing.Callable, arguments: typing.Iterable[tuple], in_flight: int | None = None) -> typing.Iterator[typing.Any]:
+    """
+    Lazily run function(*args) for each args in arguments on the shared process pool, yielding the results in order. At most
+    in_flight calls are queued at once, so huge ranges are never submitted all at once. While the next result is not ready
+    yet, None is yielded instead. Closing the generator cancels the calls that have not started.
+    If there is no process pool, the calls are made in this process instead.
+
+    Arguments:
+        function (Callable): A module-level (picklable) function.
+        arguments (Iterable[tuple]): The positional arguments of each call.
+        in_flight (int | None): The maximum number of queued calls. Defaults to twice the number of workers.
+
+    Returns:
+        Iterator[Any]
+    """
+    pool = get_process_pool()
+    if pool is None:
+        for args in arguments:
+            yield function(*args)
+        return
+    in_flight = in_flight or 2 * (os.cpu_count() or 1)
+    arguments = iter(arguments)
+    pending: collections.deque[concurrent.futures.Future] = collections.deque()
+    try:
+        while True:
+            while len(pending) < in_flight:
+                args = next(arguments, None)
+                if args is None: break
+                pending.append(pool.submit(function, *args))
+            if not pending: return
+            if not pending[0].done():
+                yield None
+                continue
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+def share_state(snapshot: typing.Callable[[], typing.Any], collect: typing.Callable[[typing.Any], typing.Any], merge: typing.Callable[[typing.Any], None]) -> None:
+    """
+    Share state that worker processes build up (such as a cache) with the calling process. Before each process call,
+    snapshot() is taken in the calling process; when the call has finished, collect(snapshot) runs in the worker, and what
+    it returns (unless None) is passed to merge() in the calling process.
+
+    Arguments:
+        snapshot (Callable): Describes the calling process's state, e.g. its size.
+        collect (Callable): A module-level (picklable) function returning the worker's state missing from the snapshot.
+        merge (Callable): Adds the collected state to the calling process's state.
+
+    Returns: None
+    """
+    _SHARED_STATE.append((snapshot, collect, merge))
+
+def _call_and_collect(function: typing.Callable, args: tuple, kwargs: dict, snapshots: list[tuple[typing.Callable, typing.Any]]) -> tuple[typing.Any, list]:
+    """Internal helper run in a worker process, returning the result of a call and the shared state collected after it."""
+    return function(*args, **kwargs), [collect(snapshot) for collect, snapshot in snapshots]
+
+def _take_executor() -> concurrent.futures.ProcessPoolExecutor | None:
+    """Internal helper, getting an idle single-worker executor for call(), or None if processes cannot be started."""
+    if get_process_pool() is None: return None
+    if _IDLE_EXECUTORS: return _IDLE_EXECUTORS.pop()
+    try:
+        return concurrent.futures.ProcessPoolExecutor(max_workers=1)
+    except (OSError, NotImplementedError, ImportError):
+        return None
+
+def call(function: typing.Callable, args: tuple = (), kwargs: dict | None = None, where: typing.Literal["thread", "process"] = "thread") -> typing.Generator[None, None, typing.Any]:
+    """
+    Run function(*args, **kwargs) in a worker thread or process, yielding None until it has finished and then returning
+    its result (use 'result = yield from call(...)'). Exceptions are raised from the generator.
+    Process calls run in their own single-worker executor rather than the shared pool, so that closing the generator before
+    the call has finished can stop it by terminating that worker alone, without breaking anything else running in the
+    shared pool. Executors whose calls finish are kept for later calls, so their caches stay warm and the state registered
+    with share_state() is merged back. A thread cannot be stopped and is left to finish on its own.
+
+    Arguments:
+        function (Callable): The function. For processes, a module-level (picklable) function.
+        args (tuple): Its positional arguments.
+        kwargs (dict | None): Its keyword arguments.
+        where (str): 'thread' for work that waits on files or the network, 'process' for CPU-bound work. Falls back to a
+            thread if processes cannot be started.
+
+    Returns:
+        Generator[None, None, Any]
+    """
+    kwargs = kwargs or dict()
+    executor = _take_executor() if where == "process" else None
+    shared = list(_SHARED_STATE)
+    if executor is not None:
+        future = executor.submit(_call_and_collect, function, args, kwargs, [(collect, snapshot()) for snapshot, collect, merge in shared])
+    else:
+        future = concurrent.futures.Future()
+        def target() -> None:
+            if not future.set_running_or_notify_cancel(): return
+            try:
+                future.set_result(function(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+        threading.Thread(target=target, daemon=True).start()
+    try:
+        while not future.done():
+            yield None
+        if executor is None: return future.result()
+        result, collected = future.result()
+        for (snapshot, collect, merge), state in zip(shared, collected):
+            if state is not None: merge(state)
+        return result
+    finally:
+        if executor is not None:
+            if not future.done(): _terminate(executor)
+            elif isinstance(future.exception(), concurrent.futures.BrokenExecutor) or len(_IDLE_EXECUTORS) >= _MAX_IDLE_EXECUTORS: executor.shutdown(wait=False)
+            else: _IDLE_EXECUTORS.append(executor)
+
+def iterate_in_thread(iterator: typing.Iterator, batch_size: int = 256, batch_seconds: float = 0.02, in_flight: int = 8, stop: threading.Event | None = None) -> typing.Iterator[list | None]:
+    """
+    Consume an iterator on a worker thread, yielding its items in batches (lists) as they arrive, or None while the next
+    batch is not ready yet. At most in_flight batches are read ahead. Closing the generator stops the thread after its
+    current item, closing the iterator from that thread. Pass stop to also let the iterator check for that while it is
+    calculating an item that takes long.
+
+    Arguments:
+        iterator (Iterator): The iterator, which must not use tkinter.
+        batch_size (int): The most items in a batch.
+        batch_seconds (float): How long the thread collects items for before passing on a partial batch.
+        in_flight (int): The most batches read ahead of the consumer.
+        stop (threading.Event | None): Set when the generator is closed. A new event is used if not given.
+
+    Returns:
+        Iterator[list | None]
+    """
+    batches: queue.Queue = queue.Queue(maxsize=in_flight)
+    stop = stop or threading.Event()
+    finished = object()
+
+    def put(item: typing.Any) -> bool:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def target() -> None:
+        batch, started = [], time.perf_counter()
+        try:
+            for item in iterator:
+                batch.append(item)
+                if len(batch) >= batch_size or time.perf_counter() - started >= batch_seconds:
+                    if not put(batch): break
+                    batch, started = [], time.perf_counter()
+                if stop.is_set(): break
+            else:
+                if batch: put(batch)
+                put(finished)
+        except BaseException as e:
+            if batch: put(batch)
+            put(e)
+        finally:
+            if hasattr(iterator, "close"): iterator.close()
+
+    threading.Thread(target=target, daemon=True).start()
+    try:
+        while True:
+            try:
+                item = batches.get_nowait()
+            except queue.Empty:
+                yield None
+                continue
+            if item is finished: return
+            if isinstance(item, BaseException): raise item
+            yield item
+    finally:
+        stop.set()
+
+def _terminate(executor: concurrent.futures.ProcessPoolExecutor) -> None:
+    """Internal helper, stopping everything running in a process executor by terminating its worker processes."""
+    # ProcessPoolExecutor has no public way to stop running calls, so its worker processes are terminated directly.
+    processes = list((getattr(executor, "_processes", None) or dict()).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+def shutdown() -> None:
+    """
+    Shut down the shared process pool, cancelling queued calls, and the idle executors of call(). Called automatically when
+    the program exits.
+
+    Returns: None
+    """
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+    while _IDLE_EXECUTORS:
+        _IDLE_EXECUTORS.pop().shutdown(wait=False)
+
+atexit.register(shutdown)
@@ -0,0 +1,56 @@
+"""
+Benchmark for the Calculator. Compares the float fast path of the expression engine (classes/_expressions.py) with the
+eval() path the Calculator used previously, as well as the exact and high-precision modes. Every call gets a different
+expression (the same shape with other numbers) and the compiled expression cache is cleared before each run, so the
+times include tokenizing, parsing and compiling, as they do for a new calculation.
+Run from the root directory of PUtilities: python dev/benchmark_calculator.py
+"""
+
+import os, sys, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import classes._expressions as expressions
+
+# Templates filled in with a and b, which differ for every call.
+EXPRESSIONS = ["{a}+{b}", "3x{a}-{b}", "{a}^2/{b}", "({b}.5+2.25)x{a}", "2^10-{a}/{b}", "0.{a}+0.{b}", "(({a}+2)x(3+{b}))^2/(5-{b}{b})"]
+NUMBER = 20000
+
+def variants(template: str) -> list[str]:
+    """Fill a template in with NUMBER different pairs of numbers."""
+    return [template.format(a=i % 1000 + 1, b=i // 1000 + 1) for i in range(NUMBER)]
+
+def time_each(function, inputs: list[str], repeat: int = 5) -> float:
+    """Time calling function on each input, in microseconds per call, starting with an empty expression cache. The fastest of repeat runs is used, as slower runs were interrupted by other processes."""
+    best = float("inf")
+    for _ in range(repeat):
+        expressions._compile_normalized.cache_clear()
+        start = time.perf_counter()
+        for expression in inputs:
+            function(expression)
+        best = min(best, time.perf_counter() - start)
+    return best / len(inputs) * 1e6
+
+def old_path(expression: str):
+    """The Calculator's previous calculation, before the expression engine."""
+    return eval(expression.replace('x', '*').replace('^', '**'))
+
+def fast_path(expression: str):
+    """The Calculator's float fast path."""
+    return expressions.evaluate(expression)
+
+def main() -> None:
+    precise = expressions.DecimalNumberType(50)
+    print(f"{'Expression':<32} {'eval (us)':>10} {'fast (us)':>10} {'ratio':>6} {'exact (us)':>11} {'decimal (us)':>13}")
+    worst = 0
+    for template in EXPRESSIONS:
+        inputs = variants(template)
+        for expression in inputs[::997]:
+            assert abs(old_path(expression) - fast_path(expression)) < 1e-9, expression
+        times = [time_each(function, inputs) for function in (
+            old_path, fast_path,
+            lambda expression: expressions.evaluate(expression, numbers=expressions.EXACT), lambda expression: expressions.evaluate(expression, numbers=precise))]
+        worst = max(worst, times[1] / times[0])
+        print(f"{template:<32} {times[0]:>10.2f} {times[1]:>10.2f} {times[1] / times[0]:>6.2f} {times[2]:>11.2f} {times[3]:>13.2f}")
+    print(f"\nWorst fast path / eval ratio: {worst:.2f} ({'within' if worst <= 2 else 'NOT within'} 2x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Tests for the dictionary's online backend (classes/_dictionary.py HttpBackend), against a local stub HTTP server, and for
+how the Command Line's 'dictionary' command reports a backend that cannot be reached.
+Run from the root directory of PUtilities: python dev/test_dictionary.py
+"""
+
+import os, sys, json, socket, tempfile, threading, unittest, types
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from unittest import mock
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import classes._dictionary as _dictionary
+import classes.CommandLine as CommandLine
+
+RESPONSES = {
+    "/entries/hello": (200, [{"word": "hello", "meanings": [{"partOfSpeech": "exclamation", "definitions": [{"definition": "Used as a greeting.", "example": "hello there"}]}]}]),
+    "/entries/broken": (500, {"message": "Server error"}),
+}
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers with RESPONSES (404 for anything else), counting the requests, and never answers /entries/slow."""
+    requests: list[str] = []
+
+    def do_GET(self) -> None:
+        StubHandler.requests.append(self.path)
+        if self.path == "/entries/slow":
+            self.server.release.wait(5)
+            return
+        status, body = RESPONSES.get(self.path, (404, {"title": "No Definitions Found"}))
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args) -> None:
+        pass
+
+class HttpBackendTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = HTTPServer(("127.0.0.1", 0), StubHandler)
+        cls.server.daemon_threads = True
+        cls.server.release = threading.Event()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/entries/"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.release.set()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = _dictionary.DictionaryStore(os.path.join(self.directory.name, "dictionary.sqlite"))
+        self.backend = _dictionary.HttpBackend(self.url, self.store)
+        StubHandler.requests.clear()
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_hit_is_parsed_and_cached(self) -> None:
+        expected = [_dictionary.Definition("hello", "exclamation", "Used as a greeting.", "hello there")]
+        self.assertEqual(self.backend.lookup("Hello"), expected)
+        self.assertEqual(self.backend.lookup("hello"), expected)
+        self.assertEqual(StubHandler.requests, ["/entries/hello"])
+
+    def test_miss_is_empty_and_cached(self) -> None:
+        self.assertEqual(self.backend.lookup("qwertyuiop"), [])
+        self.assertEqual(self.backend.lookup("qwertyuiop"), [])
+        self.assertEqual(StubHandler.requests, ["/entries/qwertyuiop"])
+
+    def test_server_error_is_raised_and_not_cached(self) -> None:
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                self.backend.lookup("broken")
+        self.assertEqual(len(StubHandler.requests), 2)
+
+    def test_timeout_is_raised(self) -> None:
+        self.backend.timeout = 0.2
+        with self.assertRaises(OSError):
+            self.backend.lookup("slow")
+        self.assertIsNone(self.store.cached_response(self.url + "slow"))
+
+    def test_command_reports_unreachable_backend(self) -> None:
+        # A port that was just free, so nothing is listening on it.
+        with socket.socket() as unused:
+            unused.bind(("127.0.0.1", 0))
+            port = unused.getsockname()[1]
+        configuration = types.SimpleNamespace(dictionary_url=f"http://127.0.0.1:{port}/entries/")
+        self.store.import_definitions([_dictionary.Definition("hello", "", "A greeting.")])
+        with mock.patch.object(_dictionary, "STORE", self.store), mock.patch.object(CommandLine, "CONFIGURATION", configuration):
+            result = CommandLine.funcs.dictionary("helo")
+        self.assertIn("Could not find 'helo'. Did you mean: hello?", result)
+        self.assertIn("Could not reach the online dictionary.", result)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,21 +13,25 @@ except ImportError:
     messagebox.showerror("Fatal Error!", "Could not resolve import 'Window' from classes. Please reinstall.")
 
 __filepath__ = os.path.abspath(os.path.dirname(__file__))
-try:
-    with open(__filepath__ + "/config/errorlog.md", "w") as f:
-        f.write("# PUtilities Error Log\n\n")
-        f.write("## Session Details\n")
-        f.write(f"- Date: {datetime.datetime.now().strftime('%d/%m/%Y')}\n")
-        f.write(f"- Time: {datetime.datetime.now().strftime('%H:%M:%S')}\n\n")
-        f.write("## Error Log\n")
-except:
-    messagebox.showwarning("Warning", "Could not create error log. Session will continue, but errors will not be recorded.")
+
+def createErrorLog() -> None:
+    try:
+        with open(__filepath__ + "/config/errorlog.md", "w") as f:
+            f.write("# PUtilities Error Log\n\n")
+            f.write("## Session Details\n")
+            f.write(f"- Date: {datetime.datetime.now().strftime('%d/%m/%Y')}\n")
+            f.write(f"- Time: {datetime.datetime.now().strftime('%H:%M:%S')}\n\n")
+            f.write("## Error Log\n")
+    except:
+        messagebox.showwarning("Warning", "Could not create error log. Session will continue, but errors will not be recorded.")
 
 def main() -> None:
     program = Window(__filepath__)
     program.start()
 
+# Worker processes (see classes/_workers.py) may import this file, so the error log is only created when it is run.
 if __name__ == "__main__":
+    createErrorLog()
     try:
         main()
     except Exception as e: